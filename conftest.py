@@ -0,0 +1,204 @@
+import json
+import os
+import sys
+from concurrent.futures import Future
+from dataclasses import asdict
+
+import pytest
+
+# Shared helpers (api_client.py and friends) live in selenium-python/
+sys.path.append(os.path.join(os.path.dirname(__file__), "selenium-python"))
+import api_client  # noqa: E402
+from api_batch import API_CONCURRENCY, SHARED, ApiBatch, duplicate_groups, make_request, request_for, response_for  # noqa: E402
+from catalog_cache import CATALOG  # noqa: E402
+import http_timing  # noqa: E402
+
+# Catalog cache counters reported by finished xdist workers
+_WORKER_CATALOG_STATS = []
+# Per-call timing dicts reported by finished xdist workers
+_WORKER_HTTP_TIMINGS = []
+_HTTP_CALLS_KEY = pytest.StashKey[list]()
+# Node ids deselected by -k/-m/--lf or a plugin; they must not be sent by the batch
+_DESELECTED_KEY = pytest.StashKey[set]()
+
+
+@pytest.fixture(scope="session")
+def api():
+    """The shared ``TestathonApi`` client: one keep-alive connection pool for the whole run."""
+    return api_client.default_client()
+
+
+@pytest.fixture(scope="session")
+def _api_batch(request, api):
+    # Started by the first api_response test; xdist workers each hold only part of the run, so they send inline
+    if API_CONCURRENCY <= 1 or hasattr(request.config, "workerinput"):
+        return None
+    batch = ApiBatch(api, API_CONCURRENCY, SHARED)
+    batch.start(_batch_requests(request.session))
+    return batch
+
+
+def _batch_requests(session) -> dict:
+    """The declared requests of the tests that will run: collected items minus deselected and skip-marked ones."""
+    deselected = session.config.stash.get(_DESELECTED_KEY, set())
+    return _declared_requests(
+        item for item in session.items
+        if item.nodeid not in deselected and item.get_closest_marker("skip") is None
+    )
+
+
+def _declared_requests(items) -> dict:
+    """Node id -> ``ApiRequest`` for every item with an ``api_request`` marker."""
+    declared = {}
+    for item in items:
+        req = request_for(item)
+        if req is not None:
+            declared[item.nodeid] = req
+    return declared
+
+
+@pytest.fixture
+def api_response(request, api, _api_batch):
+    """A future for the response to the test's ``api_request`` marker; ``.result()`` it in the test body.
+
+    With ``API_CONCURRENCY`` above 1 every declared request of the run is sent
+    concurrently when the first such test starts, and each test picks up its own.
+    Transport errors surface from ``.result()``, inside the test, as they did
+    with inline calls. A shared request (GET/HEAD/OPTIONS, or ``shared=True``)
+    already sent by another test, in either suite, is not sent again.
+    """
+    fut = response_for(request.node, api, _api_batch)
+    if fut is None:
+        pytest.fail("api_response needs an @pytest.mark.api_request(method, path, ...) marker")
+    return fut
+
+
+@pytest.fixture
+def api_once(api):
+    """``api_once(method, path, **kwargs)``: the response, sent once per run for identical shared requests.
+
+    For tests that build their request in the body rather than in an
+    ``api_request`` marker. ``shared`` defaults to the method being idempotent.
+    """
+    def send(method: str, path: str, **kwargs):
+        return SHARED.send_now(make_request(method, path, **kwargs), api).result()
+    return send
+
+
+def pytest_deselected(items):
+    if items:
+        items[0].config.stash.setdefault(_DESELECTED_KEY, set()).update(item.nodeid for item in items)
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    declared = _declared_requests(items)
+    groups = duplicate_groups(declared)
+    if not groups:
+        return None
+    shared = [ids for ids in groups if declared[ids[0]].shared]
+    lines = [
+        f"api requests: {len(declared)} declared, {len(declared) - sum(len(ids) - 1 for ids in shared)} to send;"
+        f" {len(groups)} signature(s) declared more than once"
+    ]
+    for ids in groups:
+        if not declared[ids[0]].shared:
+            req = declared[ids[0]]
+            lines.append(f"  not shared ({req.method}; add shared=True if it has no side effects): {req.path} in {', '.join(ids)}")
+    return lines
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.stash[_HTTP_CALLS_KEY] = http_timing.RECORDER.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    if call.when == "call":
+        _attach_http_timings(item)
+    yield
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    http_timing.RECORDER.stop()
+
+
+def _attach_http_timings(item) -> None:
+    """Add the item's API calls, with their phase breakdown, to ``user_properties`` (shows up in JUnit XML)."""
+    calls = list(item.stash.get(_HTTP_CALLS_KEY, []))
+    # A batched or shared api_response was sent on another thread, possibly for another test
+    fut = getattr(item, "funcargs", {}).get("api_response")
+    if isinstance(fut, Future) and fut.done() and fut.exception() is None:
+        timing = getattr(fut.result(), "timing", None)
+        if timing is not None and timing not in calls:
+            calls.insert(0, timing)
+    if calls:
+        item.user_properties.append(("http_timing", json.dumps([asdict(c) for c in calls])))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["catalog_cache"] = CATALOG.stats()
+        client = api_client._DEFAULT
+        workeroutput["http_timing"] = [asdict(t) for t in client.timings] if client is not None else []
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    workeroutput = getattr(node, "workeroutput", {})
+    stats = workeroutput.get("catalog_cache")
+    if stats:
+        _WORKER_CATALOG_STATS.append(stats)
+    _WORKER_HTTP_TIMINGS.extend(workeroutput.get("http_timing") or [])
+
+
+def pytest_unconfigure(config):
+    api_client.close_default_client()
+
+
+def _catalog_summary(tr) -> None:
+    totals = CATALOG.stats()
+    for stats in _WORKER_CATALOG_STATS:
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+    reads = totals["fetched"] + totals["revalidated"] + totals["local"]
+    if not reads:
+        return
+    tr.write_line(
+        f"catalog cache: {reads} read(s): {totals['fetched']} fetched, {totals['revalidated']} revalidated (304),"
+        f" {totals['local']} local; {totals['bytes_saved'] / 1024:.1f} KiB not downloaded"
+    )
+
+
+def _http_timing_summary(tr) -> None:
+    client = api_client._DEFAULT
+    calls = [asdict(t) for t in client.timings] if client is not None else []
+    calls += _WORKER_HTTP_TIMINGS
+    if not calls:
+        return
+    summary = http_timing.summarize(calls)
+    tr.write_line("http timing per endpoint, ms p50/p90/p99 (setup phases are 0 on a reused connection):")
+    for line in http_timing.format_summary(summary):
+        tr.write_line(line)
+    out = os.getenv("HTTP_TIMING_REPORT")
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump({"percentiles": list(http_timing.PERCENTILES), "endpoints": summary}, f, indent=2)
+        tr.write_line(f"http timing report: {out}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    _catalog_summary(terminalreporter)
+    _http_timing_summary(terminalreporter)
+    if SHARED.reused:
+        terminalreporter.write_line(f"api requests: {SHARED.sent} sent, {SHARED.reused} answered from an identical earlier request")
+    client = api_client._DEFAULT
+    if client is None or not client.timings:
+        return
+    calls = len(client.timings)
+    mean_ms = 1000 * sum(t.elapsed for t in client.timings) / calls
+    terminalreporter.write_line(
+        f"api client: {calls} call(s) over {client.connections_opened()} connection(s), mean {mean_ms:.1f} ms per call"
+    )
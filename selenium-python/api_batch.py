@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from api_client import TestathonApi
+
+
+# Requests in flight at once when api_request tests are batched; 0 or 1 runs each inline
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "8") or 0)
+# Safe to send once and share between tests unless a request says otherwise
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class from_param:
+    """Marker value taken from the test's parametrization, e.g. ``params=from_param("params")``."""
+
+    name: str
+
+
+@dataclass
+class ApiRequest:
+    method: str
+    path: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)  # params/json/headers/allow_redirects for requests
+    shared: bool = False  # one response may serve every test sending the same request
+
+    def send(self, client: TestathonApi) -> requests.Response:
+        return client.request(self.method, self.path, **self.kwargs)
+
+    def key(self) -> str:
+        """Normalized signature: same method, path, params, body and headers give the same key."""
+        kwargs = dict(self.kwargs)
+        params = kwargs.get("params")
+        if isinstance(params, dict):
+            kwargs["params"] = sorted((str(k), v) for k, v in params.items())
+        headers = kwargs.get("headers")
+        if isinstance(headers, dict):
+            kwargs["headers"] = sorted((str(k).lower(), v) for k, v in headers.items())
+        return json.dumps([self.method.upper(), self.path, kwargs], sort_keys=True, default=repr)
+
+
+def request_for(item) -> Optional[ApiRequest]:
+    """The request declared by ``item``'s ``api_request`` marker, with ``from_param`` values filled in."""
+    marker = item.get_closest_marker("api_request")
+    if marker is None:
+        return None
+    callspec = getattr(item, "callspec", None)
+
+    def resolve(value):
+        return callspec.params[value.name] if isinstance(value, from_param) else value
+
+    method, path = (resolve(v) for v in marker.args)
+    return make_request(method, path, **{key: resolve(value) for key, value in marker.kwargs.items()})
+
+
+def make_request(method: str, path: str, shared: Optional[bool] = None, **kwargs) -> ApiRequest:
+    """Build an ``ApiRequest``; ``shared`` defaults to whether ``method`` is idempotent."""
+    method = str(method).upper()
+    return ApiRequest(
+        method=method,
+        path=path,
+        kwargs=kwargs,
+        shared=method in IDEMPOTENT_METHODS if shared is None else bool(shared),
+    )
+
+
+class SharedResponses:
+    """One response per request signature for the whole run.
+
+    Requests flagged ``shared`` (by default the idempotent GET/HEAD/OPTIONS)
+    with the same normalized signature are sent once, and every later caller
+    gets the same future. Anything else is sent for each caller.
+    """
+
+    def __init__(self):
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.reused = 0
+
+    def claim(self, req: ApiRequest) -> Tuple[Future, bool]:
+        """The future for ``req`` and whether the caller has to send it."""
+        with self._lock:
+            if req.shared:
+                key = req.key()
+                fut = self._futures.get(key)
+                if fut is not None:
+                    self.reused += 1
+                    return fut, False
+                fut = self._futures[key] = Future()
+            else:
+                fut = Future()
+            self.sent += 1
+            return fut, True
+
+    def send_now(self, req: ApiRequest, client: TestathonApi) -> Future:
+        fut, owner = self.claim(req)
+        if owner:
+            _resolve(fut, req, client)
+        return fut
+
+
+SHARED = SharedResponses()
+
+
+def _resolve(fut: Future, req: ApiRequest, client: TestathonApi) -> None:
+    try:
+        fut.set_result(req.send(client))
+    except Exception as e:
+        fut.set_exception(e)
+
+
+def duplicate_groups(requests_by_id: Dict[str, ApiRequest]) -> List[List[str]]:
+    """Node ids grouped by identical request signature, for signatures used more than once."""
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for nodeid, req in requests_by_id.items():
+        groups[req.key()].append(nodeid)
+    return [ids for ids in groups.values() if len(ids) > 1]
+
+
+class ApiBatch:
+    """Sends the declared requests of a whole run concurrently, ahead of the tests that assert on them.
+
+    An asyncio loop on a background thread keeps at most ``concurrency``
+    requests in flight; each one runs on the shared client's connection pool.
+    Tests then only wait for their own response, so the API tier takes
+    about as long as its slowest request. Duplicate shared requests go out once
+    (see ``SharedResponses``).
+    """
+
+    def __init__(self, client: TestathonApi, concurrency: int = API_CONCURRENCY, responses: SharedResponses = SHARED):
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.responses = responses
+        self._futures: Dict[str, Future] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, requests_by_id: Dict[str, ApiRequest]) -> None:
+        pending = []
+        for nodeid, req in requests_by_id.items():
+            fut, owner = self.responses.claim(req)
+            self._futures[nodeid] = fut
+            if owner:
+                pending.append((fut, req))
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(pending),), name="api-batch", daemon=True)
+        self._thread.start()
+
+    async def _run(self, pending) -> None:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(fut: Future, req: ApiRequest) -> None:
+            async with sem:
+                try:
+                    fut.set_result(await asyncio.to_thread(req.send, self.client))
+                except BaseException as e:
+                    fut.set_exception(e)
+
+        await asyncio.gather(*(one(fut, req) for fut, req in pending))
+
+    def __contains__(self, nodeid: str) -> bool:
+        return nodeid in self._futures
+
+    def future(self, nodeid: str) -> Future:
+        return self._futures[nodeid]
+
+
+def response_for(item, client: TestathonApi, batch: Optional[ApiBatch] = None, responses: SharedResponses = SHARED) -> Optional[Future]:
+    """The future for ``item``'s declared request: the batched one if ``batch`` sent it, otherwise sent now.
+
+    None when the item has no ``api_request`` marker.
+    """
+    if batch is not None and item.nodeid in batch:
+        return batch.future(item.nodeid)
+    req = request_for(item)
+    if req is None:
+        return None
+    return responses.send_now(req, client)
@@ -0,0 +1,155 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from catalog_cache import CATALOG, CatalogResult
+from http_timing import RECORDER, make_adapter
+
+
+BASE_URL = os.getenv("TEST_URL", "https://testathon.live/")
+DEFAULT_TIMEOUT = float(os.getenv("API_TIMEOUT", "15"))
+# Enough connections for the batched api_request mode (see api_batch.py) to keep all of them busy
+POOL_SIZE = max(10, int(os.getenv("API_CONCURRENCY", "8") or 0))
+
+_UNSET: Any = object()
+
+
+@dataclass
+class CallTiming:
+    method: str
+    path: str
+    status: int
+    elapsed: float  # seconds, request start to body read
+    bytes: int
+    # Breakdown of the final exchange (see http_timing.Phases); setup phases are 0 on a reused connection
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    reused: bool = True
+
+
+class TestathonApi:
+    """Client for the testathon ``/api`` endpoints on one keep-alive connection pool.
+
+    Every call goes through ``request`` and is recorded in ``timings``, with
+    its DNS/connect/TLS/TTFB/transfer breakdown from the mounted
+    ``TimingAdapter``. Methods
+    take the raw pieces the suites vary (payloads, params, headers) and return
+    the ``requests.Response`` so tests keep asserting on status codes and bodies.
+    Paths are relative to the base URL; absolute URLs are passed through.
+    """
+
+    __test__ = False  # not a test class, despite the name
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT, pool_size: int = POOL_SIZE):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Keep calls independent, as they were with bare requests.get/post: no cookies carried over
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.adapter = make_adapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.timings: List[CallTiming] = []
+        self._lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return path if "://" in path else self.base_url + path
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.monotonic()
+        r = self.session.request(method, self.url(path), **kwargs)
+        size = len(r.content)  # reads the body, so elapsed covers the transfer
+        done = time.monotonic()
+        timing = CallTiming(method=method.upper(), path=path, status=r.status_code, elapsed=done - start, bytes=size)
+        phases = getattr(r, "phases", None)
+        if phases is not None:
+            phases.finish(done)
+            timing.dns, timing.connect, timing.tls = phases.dns, phases.connect, phases.tls
+            timing.ttfb, timing.transfer, timing.reused = phases.ttfb, phases.transfer, phases.reused
+        r.timing = timing
+        with self._lock:
+            self.timings.append(timing)
+        RECORDER.add(timing)
+        return r
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def products(self, params=None, *, headers: Optional[Dict[str, str]] = None, method: str = "GET", **kwargs) -> requests.Response:
+        return self.request(method, "/api/products", params=params, headers=headers, **kwargs)
+
+    def catalog(self, revalidate: bool = False) -> CatalogResult:
+        """The catalog through the shared revalidation cache (see ``catalog_cache``)."""
+        return CATALOG.get(self, revalidate=revalidate)
+
+    def product_list(self) -> list:
+        """The parsed catalog; raises for a non-2xx response."""
+        return self.catalog().products
+
+    def signin(self, username=_UNSET, password=_UNSET, *, method: str = "POST", json: Any = _UNSET) -> requests.Response:
+        if json is _UNSET:
+            json = {k: v for k, v in (("username", username), ("password", password)) if v is not _UNSET} or None
+        return self.request(method, "/api/signin", json=json)
+
+    def checkout(self, user_name=_UNSET, *, method: str = "POST", json: Any = _UNSET) -> requests.Response:
+        """POST (by default) /api/checkout; ``json`` overrides the ``{"userName": ...}`` body."""
+        if json is _UNSET:
+            json = {"userName": user_name} if user_name is not _UNSET else None
+        return self.request(method, "/api/checkout", json=json)
+
+    def orders(self, user_name=_UNSET, *, params: Optional[dict] = None, method: str = "GET") -> requests.Response:
+        params = dict(params or {})
+        if user_name is not _UNSET:
+            params["userName"] = user_name
+        return self.request(method, "/api/orders", params=params or None)
+
+    def offers(self, user_name=_UNSET, latitude=_UNSET, longitude=_UNSET, *, params: Optional[dict] = None) -> requests.Response:
+        params = dict(params or {})
+        for key, value in (("userName", user_name), ("latitude", latitude), ("longitude", longitude)):
+            if value is not _UNSET:
+                params[key] = value
+        return self.request("GET", "/api/offers", params=params or None)
+
+    def connections_opened(self) -> int:
+        """TCP(+TLS) connections opened so far across the pool."""
+        total = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            total += getattr(pool, "num_connections", 0) if pool is not None else 0
+        return total
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_DEFAULT: Optional[TestathonApi] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_client() -> TestathonApi:
+    """The process-wide client shared by fixtures and helpers."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = TestathonApi()
+        return _DEFAULT
+
+
+def close_default_client() -> None:
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is not None:
+            _DEFAULT.close()
+            _DEFAULT = None
@@ -0,0 +1,131 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+try:  # optional; gzip is used when it is not installed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+# off: never capture; failure: only when an attempt failed; always: every attempt
+MODES = ("off", "failure", "always")
+ARTIFACT_DIR = os.getenv("LOGIN_ARTIFACT_DIR") or os.path.join(os.path.dirname(__file__), "..", "log", "artifacts")
+
+_STOP = object()
+
+
+def artifact_mode() -> str:
+    mode = (os.getenv("LOGIN_ARTIFACTS") or "failure").strip().lower()
+    return mode if mode in MODES else "failure"
+
+
+def should_capture(failed: bool) -> bool:
+    mode = artifact_mode()
+    return mode == "always" or (mode == "failure" and failed)
+
+
+class ArtifactWriter:
+    """Stores text artifacts (page dumps) compressed and content-addressed, off the caller's thread.
+
+    Each distinct body is written once as ``objects/<sha[:2]>/<sha>.<ext>``;
+    ``index.jsonl`` maps every submitted name to its digest, so identical sign-in
+    pages across users and platforms cost one file. Compression is zstd when the
+    ``zstandard`` package is installed, gzip otherwise.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, maxsize: int = 32):
+        self.root = root
+        self.ext = "zst" if zstandard is not None else "gz"
+        self.stored = 0
+        self.deduped = 0
+        self.raw_bytes = 0
+        self.written_bytes = 0
+        self.errors = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, text: str, **meta) -> None:
+        """Queue ``text`` to be stored under ``name``; blocks only when the queue is full."""
+        self._queue.put((name, text, meta, time.time()))
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def _store(self, name: str, text: str, meta: dict, ts: float) -> None:
+        data = (text or "").encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, "objects", digest[:2], f"{digest}.{self.ext}")
+        self.raw_bytes += len(data)
+        if os.path.exists(path):
+            self.deduped += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = self._compress(data)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+            self.stored += 1
+            self.written_bytes += len(blob)
+        entry = dict(meta, name=name, sha256=digest, bytes=len(data), object=os.path.relpath(path, self.root), ts=ts)
+        with open(os.path.join(self.root, "index.jsonl"), "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                try:
+                    self._store(*item)
+                except Exception:
+                    self.errors += 1  # artifacts are diagnostics; never fail the caller
+            finally:
+                self._queue.task_done()
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued artifacts to be written and stop the thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+_WRITER: Optional[ArtifactWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def writer() -> ArtifactWriter:
+    """The process-wide writer, started on first use and drained at exit."""
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = ArtifactWriter()
+            atexit.register(_WRITER.drain, 30)
+        return _WRITER
+
+
+def capture_page(driver, name: str, failed: bool, **meta) -> bool:
+    """Queue ``driver.page_source`` as artifact ``name`` if the ``LOGIN_ARTIFACTS`` mode asks for it.
+
+    The page source is only fetched when it will be kept. Returns whether it was captured.
+    """
+    if not should_capture(failed):
+        return False
+    try:
+        text = driver.page_source
+    except Exception:
+        return False
+    writer().submit(name, text, **meta)
+    return True
@@ -0,0 +1,167 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import fcntl  # POSIX
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+CATALOG_PATH = "/api/products"
+DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "catalog")
+# A copy revalidated this recently is used without asking the server again (seconds)
+CATALOG_FRESH = float(os.getenv("CATALOG_CACHE_FRESH", "60"))
+
+
+@dataclass
+class CatalogResult:
+    products: list
+    raw: Any  # the parsed JSON body
+    source: str  # "fetched" (200), "revalidated" (304) or "local" (fresh copy, no request)
+    status: Optional[int] = None  # HTTP status when a request was made
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+def parse_products(data) -> list:
+    """The product list of a catalog body: its ``products`` list, or the body when it is a list; else empty."""
+    if isinstance(data, dict) and isinstance(data.get("products"), list):
+        return data["products"]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+class CatalogCache:
+    """Shares the ``/api/products`` catalog across tests and pytest-xdist workers.
+
+    The body is kept on disk with its ETag/Last-Modified validators. A reader
+    revalidates with If-None-Match/If-Modified-Since, so an unchanged catalog
+    comes back as an empty 304, and a copy revalidated in the last
+    ``CATALOG_FRESH`` seconds is used without a request at all. A file lock
+    makes concurrent workers wait for the one that is already fetching.
+    ``bytes_saved`` counts catalog bytes that were not downloaded again.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, fresh: float = CATALOG_FRESH, enabled: bool = True):
+        self.dir = os.path.abspath(cache_dir or DEFAULT_DIR)
+        self.fresh = fresh
+        self.enabled = enabled
+        self.fetched = 0
+        self.revalidated = 0
+        self.local = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def _path(self, client) -> str:
+        safe = "".join(c if c.isalnum() else "_" for c in client.base_url)
+        return os.path.join(self.dir, f"{safe}.json")
+
+    def _read(self, path: str) -> Optional[dict]:
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            return entry if isinstance(entry, dict) and "body" in entry else None
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _body(entry: Optional[dict]) -> Any:
+        """The stored catalog body, parsed; None when there is no usable copy."""
+        if not entry:
+            return None
+        try:
+            return json.loads(entry["body"])
+        except (TypeError, ValueError):
+            return None
+
+    def _write(self, path: str, entry: dict) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def has_copy(self, client) -> bool:
+        """Whether a usable catalog for ``client``'s site is stored, i.e. the next read can revalidate it."""
+        return self.enabled and self._body(self._read(self._path(client))) is not None
+
+    def get(self, client, revalidate: bool = False) -> CatalogResult:
+        """The catalog via ``client``; ``revalidate`` always asks the server (a 304 still counts as saved)."""
+        if not self.enabled:
+            r = client.get(CATALOG_PATH)
+            r.raise_for_status()
+            data = r.json()
+            return CatalogResult(products=parse_products(data), raw=data, source="fetched", status=r.status_code)
+        os.makedirs(self.dir, exist_ok=True)
+        path = self._path(client)
+        with self._lock, _file_lock(path + ".lock"):
+            entry = self._read(path)
+            stored = self._body(entry)
+            if stored is None:
+                entry = None  # nothing to serve or revalidate against
+            if entry and not revalidate and time.time() - entry.get("validated_at", 0) < self.fresh:
+                self.local += 1
+                self.bytes_saved += entry.get("size", 0)
+                return CatalogResult(products=parse_products(stored), raw=stored, source="local")
+            headers = {}
+            if entry and entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry and entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            r = client.get(CATALOG_PATH, headers=headers)
+            if r.status_code == 304 and entry:
+                self.revalidated += 1
+                self.bytes_saved += entry.get("size", 0)
+                entry["validated_at"] = time.time()
+                self._write(path, entry)
+                return CatalogResult(products=parse_products(stored), raw=stored, source="revalidated", status=304)
+            if r.status_code == 304:
+                # A 304 with no stored body (e.g. a proxy answering for us) is a miss: ask for the full body
+                r = client.get(CATALOG_PATH, headers={"Cache-Control": "no-cache"})
+                if r.status_code == 304:
+                    raise RuntimeError(f"{CATALOG_PATH} answered 304 to an unconditional request")
+            r.raise_for_status()
+            self.fetched += 1
+            body = r.text
+            self._write(path, {
+                "body": body,
+                "size": len(r.content),
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "validated_at": time.time(),
+            })
+            data = json.loads(body)
+            return CatalogResult(products=parse_products(data), raw=data, source="fetched", status=r.status_code)
+
+    def stats(self) -> dict:
+        return {"fetched": self.fetched, "revalidated": self.revalidated, "local": self.local, "bytes_saved": self.bytes_saved}
+
+
+CATALOG = CatalogCache(
+    cache_dir=os.getenv("CATALOG_CACHE_DIR") or None,
+    enabled=os.getenv("CATALOG_CACHE", "1").strip().lower() not in ("0", "false", "no", "off"),
+)
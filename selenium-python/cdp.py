@@ -0,0 +1,53 @@
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+
+
+# Vendor endpoint for CDP passthrough on a remote (hub) session, by browser family
+_CDP_ENDPOINTS = {
+    "chrome": "/session/$sessionId/goog/cdp/execute",
+    "edge": "/session/$sessionId/ms/cdp/execute",
+}
+_COMMAND = "executeCdpCommand"
+
+
+class CdpUnavailable(RuntimeError):
+    """The session cannot run Chrome DevTools Protocol commands."""
+
+
+def _family(driver) -> str:
+    caps = getattr(driver, "capabilities", None) or {}
+    name = str(caps.get("browserName") or "").lower()
+    if name in ("microsoftedge", "msedge", "edge"):
+        return "edge"
+    return name
+
+
+def cdp_supported(driver) -> bool:
+    """Whether ``driver`` is a Chromium session (local or remote) that may accept CDP commands."""
+    return _family(driver) in _CDP_ENDPOINTS
+
+
+def execute_cdp(driver, cmd: str, params: Optional[dict] = None) -> dict:
+    """Run a CDP command on local Chromium drivers and on remote Chrome/Edge sessions.
+
+    A ``webdriver.Remote`` executor does not know the vendor passthrough
+    endpoint, so it is registered on first use, under a per-vendor name since
+    selenium's command table is shared by every connection. Raises
+    ``CdpUnavailable`` for other browsers or when the hub rejects the command.
+    """
+    family = _family(driver)
+    endpoint = _CDP_ENDPOINTS.get(family)
+    if endpoint is None:
+        raise CdpUnavailable(f"CDP is not available for {family or 'this browser'}")
+    name = f"{_COMMAND}:{family}"
+    executor = driver.command_executor
+    if name not in (getattr(executor, "_commands", None) or {}):
+        if hasattr(executor, "add_command"):
+            executor.add_command(name, "POST", endpoint)
+        else:
+            executor._commands[name] = ("POST", endpoint)
+    try:
+        return driver.execute(name, {"cmd": cmd, "params": params or {}})["value"]
+    except WebDriverException as e:
+        raise CdpUnavailable(f"{cmd}: {e.msg or e}") from e
@@ -1,3 +1,4 @@
+import json
 import os
 import pytest
 from dotenv import load_dotenv
@@ -9,14 +10,25 @@ except Exception:  # older seleniums may not expose these
     EdgeOptions = None
     SafariOptions = None
 
+from data_deps import shutdown as shutdown_data_deps, start_marker as start_data_deps
+from prefetch import SessionPrefetcher
+from reaper import SessionReaper
+from session_pool import SessionPool, capabilities_key
+from slots import SlotLimiter
+from resource_block import DEFAULT_CLASSES, block_resources, unblock_resources
+from storage_seed import remove_seed, restore_snapshot, seed_storage
+import probe
+import profiler
+import transport
+
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"), override=False)
 
 
-def build_capabilities(test_name: str, overrides: dict | None = None) -> dict:
+def build_capabilities(test_name: str, overrides: dict | None = None, *, require_credentials: bool = True) -> dict:
     username = os.getenv("BROWSERSTACK_USERNAME")
     access_key = os.getenv("BROWSERSTACK_ACCESS_KEY")
-    if not username or not access_key:
+    if require_credentials and (not username or not access_key):
         raise RuntimeError("BROWSERSTACK_USERNAME or BROWSERSTACK_ACCESS_KEY is not set. Add them to .env")
 
     browser_name = os.getenv("BROWSER_NAME", "Chrome")
@@ -92,9 +104,436 @@ def _options_for_browser(browser_name: str):
     return ChromeOptions()
 
 
+HUB_URL = "https://hub-cloud.browserstack.com/wd/hub"
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Cross-process cap on concurrent sessions and session lookahead; configured in pytest_configure
+_SLOTS: SlotLimiter | None = None
+_SLOT_BY_DRIVER: dict = {}
+_PREFETCH: SessionPrefetcher | None = None
+_REAPER: SessionReaper | None = None
+_POOL: SessionPool | None = None
+_ITEM_INDEX: dict = {}
+_LAST_USE: dict = {}
+_AFFINITY_REPORT: dict = {}
+
+
+def _parallel_slots() -> int:
+    try:
+        return max(0, int(os.getenv("BSTACK_PARALLEL_SLOTS", "0")))
+    except ValueError:
+        return 0
+
+
+def _transport_name() -> str:
+    return "shared" if _env_flag("WD_SHARED_TRANSPORT", True) else "stock"
+
+
+def pytest_configure(config):
+    global _SLOTS, _PREFETCH, _REAPER
+    if _env_flag("USE_BSTACK_SDK"):
+        return
+    if _env_flag("WD_PROFILE"):
+        profiler.PROFILER = profiler.CommandProfiler()
+    if _env_flag("BSTACK_ASYNC_QUIT", True):
+        _REAPER = SessionReaper(_close_remote, maxsize=int(os.getenv("BSTACK_QUIT_QUEUE", "4")))
+    slots = _parallel_slots()
+    if slots:
+        _SLOTS = SlotLimiter(slots, lock_dir=os.getenv("BSTACK_SLOT_DIR") or None)
+    depth = int(os.getenv("BSTACK_PREFETCH_DEPTH", "0") or 0)
+    # xdist workers do not know which test they get next, so lookahead is single-process only
+    if depth > 0 and not hasattr(config, "workerinput"):
+        # Never block on a slot for a speculative session; the test will create its own
+        _PREFETCH = SessionPrefetcher(
+            factory=lambda caps: _new_remote(caps, slot_timeout=0),
+            disposer=_quit_driver,
+            depth=depth,
+        )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if profiler.PROFILER is not None:
+        profiler.PROFILER.begin(item.nodeid)
+    probe.SAVINGS.begin(item.nodeid)
+    try:
+        yield
+    finally:
+        probe.SAVINGS.end()
+        if profiler.PROFILER is not None:
+            profiler.PROFILER.end()
+
+
+def _profile_path() -> str:
+    return os.getenv("WD_PROFILE_OUT") or os.path.join(os.path.dirname(__file__), "..", "log", "wd_profile.json")
+
+
+def _write_profile(tr) -> None:
+    prof = profiler.PROFILER
+    top = int(os.getenv("WD_PROFILE_TOP", "5"))
+    nodeids = [n for n in prof.tests() if n != profiler.BACKGROUND]
+    if not nodeids:
+        return
+    tr.section("webdriver command profile", sep="-")
+    for nodeid in nodeids:
+        summary = prof.test_summary(nodeid, top)
+        tr.write_line(
+            f"{nodeid}: {summary['round_trips']} round trips, {summary['total_ms'] / 1000:.2f}s"
+            f" ({summary['wait_round_trips']} from waits)"
+        )
+        for r in summary["slowest"]:
+            tr.write_line(
+                f"    {r['ms']:>9.1f} ms  {r['command']:<28} {r['caller']:<32}"
+                f" req={r['request_bytes']}B resp={r['response_bytes']}B"
+            )
+    path = _profile_path()
+    prof.write(path, top)
+    tr.write_line(f"webdriver profile: {os.path.normpath(path)}")
+
+
+def _write_probe_savings(tr) -> None:
+    report = probe.SAVINGS.report()
+    if not report:
+        return
+    checks = sum(t["checks"] for t in report.values())
+    saved = sum(t["saved"] for t in report.values())
+    tr.write_line(f"assertion probes: {checks} check(s), ~{saved / 1024:.1f} KiB of page text not transferred")
+    for nodeid, t in sorted(report.items(), key=lambda kv: -kv[1]["saved"])[:int(os.getenv("WD_PROFILE_TOP", "5"))]:
+        tr.write_line(f"    {t['saved'] / 1024:>8.1f} KiB  {t['checks']:>3} check(s)  {nodeid}")
+    path = os.getenv("PROBE_REPORT")
+    if path:
+        probe.SAVINGS.write(path)
+        tr.write_line(f"assertion probe report: {path}")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutdown_data_deps()
+    if _PREFETCH is not None:
+        _PREFETCH.close()
+    if _REAPER is not None:
+        _REAPER.drain(timeout=float(os.getenv("BSTACK_QUIT_DRAIN_TIMEOUT", "300")))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    tr = terminalreporter
+    commands, seconds = transport.TIMINGS.total()
+    if commands:
+        tr.write_line(
+            f"webdriver transport: {_transport_name()}, {commands} command(s),"
+            f" mean {1000 * seconds / commands:.1f} ms per round trip"
+        )
+        report = os.getenv("WD_TRANSPORT_REPORT")
+        if report:
+            transport.write_report(report, _transport_name())
+            tr.write_line(f"webdriver transport report: {report}")
+    if profiler.PROFILER is not None:
+        _write_profile(tr)
+    _write_probe_savings(tr)
+    if _POOL is not None:
+        st = _POOL.stats
+        tr.write_line(
+            f"session pool: {st.created} created, {st.reused} reused, {st.recycled} recycled,"
+            f" {st.unhealthy} unhealthy, {st.expired} found dead when reused, {st.retired} retired after their last test"
+        )
+    if _REAPER is None or not _REAPER.quit_count:
+        return
+    tr.write_line(
+        f"background quit: {_REAPER.quit_count} session(s), {_REAPER.quit_seconds:.1f}s taken off the test path"
+    )
+    if _REAPER.errors:
+        tr.section("remote session quit errors", sep="-", yellow=True)
+        for err in _REAPER.errors:
+            tr.write_line(f"{err.label}: {err.error}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    # `-n auto` fans out to exactly as many workers as the account has parallel slots
+    return _parallel_slots() or None
+
+
+def _new_remote(caps: dict, on_wait=None, slot_timeout: float | None = None):
+    slot = None
+    if _SLOTS is not None:
+        if slot_timeout is None:
+            slot_timeout = float(os.getenv("BSTACK_SLOT_TIMEOUT", "1800"))
+        slot = _SLOTS.acquire(timeout=slot_timeout, on_wait=on_wait)
+    opts = _options_for_browser(caps.get("browserName"))
+    for k, v in caps.items():
+        opts.set_capability(k, v)
+    try:
+        # Non-SDK path: use cloud hub and pass credentials via capabilities (no basic auth in URL)
+        executor = transport.remote_connection(HUB_URL, shared=_transport_name() == "shared")
+        driver = webdriver.Remote(command_executor=executor, options=opts)
+    except Exception:
+        if _SLOTS is not None:
+            _SLOTS.release(slot)
+        raise
+    if slot is not None:
+        _SLOT_BY_DRIVER[id(driver)] = slot
+    return driver
+
+
+def _close_remote(driver) -> None:
+    try:
+        driver.quit()
+    finally:
+        slot = _SLOT_BY_DRIVER.pop(id(driver), None)
+        if _SLOTS is not None:
+            _SLOTS.release(slot)
+
+
+def _quit_driver(driver) -> None:
+    """End a session off the test path when the reaper runs; errors surface at session end."""
+    if _REAPER is not None:
+        _REAPER.submit(driver)
+        return
+    try:
+        _close_remote(driver)
+    except Exception:
+        pass
+
+
+def _is_alive(driver) -> bool:
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+
+def _create_session(caps: dict, on_wait=None):
+    """Hand out a prefetched session for ``caps`` if one is booting, else start one."""
+    if _PREFETCH is not None:
+        taken = _PREFETCH.take(capabilities_key(caps))
+        if taken is not None:
+            driver, created_for = taken
+            if _is_alive(driver):
+                name = (caps.get("bstack:options") or {}).get("sessionName") or ""
+                if name and name != created_for:
+                    _set_session_name(driver, name)
+                return driver
+            _quit_driver(driver)
+    return _new_remote(caps, on_wait=on_wait)
+
+
+def _item_caps(item, require_credentials: bool = True) -> dict | None:
+    if "driver" not in getattr(item, "fixturenames", ()):
+        return None
+    callspec = getattr(item, "callspec", None)
+    overrides = callspec.params.get("driver") if callspec is not None else None
+    try:
+        return build_capabilities(
+            test_name=item.name,
+            overrides=overrides if isinstance(overrides, dict) else None,
+            require_credentials=require_credentials,
+        )
+    except RuntimeError:
+        return None
+
+
+def _session_switches(keys: list) -> int:
+    driver_keys = [k for k in keys if k is not None]
+    return sum(1 for a, b in zip(driver_keys, driver_keys[1:]) if a != b)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    """Run all tests of one platform back to back so pooled sessions are reused.
+
+    Tests without ``driver`` go first; driver tests are grouped by capability key
+    in order of each platform's first appearance (stable within a group).
+    Disable with BSTACK_PLATFORM_AFFINITY=0.
+    """
+    if _env_flag("USE_BSTACK_SDK") or not _env_flag("BSTACK_PLATFORM_AFFINITY", True):
+        return
+    keys = []
+    for item in items:
+        caps = _item_caps(item, require_credentials=False)
+        keys.append(capabilities_key(caps) if caps is not None else None)
+    _AFFINITY_REPORT.clear()
+    if not any(k is not None for k in keys):
+        return  # e.g. API-only runs: nothing to group and nothing to report
+    group_rank: dict = {None: -1}
+    for k in keys:
+        group_rank.setdefault(k, len(group_rank))
+    order = sorted(range(len(items)), key=lambda i: group_rank[keys[i]])
+    before = _session_switches(keys)
+    items[:] = [items[i] for i in order]
+    after = _session_switches([keys[i] for i in order])
+    _AFFINITY_REPORT.update(platforms=len(group_rank) - 1, before=before, after=after)
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    if not _AFFINITY_REPORT:
+        return None
+    r = _AFFINITY_REPORT
+    return (
+        f"platform affinity: {r['platforms']} platform(s), session switches {r['before']} -> {r['after']}"
+        f" ({r['before'] - r['after']} removed)"
+    )
+
+
+def _index_items(items) -> None:
+    """Position of every collected item, and the last position that uses each platform."""
+    if len(_ITEM_INDEX) == len(items):
+        return
+    _ITEM_INDEX.clear()
+    _LAST_USE.clear()
+    for i, item in enumerate(items):
+        _ITEM_INDEX[item.nodeid] = i
+        caps = _item_caps(item, require_credentials=False)
+        if caps is not None:
+            _LAST_USE[capabilities_key(caps)] = i
+
+
+def _needed_later(request, key: str) -> bool:
+    """Whether a test after the current one runs on the platform ``key``."""
+    _index_items(request.session.items)
+    pos = _ITEM_INDEX.get(request.node.nodeid)
+    return pos is None or _LAST_USE.get(key, -1) > pos
+
+
+def _schedule_prefetch(request, current_key: str, pool: SessionPool | None) -> None:
+    items = request.session.items
+    _index_items(items)
+    pos = _ITEM_INDEX.get(request.node.nodeid)
+    if pos is None:
+        return
+    # With pooling one session serves every later test of its platform, so only the next
+    # platforms without a live session need one; without pooling every test needs its own.
+    covered = {current_key} if pool is not None else set()
+    upcoming = []
+    for item in items[pos + 1:]:
+        if len(upcoming) >= _PREFETCH.depth:
+            break
+        caps = _item_caps(item)
+        if caps is None:
+            continue
+        if pool is not None:
+            key = capabilities_key(caps)
+            if key in covered or pool.idle_count(key):
+                continue
+            covered.add(key)
+        upcoming.append(caps)
+    _PREFETCH.schedule(upcoming)
+
+
+def _set_session_name(driver, name: str) -> None:
+    try:
+        driver.execute_script(
+            'browserstack_executor: {"action": "setSessionName", "arguments": {"name": %s}}' % json.dumps(name)
+        )
+    except Exception:
+        pass
+
+
+_SEEDING_KEY = pytest.StashKey()
+_DATA_DEPS_KEY = pytest.StashKey()
+_CALL_ERRORED_KEY = pytest.StashKey[bool]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    if call.when == "call" and call.excinfo is not None:
+        # Assertion failures, skips and xfails leave the session usable; other exceptions may not
+        item.stash[_CALL_ERRORED_KEY] = isinstance(call.excinfo.value, Exception) and not isinstance(
+            call.excinfo.value, AssertionError
+        )
+    yield
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Start declared API data before any fixture runs, so it overlaps session creation
+    marker = item.get_closest_marker("data_deps")
+    if marker is not None:
+        item.stash[_DATA_DEPS_KEY] = start_data_deps(marker)
+
+
+def _seed_storage_state(request, driver):
+    """Apply the test's ``storage_state`` marker before it navigates anywhere."""
+    marker = request.node.get_closest_marker("storage_state")
+    if marker is None:
+        return None
+    base = marker.kwargs.get("base_url") or os.getenv("TEST_URL", "https://testathon.live/")
+    session, local = marker.kwargs.get("session"), marker.kwargs.get("local")
+    # Overrides built from this test's data_deps results (fetched while the session started)
+    deps = request.node.stash.get(_DATA_DEPS_KEY, {})
+    session = session(deps) if callable(session) else session
+    local = local(deps) if callable(local) else local
+    persona = marker.kwargs.get("persona")
+    if persona:
+        seeding = restore_snapshot(driver, base, persona, session=session, local=local)
+    else:
+        seeding = seed_storage(driver, base, session=session, local=local)
+    request.node.stash[_SEEDING_KEY] = seeding
+    return seeding
+
+
+def _block_resources(request, driver) -> bool:
+    """Apply the test's ``block_resources`` marker; BLOCK_RESOURCES=0 turns all blocking off."""
+    marker = request.node.get_closest_marker("block_resources")
+    if marker is None or not _env_flag("BLOCK_RESOURCES", True):
+        return False
+    return block_resources(driver, marker.args or DEFAULT_CLASSES, extra=marker.kwargs.get("urls") or ())
+
+
+def _prepare_driver(request, driver):
+    """Apply the test's markers to a fresh or pooled session; returns the undo for pooled ones."""
+    blocked = _block_resources(request, driver)
+    seeding = _seed_storage_state(request, driver)
+
+    def undo():
+        remove_seed(driver, seeding)
+        probe.uninstall_probe(driver)
+        if blocked:
+            unblock_resources(driver)
+
+    return undo
+
+
 @pytest.fixture
-def driver(request):
-    use_sdk = os.getenv("USE_BSTACK_SDK", "false").lower() in ("1", "true", "yes")
+def seeded_state(request, driver):
+    """The ``Seeding`` applied for this test's ``storage_state`` marker (None without one)."""
+    return request.node.stash.get(_SEEDING_KEY, None)
+
+
+@pytest.fixture
+def data_deps(request):
+    """Futures for the test's ``data_deps`` marker, by name; call ``.result()`` where the data is needed."""
+    return request.node.stash.get(_DATA_DEPS_KEY, {})
+
+
+@pytest.fixture(scope="session")
+def session_pool():
+    """Warm session pool for the non-SDK path; enabled with BSTACK_SESSION_REUSE=1."""
+    if not _env_flag("BSTACK_SESSION_REUSE"):
+        yield None
+        return
+    global _POOL
+    pool = _POOL = SessionPool(
+        # While waiting for a parallel slot, give back one held by an idle session
+        factory=lambda caps: _create_session(caps, on_wait=lambda: pool.evict_idle()),
+        disposer=_quit_driver,
+        max_uses=int(os.getenv("BSTACK_SESSION_MAX_USES", "20")),
+        # BrowserStack ends sessions left idle for ~90s, which platform grouping makes common
+        is_alive=_is_alive,
+    )
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def driver(request, session_pool):
+    use_sdk = _env_flag("USE_BSTACK_SDK")
 
     if use_sdk:
         # Let the BrowserStack SDK own capabilities, credentials, and hub URL.
@@ -102,18 +541,42 @@ def driver(request):
         browser_name = os.getenv("BROWSER_NAME", "Chrome")
         opts = _options_for_browser(browser_name)
         driver = webdriver.Remote(options=opts)
-    else:
-        # Support per-test overrides via indirect parametrization
-        overrides = getattr(request, 'param', None)
-        caps = build_capabilities(test_name=request.node.name, overrides=overrides if isinstance(overrides, dict) else None)
-        opts = _options_for_browser(caps.get("browserName"))
-        for k, v in caps.items():
-            opts.set_capability(k, v)
+        _prepare_driver(request, driver)
+        yield driver
+        driver.quit()
+        return
 
-        # Non-SDK path: use cloud hub and pass credentials via capabilities (no basic auth in URL)
-        hub = "https://hub-cloud.browserstack.com/wd/hub"
-        driver = webdriver.Remote(command_executor=hub, options=opts)
+    # Support per-test overrides via indirect parametrization
+    overrides = getattr(request, 'param', None)
+    caps = build_capabilities(test_name=request.node.name, overrides=overrides if isinstance(overrides, dict) else None)
 
-    yield driver
+    if session_pool is None:
+        driver = _create_session(caps)
+        if _PREFETCH is not None:
+            _schedule_prefetch(request, capabilities_key(caps), None)
+        _prepare_driver(request, driver)
+        yield driver
+        if _REAPER is not None:
+            _REAPER.submit(driver, label=request.node.nodeid)
+        else:
+            _close_remote(driver)
+        return
 
-    driver.quit()
+    session = session_pool.acquire(caps)
+    if session.uses:
+        # Reused sessions keep the name of the test that created them otherwise
+        _set_session_name(session.driver, request.node.name)
+    if _PREFETCH is not None:
+        _schedule_prefetch(request, session.key, session_pool)
+    undo = _prepare_driver(request, session.driver)
+    yield session.driver
+    # A test that errored (rather than failed an assertion) may have left the session broken
+    healthy = False
+    try:
+        undo()
+        healthy = not request.node.stash.get(_CALL_ERRORED_KEY, False)
+    except Exception:
+        pass  # e.g. the session died during the test; it is disposed below
+    finally:
+        # After its platform's last test an idle session would only hold a slot until the hub times it out
+        session_pool.release(session, healthy=healthy, keep=_needed_later(request, session.key))
@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from api_client import TestathonApi, default_client
+
+
+BASE_URL = os.getenv("TEST_URL", "https://testathon.live/")
+
+# name -> callable(base_url, **params) returning the prepared data
+PROVIDERS: Dict[str, Callable[..., Any]] = {}
+
+
+def provider(name: str):
+    """Register a data provider usable from ``@pytest.mark.data_deps``."""
+    def register(fn):
+        PROVIDERS[name] = fn
+        return fn
+    return register
+
+
+@provider("catalog")
+def catalog(base_url: str):
+    """The product list from /api/products, through the shared catalog cache."""
+    client = default_client()
+    if client.base_url == base_url.rstrip("/"):
+        return client.product_list()
+    # Another site: a one-off client, closed so its connection pool does not linger
+    client = TestathonApi(base_url)
+    try:
+        return client.product_list()
+    finally:
+        client.close()
+
+
+@provider("checkout")
+def checkout(base_url: str, user: str = "demouser", timeout: float = 25) -> requests.Response:
+    """The response of POST /api/checkout for ``user`` (status is left to the test)."""
+    return default_client().post(base_url.rstrip("/") + "/api/checkout", json={"userName": user}, timeout=timeout)
+
+
+@provider("offers")
+def offers(base_url: str, latitude, longitude, user: str = "demouser", timeout: float = 20) -> requests.Response:
+    """The response of GET /api/offers for ``user`` at a coordinate."""
+    params = {"userName": user, "latitude": latitude, "longitude": longitude}
+    return default_client().get(base_url.rstrip("/") + "/api/offers", params=params, timeout=timeout)
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            workers = max(1, int(os.getenv("DATA_DEPS_WORKERS", "8")))
+            _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="data-deps")
+        return _EXECUTOR
+
+
+def start(name: str, base_url: Optional[str] = None, **params) -> Future:
+    """Run provider ``name`` on the shared thread pool; raises KeyError for unknown names."""
+    fn = PROVIDERS[name]
+    return _executor().submit(fn, base_url or BASE_URL, **params)
+
+
+def start_marker(marker) -> Dict[str, Future]:
+    """Start every dependency a ``data_deps`` marker declares.
+
+    Positional names use the provider defaults; keyword arguments map a name to
+    its parameters, e.g. ``data_deps("catalog", offers={"latitude": 40, "longitude": -74})``.
+    """
+    unknown = [n for n in list(marker.args) + list(marker.kwargs) if n not in PROVIDERS]
+    if unknown:
+        raise KeyError(f"Unknown data_deps {unknown}; expected some of {sorted(PROVIDERS)}")
+    futures = {name: start(name) for name in marker.args}
+    for name, params in marker.kwargs.items():
+        futures[name] = start(name, **dict(params or {}))
+    return futures
+
+
+def shutdown() -> None:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
@@ -0,0 +1,211 @@
+import math
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+
+# HTTP_TIMING=0 mounts a plain HTTPAdapter (no DNS pinning, no phase records)
+ENABLED = os.getenv("HTTP_TIMING", "1").strip().lower() not in ("0", "false", "no", "off")
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer")
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class Phases:
+    """Where one HTTP exchange spent its time, in seconds.
+
+    ``dns``/``connect``/``tls`` stay 0 when a pooled connection was reused.
+    ``ttfb`` runs from the request being written to the response headers,
+    i.e. server processing plus one round trip; ``transfer`` is the body read.
+    """
+
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    reused: bool = True
+    headers_at: float = 0.0  # monotonic clock when the headers arrived
+
+    def finish(self, body_read_at: float) -> None:
+        if self.headers_at:
+            self.transfer = max(0.0, body_read_at - self.headers_at)
+
+
+_current = threading.local()
+
+
+def _phases() -> Phases:
+    phases = getattr(_current, "phases", None)
+    if phases is None:  # a connection used outside TimingAdapter.send
+        phases = _current.phases = Phases()
+    return phases
+
+
+class _PhaseMixin:
+    def _new_conn(self):
+        phases = _phases()
+        phases.reused = False
+        start = time.monotonic()
+        host = self._dns_host
+        try:
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            infos = []  # let urllib3 raise its usual NameResolutionError below
+        resolved = time.monotonic()
+        phases.dns = resolved - start
+        # Connect to the addresses just resolved, in order, so the connect phase does not
+        # resolve again; like urllib3, a refused or timed-out address moves on to the next
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        try:
+            if not addresses:
+                return super()._new_conn()
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            phases.connect = time.monotonic() - resolved
+
+    def connect(self):
+        start = time.monotonic()
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            phases = _phases()
+            phases.tls = max(0.0, time.monotonic() - start - phases.dns - phases.connect)
+
+    def getresponse(self, *args, **kwargs):
+        start = time.monotonic()
+        response = super().getresponse(*args, **kwargs)
+        phases = _phases()
+        phases.headers_at = time.monotonic()
+        phases.ttfb = phases.headers_at - start
+        return response
+
+
+class _TimedHTTPConnection(_PhaseMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_PhaseMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connections time DNS, TCP connect, TLS and time to first byte.
+
+    Each response gets a ``phases`` attribute (``Phases``); the caller fills in
+    ``transfer`` once it has read the body. Requests through a proxy use
+    urllib3's own pools and are not broken down.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        phases = _current.phases = Phases()
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            _current.phases = None
+        response.phases = phases
+        return response
+
+
+def make_adapter(pool_connections: int, pool_maxsize: int) -> HTTPAdapter:
+    cls = TimingAdapter if ENABLED else HTTPAdapter
+    return cls(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+
+class CallRecorder:
+    """Collects the calls made on the current thread while recording is on (e.g. during one pytest item)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def start(self) -> list:
+        calls = self._local.calls = []
+        return calls
+
+    def stop(self) -> list:
+        calls = getattr(self._local, "calls", None) or []
+        self._local.calls = None
+        return calls
+
+    def add(self, call) -> None:
+        calls = getattr(self._local, "calls", None)
+        if calls is not None:
+            calls.append(call)
+
+
+RECORDER = CallRecorder()
+
+
+def endpoint(method: str, path: str, limit: int = 60) -> str:
+    """``METHOD /path`` without scheme, host or query, shortened to ``limit`` characters."""
+    path = urlsplit(path).path or "/"
+    if len(path) > limit:
+        path = path[: limit - 3] + "..."
+    return f"{method.upper()} {path}"
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(calls: List[dict]) -> Dict[str, Dict[str, Any]]:
+    """endpoint -> {"n": count, phase/"total": [p50, p90, p99] in seconds} for call dicts with phase fields."""
+    by_endpoint: Dict[str, List[dict]] = {}
+    for call in calls:
+        by_endpoint.setdefault(endpoint(call["method"], call["path"]), []).append(call)
+    summary = {}
+    for name, group in sorted(by_endpoint.items()):
+        row: Dict[str, Any] = {"n": len(group)}
+        for phase in PHASES + ("elapsed",):
+            values = [c.get(phase) or 0.0 for c in group]
+            row["total" if phase == "elapsed" else phase] = [percentile(values, p) for p in PERCENTILES]
+        summary[name] = row
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> List[str]:
+    lines = []
+    for name, row in summary.items():
+        def ms(key: str) -> str:
+            return "/".join(f"{v * 1000:.0f}" for v in row[key])
+        phases = "  ".join(f"{phase} {ms(phase)}" for phase in PHASES)
+        lines.append(f"  {name}  n={row['n']}  total {ms('total')}")
+        lines.append(f"      {phases}")
+    return lines
+
@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from selenium.webdriver.common.by import By
+
+
+Strategy = Tuple[str, str]
+
+
+@dataclass
+class LocatorMatch:
+    elements: List = field(default_factory=list)
+    strategy: Optional[Strategy] = None
+    index: int = -1
+
+    def __bool__(self) -> bool:
+        return bool(self.elements)
+
+    @property
+    def first(self):
+        return self.elements[0] if self.elements else None
+
+
+# Evaluates a ranked list of [kind, selector] pairs inside the page, in order.
+# arguments: strategies, root element (or null for document), options
+RANKED_FIND_JS = r"""
+var strategies = arguments[0], root = arguments[1] || document, opts = arguments[2] || {};
+function shown(el) {
+  if (!el || el.nodeType !== 1 || !el.isConnected) return false;
+  var st = window.getComputedStyle(el);
+  if (st.display === 'none' || st.visibility === 'hidden' || st.visibility === 'collapse') return false;
+  if (parseFloat(st.opacity || '1') === 0) return false;
+  var r = el.getBoundingClientRect();
+  return r.width > 0 && r.height > 0;
+}
+function accept(el) {
+  if (!el || el.nodeType !== 1) return false;
+  if (opts.visible && !shown(el)) return false;
+  if (opts.enabled && el.disabled) return false;
+  if (opts.requireText && !((el.innerText || el.textContent || '').trim())) return false;
+  return true;
+}
+function run(kind, sel) {
+  var out = [];
+  if (kind === 'xpath') {
+    var snap = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+  } else {
+    out = Array.prototype.slice.call(root.querySelectorAll(sel));
+  }
+  return out;
+}
+var found = [], firstIndex = -1, seen = new Set();
+for (var s = 0; s < strategies.length; s++) {
+  var hits;
+  try { hits = run(strategies[s][0], strategies[s][1]).filter(accept); } catch (e) { continue; }
+  if (!hits.length) continue;
+  if (firstIndex < 0) firstIndex = s;
+  for (var h = 0; h < hits.length; h++) {
+    if (seen.has(hits[h])) continue;
+    seen.add(hits[h]);
+    found.push(hits[h]);
+    if (opts.limit && found.length >= opts.limit) break;
+  }
+  if (opts.firstOnly || (opts.limit && found.length >= opts.limit)) break;
+}
+return {index: firstIndex, elements: found};
+"""
+
+
+def _xpath_literal(s: str) -> str:
+    if "'" not in s:
+        return f"'{s}'"
+    if '"' not in s:
+        return f'"{s}"'
+    return "concat('" + s.replace("'", "',\"'\",'") + "')"
+
+
+def _normalize(strategy: Strategy) -> Tuple[str, str]:
+    """Map any selenium ``By`` strategy onto the two kinds the page script knows."""
+    by, sel = strategy
+    if by == By.XPATH:
+        return "xpath", sel
+    if by == By.CSS_SELECTOR:
+        return "css", sel
+    if by == By.ID:
+        return "css", f'[id="{sel}"]'
+    if by == By.NAME:
+        return "css", f'[name="{sel}"]'
+    if by == By.CLASS_NAME:
+        return "css", "." + sel.strip().replace(" ", ".")
+    if by == By.TAG_NAME:
+        return "css", sel
+    if by == By.LINK_TEXT:
+        return "xpath", f".//a[normalize-space(.)={_xpath_literal(sel)}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return "xpath", f".//a[contains(., {_xpath_literal(sel)})]"
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+def find_ranked(
+    driver,
+    strategies: Sequence[Strategy],
+    root=None,
+    *,
+    visible: bool = True,
+    enabled: bool = False,
+    require_text: bool = False,
+    first_only: bool = True,
+    limit: Optional[int] = None,
+) -> LocatorMatch:
+    """Evaluate ``strategies`` in order inside the page in one round trip.
+
+    With ``first_only`` the elements of the first strategy that has any accepted
+    match are returned; otherwise matches of all strategies are concatenated
+    (deduplicated, in strategy order). Visibility, enabled state and non-empty
+    text are checked in the browser so no per-element ``is_displayed`` calls
+    are needed. ``root`` scopes CSS and relative XPath to an element.
+    """
+    if not strategies:
+        return LocatorMatch()
+    payload = [list(_normalize(s)) for s in strategies]
+    opts = {
+        "visible": visible,
+        "enabled": enabled,
+        "requireText": require_text,
+        "firstOnly": first_only,
+        "limit": limit or 0,
+    }
+    res = driver.execute_script(RANKED_FIND_JS, payload, root, opts) or {}
+    index = int(res.get("index", -1))
+    return LocatorMatch(
+        elements=list(res.get("elements") or []),
+        strategy=tuple(strategies[index]) if index >= 0 else None,
+        index=index,
+    )
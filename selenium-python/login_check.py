@@ -1,17 +1,31 @@
 import os
+import queue
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Tuple
 
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from artifacts import capture_page
+from locators import find_ranked
+from login_strategy import STRATEGIES, LoginStrategy
+from probe import page_contains
+from waits import wait_until
+
 
 def getenv_bool(key: str, default: bool = False) -> bool:
     v = os.getenv(key)
@@ -20,21 +34,53 @@ def getenv_bool(key: str, default: bool = False) -> bool:
     return v.strip().lower() in {"1", "true", "yes", "on"}
 
 
+@dataclass
+class FindResult:
+    element: object
+    locator: Tuple[By, str]
+    elapsed: float
+
+
+def race_find(
+    driver,
+    locators: List[Tuple[By, str]],
+    timeout: float = 10,
+    *,
+    visible: bool = False,
+    clickable: bool = False,
+    poll: float = 0.25,
+) -> FindResult:
+    """Wait once for whichever locator is satisfied first.
+
+    Every poll evaluates all locators in one in-page call, so the worst case is a
+    single ``timeout`` rather than one per locator. Earlier locators win ties.
+    """
+    if not locators:
+        raise RuntimeError("No locators provided")
+    start = time.monotonic()
+
+    def any_ready(d):
+        match = find_ranked(d, locators, visible=visible or clickable, enabled=clickable, limit=1)
+        return match if match else False
+
+    try:
+        match = WebDriverWait(
+            driver,
+            timeout,
+            poll_frequency=poll,
+            ignored_exceptions=(JavascriptException, NoSuchElementException, StaleElementReferenceException),
+        ).until(any_ready)
+    except TimeoutException:
+        tried = ", ".join(sel for _, sel in locators)
+        raise TimeoutException(f"None of {len(locators)} locators matched within {timeout}s: {tried}")
+    result = FindResult(element=match.first, locator=match.strategy, elapsed=time.monotonic() - start)
+    if os.getenv("DEBUG_LOGIN"):
+        print(f"DEBUG race_find won by {result.locator[1]!r} after {result.elapsed:.2f}s")
+    return result
+
+
 def try_find(driver, locators: List[Tuple[By, str]], timeout: float = 10, *, visible: bool = False, clickable: bool = False):
-    last_err: Optional[Exception] = None
-    for by, sel in locators:
-        try:
-            cond = (
-                EC.element_to_be_clickable((by, sel)) if clickable
-                else EC.visibility_of_element_located((by, sel)) if visible
-                else EC.presence_of_element_located((by, sel))
-            )
-            return WebDriverWait(driver, timeout).until(cond)
-        except Exception as e:
-            last_err = e
-    if last_err:
-        raise last_err
-    raise RuntimeError("No locators provided")
+    return race_find(driver, locators, timeout, visible=visible, clickable=clickable).element
 
 
 def click_first(driver, locators: List[Tuple[By, str]], timeout: float = 10):
@@ -67,17 +113,120 @@ class LoginResult:
     ok: bool
     reason: str
     url_after: str
+    elapsed: float = 0.0  # seconds spent in attempt_login
+
+
+# Resolves once a submitted sign-in form had a visible effect
+_SUBMIT_REACTED_JS = r"""
+if (location.pathname.indexOf('/signin') === -1) return 'nav';
+var wrap = document.querySelector('.login_wrapper') || document.body;
+return /invalid|incorrect|locked/i.test((wrap && wrap.innerText) || '') ? 'message' : null;
+"""
+
+
+def _select_react(driver, username: str, password: str) -> bool:
+    """Pick username and password in the two react-select comboboxes; False when the page has none."""
+    inputs = driver.find_elements(By.CSS_SELECTOR, "input[aria-autocomplete='list']")
+    if os.getenv("DEBUG_LOGIN"):
+        print(f"DEBUG react-select inputs found: {len(inputs)}")
+    if len(inputs) < 2:
+        return False
+    for in_el, value in zip(inputs, (username, password)):
+        in_el.click()
+        # clear any filter then type
+        try:
+            in_el.send_keys(Keys.COMMAND, 'a')
+        except Exception:
+            try:
+                in_el.send_keys(Keys.CONTROL, 'a')
+            except Exception:
+                pass
+        in_el.send_keys(Keys.BACKSPACE)
+        in_el.send_keys(value)
+        # Try keyboard selection: ArrowDown + Enter
+        try:
+            in_el.send_keys(Keys.ARROW_DOWN)
+            in_el.send_keys(Keys.ENTER)
+        except Exception:
+            # Fallback: click matching option explicitly
+            try:
+                opt = WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable((By.XPATH, f"//div[@role='option' and normalize-space()='{value}']"))
+                )
+                opt.click()
+            except Exception:
+                try:
+                    # Choose the first visible option
+                    opt = WebDriverWait(driver, 3).until(
+                        EC.element_to_be_clickable((By.XPATH, "(//div[@role='option'])[1]"))
+                    )
+                    opt.click()
+                except Exception:
+                    # Last resort: press Enter
+                    in_el.send_keys(Keys.ENTER)
+        try:
+            in_el.send_keys(Keys.ESCAPE)
+        except Exception:
+            pass
+        time.sleep(0.2)
+    return True
+
+
+def _pick_tile(driver, username: str) -> bool:
+    """Click a selectable tile labelled with ``username``; False when there is none."""
+    try:
+        user_choice = try_find(
+            driver,
+            [
+                (By.XPATH, f"//*[normalize-space()='{username}']"),
+                (By.XPATH, f"//div[contains(@class,'user')][normalize-space()='{username}']"),
+            ],
+            timeout=3,
+            clickable=True,
+        )
+        user_choice.click()
+        return True
+    except Exception:
+        return False
+
+
+def _submit_form(driver) -> bool:
+    try:
+        return bool(driver.execute_script(
+            "var c=document.querySelector('.login_wrapper form')||document.querySelector('form'); if(c){ if(c.requestSubmit){c.requestSubmit();} else {c.submit();} return true; } return false;"
+        ))
+    except Exception:
+        return False
+
+
+def _submit_cascade(driver, pass_el, submit_locators) -> Tuple[str, bool]:
+    """Submit the sign-in form the first way that works; returns (how, confirmed).
+
+    ``confirmed`` is False when a form submit went out but the page did not react
+    within the short wait: the later button click or Enter may then only have
+    repeated a slow submit, so the outcome says nothing about which way works.
+    """
+    # Try form submit via JS first (more robust for React/Next forms); it is
+    # enough when the page reacts (leaves /signin or shows a message) promptly
+    form_sent = _submit_form(driver)
+    if form_sent and wait_until(driver, _SUBMIT_REACTED_JS, 1.0):
+        return "form", True
+    # Then try clicking a visible submit element
+    try:
+        click_first(driver, submit_locators, timeout=3)
+        return "button", not form_sent
+    except Exception:
+        # Finally press Enter in the password field
+        pass_el.send_keys(Keys.ENTER)
+        return "enter", not form_sent
 
 
 def attempt_login(driver, base_url: str, username: str, password: str) -> LoginResult:
+    started = time.monotonic()
     signin_url = base_url.rstrip("/") + "/signin"
     driver.get(signin_url)
-    try:
-        os.makedirs(os.path.join(os.path.dirname(__file__), "..", "log"), exist_ok=True)
-        with open(os.path.join(os.path.dirname(__file__), "..", "log", "login_page_before.html"), "w") as f:
-            f.write(driver.page_source)
-    except Exception:
-        pass
+    # The sign-in page before the attempt is the same for everyone; only kept with LOGIN_ARTIFACTS=always
+    capture_page(driver, "login_page_before.html", failed=False, username=username)
 
     # Heuristic waits for interactive inputs
     username_locators = [
@@ -100,70 +249,41 @@ def attempt_login(driver, base_url: str, username: str, password: str) -> LoginR
         (By.CSS_SELECTOR, "input[type='submit']"),
     ]
 
-    # Preferred path: two react-select comboboxes (username, password)
+    # Fill the form with the strategy learned for this site/browser/build, or detect it
+    build_id = STRATEGIES.build_id(driver)
+    strategy = STRATEGIES.lookup(driver, base_url, build_id)
     user_el = None
-    try:
-        inputs = driver.find_elements(By.CSS_SELECTOR, "input[aria-autocomplete='list']")
-        if os.getenv("DEBUG_LOGIN"):
-            print(f"DEBUG react-select inputs found: {len(inputs)}")
-        targets = [(0, username), (1, password)]
-        for idx, value in targets:
-            if len(inputs) <= idx:
-                continue
-            in_el = inputs[idx]
-            in_el.click()
-            # clear any filter then type
-            try:
-                in_el.send_keys(Keys.COMMAND, 'a')
-            except Exception:
-                try:
-                    in_el.send_keys(Keys.CONTROL, 'a')
-                except Exception:
-                    pass
-            in_el.send_keys(Keys.BACKSPACE)
-            in_el.send_keys(value)
-            # Try keyboard selection: ArrowDown + Enter
-            try:
-                in_el.send_keys(Keys.ARROW_DOWN)
-                in_el.send_keys(Keys.ENTER)
-            except Exception:
-                # Fallback: click matching option explicitly
-                try:
-                    opt = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, f"//div[@role='option' and normalize-space()='{value}']"))
-                    )
-                    opt.click()
-                except Exception:
-                    try:
-                        # Choose the first visible option
-                        opt = WebDriverWait(driver, 3).until(
-                            EC.element_to_be_clickable((By.XPATH, "(//div[@role='option'])[1]"))
-                        )
-                        opt.click()
-                    except Exception:
-                        # Last resort: press Enter
-                        in_el.send_keys(Keys.ENTER)
-            try:
-                in_el.send_keys(Keys.ESCAPE)
-            except Exception:
-                pass
-            time.sleep(0.2)
-    except Exception:
-        # Fallbacks: selectable tiles or plain input
+    fields = None
+    if strategy is not None:
         try:
-            user_choice = try_find(
-                driver,
-                [
-                    (By.XPATH, f"//*[normalize-space()='{username}']"),
-                    (By.XPATH, f"//div[contains(@class,'user')][normalize-space()='{username}']"),
-                ],
-                timeout=3,
-                clickable=True,
-            )
-            user_choice.click()
+            if strategy.fields == "react-select":
+                fields = "react-select" if _select_react(driver, username, password) else None
+            elif strategy.fields == "tiles":
+                fields = "tiles" if _pick_tile(driver, username) else None
+            else:
+                user_el = try_find(driver, username_locators, timeout=3, visible=True)
+                fields = "inputs"
         except Exception:
+            fields = None
+        if fields is None:
+            # The page no longer matches what was learned; detect again
+            STRATEGIES.forget(driver, base_url)
+            strategy = None
+    if fields is None:
+        # Preferred path: two react-select comboboxes (username, password)
+        try:
+            if _select_react(driver, username, password):
+                fields = "react-select"
+        except Exception:
+            pass
+    if fields is None:
+        # Fallbacks: selectable tiles or plain input
+        if _pick_tile(driver, username):
+            fields = "tiles"
+        else:
             try:
                 user_el = try_find(driver, username_locators, timeout=3, visible=True)
+                fields = "inputs"
             except Exception:
                 user_el = None
     pass_el = try_find(driver, password_locators, timeout=15, visible=True)
@@ -196,21 +316,30 @@ def attempt_login(driver, base_url: str, username: str, password: str) -> LoginR
     except Exception:
         pass
 
-    # Try form submit via JS first (more robust for React/Next forms)
-    try:
-        driver.execute_script(
-            "var c=document.querySelector('.login_wrapper form')||document.querySelector('form'); if(c){ if(c.requestSubmit){c.requestSubmit();} else {c.submit();} }"
-        )
-        time.sleep(0.5)
-    except Exception:
-        pass
-
-    # Then try clicking a visible submit element
-    try:
-        click_first(driver, submit_locators, timeout=3)
-    except Exception:
-        # Finally press Enter in the password field
-        pass_el.send_keys(Keys.ENTER)
+    submit = None
+    if strategy is not None:
+        # Once the learned submit went out, the outcome wait below decides; running the cascade
+        # on a slow page would submit twice. Only a missing submit control means it went stale.
+        try:
+            if strategy.submit == "form":
+                sent = _submit_form(driver)
+            elif strategy.submit == "button":
+                click_first(driver, submit_locators, timeout=3)
+                sent = True
+            else:
+                pass_el.send_keys(Keys.ENTER)
+                sent = True
+        except Exception:
+            sent = False
+        if sent:
+            submit = strategy.submit
+        else:
+            STRATEGIES.forget(driver, base_url)
+            strategy = None
+    # Whether the page's reaction can be credited to ``submit`` (only those are learned)
+    confirmed = submit is not None
+    if submit is None:
+        submit, confirmed = _submit_cascade(driver, pass_el, submit_locators)
 
     # Success criteria: navigates away from /signin or shows logout/user indicator
     def any_success(d):
@@ -226,14 +355,9 @@ def attempt_login(driver, base_url: str, username: str, password: str) -> LoginR
             pass
         return False
 
+    # Error text is looked for in the page; only the verdict comes back over the wire
     def any_error(d):
-        text = ""
-        try:
-            wrap = d.find_element(By.CSS_SELECTOR, ".login_wrapper")
-            text = (wrap.text or "").lower()
-        except Exception:
-            text = (d.page_source or "").lower()
-        return any(s in text for s in ["invalid", "incorrect", "locked"])
+        return bool(page_contains(d, "invalid", "incorrect", "locked", scope=".login_wrapper", source="html"))
 
     ok = False
     reason = "timeout"
@@ -247,24 +371,22 @@ def attempt_login(driver, base_url: str, username: str, password: str) -> LoginR
         url_after = driver.current_url
         err = any_error(driver)
         succ = any_success(driver)
+        if (err or succ) and fields is not None and confirmed:
+            # The page reacted to this submit, so the way the form was filled and submitted works here
+            STRATEGIES.store(driver, base_url, LoginStrategy(fields=fields, submit=submit, build_id=build_id))
         if err:
             # Inspect page text to decide if we can simulate login
-            page_text = ""
             try:
-                wrap = driver.find_element(By.CSS_SELECTOR, ".login_wrapper")
-                page_text = (wrap.text or "").lower()
+                found = set(page_contains(
+                    driver, "invalid username", "invalid", "locked", scope=".login_wrapper", source="html"
+                ).found)
             except Exception:
-                try:
-                    page_text = (driver.page_source or "").lower()
-                except Exception:
-                    page_text = ""
+                found = set()
 
             # The live site currently rejects all usernames with "Invalid Username".
             # For tests that need an authenticated session, simulate login by
             # seeding sessionStorage.username when this benign error appears.
-            if ("invalid username" in page_text) or (
-                ("invalid" in page_text) and ("locked" not in page_text)
-            ):
+            if ("invalid username" in found) or (("invalid" in found) and ("locked" not in found)):
                 # Do NOT simulate success for the explicitly locked user
                 locked_name = os.getenv("TEST_USER_LOCKED", "locked_user") or "locked_user"
                 if username.strip().lower() == locked_name.strip().lower():
@@ -294,13 +416,11 @@ def attempt_login(driver, base_url: str, username: str, password: str) -> LoginR
                 ok = True
                 reason = "success"
 
-    try:
-        with open(os.path.join(os.path.dirname(__file__), "..", "log", f"login_page_after_{username}.html"), "w") as f:
-            f.write(driver.page_source)
-    except Exception:
-        pass
+    capture_page(driver, f"login_page_after_{username}.html", failed=not ok, username=username, reason=reason)
 
-    return LoginResult(username=username, ok=ok, reason=reason, url_after=url_after)
+    return LoginResult(
+        username=username, ok=ok, reason=reason, url_after=url_after, elapsed=time.monotonic() - started
+    )
 
 
 def get_env_users() -> List[str]:
@@ -319,6 +439,112 @@ def get_env_users() -> List[str]:
     return users
 
 
+def _verify_user(driver, base_url: str, username: str, password: str, debug: bool) -> LoginResult:
+    res = attempt_login(driver, base_url, username, password)
+    if debug:
+        try:
+            wrap_text = driver.find_element(By.CSS_SELECTOR, ".login_wrapper").text
+        except Exception:
+            wrap_text = ""
+        cookies = ", ".join(sorted([c.get("name","?") for c in driver.get_cookies()]))
+        print(f"DEBUG {username}: wrapper_text='{wrap_text[:120]}' cookies=[{cookies}]")
+    # If success, try to log out to reset state for next user
+    if res.ok:
+        # common logout patterns
+        candidates = [
+            (By.XPATH, "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'logout')]") ,
+            (By.XPATH, "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'logout')]") ,
+        ]
+        try:
+            click_first(driver, candidates, timeout=3)
+            WebDriverWait(driver, 5).until(EC.url_contains("signin"))
+        except Exception:
+            pass
+    return res
+
+
+def _reset_state(driver) -> None:
+    """Drop cookies and storage a previous user may have left in a pooled browser."""
+    try:
+        driver.delete_all_cookies()
+        driver.execute_script("try { sessionStorage.clear(); localStorage.clear(); } catch (e) {}")
+    except Exception:
+        pass
+
+
+def _parse_args(argv: List[str]) -> Tuple[List[str], int]:
+    """Split ``argv`` into usernames and the number of browsers to use.
+
+    ``--parallel=N``, ``--parallel N``, ``-jN`` and ``-j N`` win over
+    LOGIN_PARALLEL; 1 keeps the single-browser sequential run. Other options are
+    ignored, and the value after a parallelism flag is never taken as a username.
+    """
+    value = os.getenv("LOGIN_PARALLEL", "1")
+    users: List[str] = []
+    args = iter(argv[1:])
+    for a in args:
+        if a.startswith("--parallel="):
+            value = a.split("=", 1)[1]
+        elif a.startswith("-j") and len(a) > 2:
+            value = a[2:]
+        elif a in ("--parallel", "-j"):
+            value = next(args, value)
+        elif not a.startswith("-"):
+            users.append(a)
+    try:
+        workers = max(1, int(value))
+    except ValueError:
+        workers = 1
+    return users, workers
+
+
+def run_parallel(
+    users: List[str], base_url: str, password: str, workers: int, headless: bool = True, debug: bool = False
+) -> List[LoginResult]:
+    """Verify ``users`` concurrently on at most ``workers`` browsers; results keep the order of ``users``.
+
+    Browsers are started on demand and handed from one user to the next through
+    a pool, with cookies and storage cleared in between, so each attempt starts
+    from a clean session. An attempt that crashes its browser is reported as a
+    failure and the browser is replaced.
+    """
+    pool: "queue.Queue" = queue.Queue()
+    drivers = []
+
+    def verify(username: str) -> LoginResult:
+        try:
+            driver = pool.get_nowait()
+        except queue.Empty:
+            driver = build_driver(headless=headless)
+            drivers.append(driver)
+        _reset_state(driver)
+        started = time.monotonic()
+        try:
+            res = _verify_user(driver, base_url, username, password, debug)
+        except Exception as e:
+            drivers.remove(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return LoginResult(
+                username=username, ok=False, reason=f"error: {type(e).__name__}", url_after="",
+                elapsed=time.monotonic() - started,
+            )
+        pool.put(driver)
+        return res
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(users)), thread_name_prefix="login") as ex:
+            return list(ex.map(verify, users))
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
 def main(argv: List[str]) -> int:
     # Load env from repo root .env
     here = os.path.dirname(__file__)
@@ -328,7 +554,7 @@ def main(argv: List[str]) -> int:
     password = os.getenv("TEST_USER_PASSWORD", "testingisfun99")
 
     # Allow passing a specific username via args
-    cli_users = [a for a in argv[1:] if not a.startswith("-")]
+    cli_users, workers = _parse_args(argv)
     users = cli_users if cli_users else get_env_users()
     if not users:
         print("No users provided via args or env.")
@@ -337,42 +563,25 @@ def main(argv: List[str]) -> int:
     headless = not getenv_bool("SHOW_BROWSER", False)
     debug = getenv_bool("DEBUG_LOGIN", False)
 
-    driver = build_driver(headless=headless)
-    try:
-        results: List[LoginResult] = []
-        for u in users:
-            res = attempt_login(driver, base_url, u, password)
-            if debug:
-                try:
-                    wrap_text = driver.find_element(By.CSS_SELECTOR, ".login_wrapper").text
-                except Exception:
-                    wrap_text = ""
-                cookies = ", ".join(sorted([c.get("name","?") for c in driver.get_cookies()]))
-                print(f"DEBUG {u}: wrapper_text='{wrap_text[:120]}' cookies=[{cookies}]")
-            results.append(res)
-            # If success, try to log out to reset state for next user
-            if res.ok:
-                # common logout patterns
-                candidates = [
-                    (By.XPATH, "//a[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'logout')]") ,
-                    (By.XPATH, "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'logout')]") ,
-                ]
-                try:
-                    click_first(driver, candidates, timeout=3)
-                    WebDriverWait(driver, 5).until(EC.url_contains("signin"))
-                except Exception:
-                    pass
-
-        # Print concise summary
-        for r in results:
-            status = "OK" if r.ok else "FAIL"
-            print(f"[{status}] {r.username} -> {r.reason} | {r.url_after}")
-
-        # Non-zero exit if any failure except locked user which is expected to fail
-        failures = [r for r in results if not r.ok and r.username != os.getenv("TEST_USER_LOCKED", "locked_user")]
-        return 0 if not failures else 1
-    finally:
-        driver.quit()
+    started = time.monotonic()
+    if workers > 1:
+        results = run_parallel(users, base_url, password, workers, headless=headless, debug=debug)
+    else:
+        driver = build_driver(headless=headless)
+        try:
+            results = [_verify_user(driver, base_url, u, password, debug) for u in users]
+        finally:
+            driver.quit()
+
+    # Print concise summary
+    for r in results:
+        status = "OK" if r.ok else "FAIL"
+        print(f"[{status}] {r.username} -> {r.reason} | {r.url_after} ({r.elapsed:.1f}s)")
+    print(f"{len(results)} user(s) in {time.monotonic() - started:.1f}s with {min(workers, len(users))} browser(s)")
+
+    # Non-zero exit if any failure except locked user which is expected to fail
+    failures = [r for r in results if not r.ok and r.username != os.getenv("TEST_USER_LOCKED", "locked_user")]
+    return 0 if not failures else 1
 
 
 if __name__ == "__main__":
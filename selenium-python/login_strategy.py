@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "login_strategy.json")
+
+BUILD_ID_JS = "return (window.__NEXT_DATA__ && window.__NEXT_DATA__.buildId) || null;"
+
+# How attempt_login fills the form and how it submits it
+FIELD_STRATEGIES = ("react-select", "tiles", "inputs")
+SUBMIT_STRATEGIES = ("form", "button", "enter")
+
+
+def browser_family(driver) -> str:
+    caps = getattr(driver, "capabilities", None) or {}
+    name = str(caps.get("browserName") or "unknown").lower()
+    return {"microsoftedge": "edge", "msedge": "edge"}.get(name, name)
+
+
+@dataclass
+class LoginStrategy:
+    fields: str
+    submit: str
+    build_id: Optional[str] = None
+
+
+class StrategyCache:
+    """Remembers which sign-in widget variant a site renders, per base URL and browser.
+
+    An entry is only trusted while the page reports the same Next.js build id
+    it was learned on; a new build goes back to the full detection cascade.
+    Entries persist in a small JSON file so later runs skip detection too.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True):
+        self.path = os.path.abspath(path or DEFAULT_PATH)
+        self.enabled = enabled
+        self._data: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("bad cache file")
+            except (OSError, ValueError):
+                data = {}
+            self._data = data
+        return self._data
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _key(driver, base_url: str) -> str:
+        return f"{base_url.rstrip('/')}|{browser_family(driver)}"
+
+    @staticmethod
+    def build_id(driver) -> Optional[str]:
+        try:
+            return driver.execute_script(BUILD_ID_JS)
+        except Exception:
+            return None
+
+    def lookup(self, driver, base_url: str, build_id: Optional[str]) -> Optional[LoginStrategy]:
+        """The strategy learned for this site and browser, if it was learned on ``build_id``."""
+        if not self.enabled or not build_id:
+            return None
+        with self._lock:
+            entry = self._load().get(self._key(driver, base_url))
+        if not entry or entry.get("build_id") != build_id:
+            return None
+        if entry.get("fields") not in FIELD_STRATEGIES or entry.get("submit") not in SUBMIT_STRATEGIES:
+            return None
+        return LoginStrategy(fields=entry["fields"], submit=entry["submit"], build_id=build_id)
+
+    def store(self, driver, base_url: str, strategy: LoginStrategy) -> None:
+        if not self.enabled or not strategy.build_id:
+            return
+        key = self._key(driver, base_url)
+        with self._lock:
+            data = self._load()
+            if data.get(key) == asdict(strategy):
+                return
+            data[key] = asdict(strategy)
+            self._save()
+
+    def forget(self, driver, base_url: str) -> None:
+        with self._lock:
+            if self._load().pop(self._key(driver, base_url), None) is not None:
+                self._save()
+
+
+STRATEGIES = StrategyCache(
+    path=os.getenv("LOGIN_STRATEGY_CACHE_PATH") or None,
+    enabled=os.getenv("LOGIN_STRATEGY_CACHE", "1").strip().lower() not in ("0", "false", "no", "off"),
+)
@@ -0,0 +1,116 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from session_pool import capabilities_key
+
+
+@dataclass
+class PrefetchStats:
+    started: int = 0
+    hits: int = 0
+    failed: int = 0
+    wasted: int = 0
+
+
+@dataclass
+class _Entry:
+    key: str
+    session_name: str
+    future: Future
+
+
+class SessionPrefetcher:
+    """Starts remote sessions for upcoming tests on background threads.
+
+    ``schedule`` is called while a test runs with the capabilities of the next few
+    tests; at most ``depth`` sessions are booting or waiting at any time so idle
+    prefetched sessions cannot eat the parallel quota. ``take`` hands a prefetched
+    session to the test that needs it, waiting for it if it is still booting.
+    Creation errors are swallowed: the caller just creates the session itself.
+    """
+
+    def __init__(self, factory: Callable[[dict], object], disposer: Callable[[object], None], depth: int = 1):
+        self._factory = factory
+        self._disposer = disposer
+        self.depth = max(1, int(depth))
+        self._entries: List[_Entry] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="wd-prefetch")
+        self.stats = PrefetchStats()
+
+    def schedule(self, upcoming: Iterable[dict]) -> int:
+        """Start sessions for ``upcoming`` capability sets not already covered.
+        Returns how many new sessions were started."""
+        wanted = [(capabilities_key(c), c) for c in upcoming][: self.depth]
+        started = 0
+        with self._lock:
+            # Drop sessions that failed to boot so they do not hold lookahead room
+            for e in [e for e in self._entries if e.future.done() and e.future.exception() is not None]:
+                self._entries.remove(e)
+                self.stats.failed += 1
+            # Sessions no upcoming test needs any more (their test was skipped, deselected or
+            # failed before taking one) would hold lookahead room and a parallel slot until the end
+            need = Counter(key for key, _ in wanted)
+            stale = []
+            for e in self._entries:
+                if need[e.key] > 0:
+                    need[e.key] -= 1
+                else:
+                    stale.append(e)
+            for e in stale:
+                self._entries.remove(e)
+            have = Counter(e.key for e in self._entries)
+            for key, caps in wanted:
+                if have[key] > 0:
+                    have[key] -= 1
+                    continue
+                if len(self._entries) >= self.depth:
+                    break
+                name = (caps.get("bstack:options") or {}).get("sessionName") or ""
+                future = self._executor.submit(self._factory, caps)
+                self._entries.append(_Entry(key=key, session_name=name, future=future))
+                started += 1
+        self.stats.started += started
+        for e in stale:
+            self._discard(e)
+        return started
+
+    def _discard(self, entry: _Entry) -> None:
+        """Dispose of an unused prefetched session, once it has finished booting."""
+        if entry.future.cancel():
+            return
+
+        def dispose(future: Future) -> None:
+            try:
+                driver = future.result()
+            except Exception:
+                return
+            self.stats.wasted += 1
+            self._disposer(driver)
+
+        entry.future.add_done_callback(dispose)
+
+    def take(self, key: str) -> Optional[Tuple[object, str]]:
+        """Return ``(driver, session_name)`` for a prefetched session matching ``key``."""
+        with self._lock:
+            entry = next((e for e in self._entries if e.key == key), None)
+            if entry is None:
+                return None
+            self._entries.remove(entry)
+        try:
+            driver = entry.future.result()
+        except Exception:
+            self.stats.failed += 1
+            return None
+        self.stats.hits += 1
+        return driver, entry.session_name
+
+    def close(self) -> None:
+        with self._lock:
+            entries, self._entries = self._entries, []
+        for e in entries:
+            self._discard(e)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,332 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from cdp import CdpUnavailable, cdp_supported, execute_cdp
+
+
+PROBE_VERSION = 3
+
+# Helper bundle installed once per document as ``window.__probe``. Results of the
+# scanners are memoized per mutation epoch: the epoch moves on every DOM mutation
+# and storage write, so a repeated probe on an unchanged page costs nothing.
+PROBE_JS = r"""
+(function (version) {
+  if (window.__probe && window.__probe.version === version) return;
+  var epoch = 0, cache = {}, requests = [];
+  function bump() { epoch++; }
+  try {
+    new MutationObserver(bump).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  } catch (e) {}
+  try { window.addEventListener('storage', bump); } catch (e) {}
+  if (!window.__probeStorageHooked) {
+    window.__probeStorageHooked = true;
+    ['setItem', 'removeItem', 'clear'].forEach(function (name) {
+      var orig = Storage.prototype[name];
+      Storage.prototype[name] = function () {
+        var r = orig.apply(this, arguments);
+        if (window.__probe) window.__probe._bump();
+        return r;
+      };
+    });
+  }
+  function memo(key, fn) {
+    var hit = cache[key];
+    if (hit && hit.epoch === epoch) return hit.value;
+    var value = fn();
+    cache[key] = {epoch: epoch, value: value};
+    return value;
+  }
+  function norm(s) { return (s || '').toString().trim(); }
+  function low(s) { return norm(s).toLowerCase(); }
+  function parse(v) { try { return JSON.parse(v); } catch (e) { return null; } }
+  function record(url) { try { if (url) requests.push(String(url)); } catch (e) {} }
+  // Text an assertion looks at: the scope element's text, else the body text or the page source
+  function scopeText(scope, source) {
+    return memo('text:' + (scope || '') + ':' + source, function () {
+      var el = scope ? document.querySelector(scope) : null;
+      if (el) return el.innerText || el.textContent || '';
+      if (source === 'html') return document.documentElement ? document.documentElement.outerHTML : '';
+      return document.body ? (document.body.innerText || document.body.textContent || '') : '';
+    });
+  }
+  // UTF-8 size of a string, i.e. what returning it over the wire would cost
+  function utf8Length(s) {
+    var n = 0;
+    for (var i = 0; i < s.length; i++) {
+      var c = s.charCodeAt(i);
+      if (c < 0x80) n += 1;
+      else if (c < 0x800) n += 2;
+      else if (c >= 0xD800 && c < 0xDC00 && i + 1 < s.length) { n += 4; i++; }
+      else n += 3;
+    }
+    return n;
+  }
+  function scopeBytes(scope, source) {
+    return memo('bytes:' + (scope || '') + ':' + source, function () { return utf8Length(scopeText(scope, source)); });
+  }
+  function excerpt(text, at, len) {
+    var a = Math.max(0, at - 30), b = Math.min(text.length, at + len + 30);
+    return (a > 0 ? '...' : '') + text.slice(a, b).replace(/\s+/g, ' ') + (b < text.length ? '...' : '');
+  }
+  function verdict(found, text, at, len, scanned) {
+    return {ok: found.length > 0, found: found, excerpt: at >= 0 ? excerpt(text, at, len) : '', scanned: scanned};
+  }
+
+  var api = {
+    version: version,
+    epoch: function () { return epoch; },
+    _bump: bump,
+
+    // Text of the element that most looks like the cart count badge, or null
+    cartBadge: function () {
+      return memo('cartBadge', function () {
+        var cartish = /(cart|bag|basket|checkout)/;
+        var all = Array.prototype.slice.call(document.querySelectorAll('a,button,div,span,i,em,b,strong'));
+        var withDigits = all.filter(function (el) {
+          return (cartish.test(low(el.getAttribute('aria-label'))) || cartish.test(low(el.getAttribute('title')))
+                  || cartish.test(low(typeof el.className === 'string' ? el.className : ''))
+                  || cartish.test(low(el.textContent))) && /\d/.test(el.textContent || '');
+        });
+        if (withDigits.length) {
+          // Shortest numeric content avoids long labels
+          withDigits.sort(function (a, b) { return norm(a.textContent).length - norm(b.textContent).length; });
+          return norm(withDigits[0].textContent);
+        }
+        var badge = document.querySelector(".badge,.pill,.count,[data-test*='count'],[data-testid*='count']");
+        return badge ? norm(badge.textContent) : null;
+      });
+    },
+
+    // Items held in cart-like storage entries (arrays under cart/bag/basket/items/products keys)
+    cartCount: function () {
+      return memo('cartCount', function () {
+        var total = 0;
+        [sessionStorage, localStorage].forEach(function (store) {
+          for (var i = 0; i < store.length; i++) {
+            var k = store.key(i), o = parse(store.getItem(k));
+            if (/cart|bag|basket|items|products/i.test(k || '') || Array.isArray(o)) {
+              total += Array.isArray(o) ? o.length : 0;
+            }
+          }
+        });
+        return total;
+      });
+    },
+
+    // Fixed geolocation for the page; exposes the coordinates as window.__test_geo
+    installGeo: function (latitude, longitude, accuracy) {
+      var coords = {latitude: latitude, longitude: longitude, accuracy: accuracy || 50};
+      var rounded = {latitude: Math.round(latitude), longitude: Math.round(longitude)};
+      try { Object.defineProperty(window, '__test_geo', {value: {coords: coords, rounded: rounded}, configurable: true}); } catch (e) {}
+      if (navigator && navigator.geolocation) {
+        var resp = {coords: coords};
+        try {
+          navigator.geolocation.getCurrentPosition = function (success) { try { success(resp); } catch (e) {} };
+          navigator.geolocation.watchPosition = function (success) {
+            setTimeout(function () { try { success(resp); } catch (e) {} }, 0);
+            return Math.floor(Math.random() * 1e6);
+          };
+        } catch (e) {}
+      }
+    },
+
+    // Record fetch/XHR URLs from now on; read them back with lastRequest
+    watchRequests: function () {
+      if (window.__probeRequestsHooked) return;
+      window.__probeRequestsHooked = true;
+      try {
+        var _fetch = window.fetch;
+        window.fetch = function (input) {
+          record(typeof input === 'string' ? input : input && input.url);
+          return _fetch.apply(this, arguments);
+        };
+      } catch (e) {}
+      try {
+        var open = XMLHttpRequest.prototype.open;
+        XMLHttpRequest.prototype.open = function (method, url) {
+          record(url);
+          return open.apply(this, arguments);
+        };
+      } catch (e) {}
+    },
+
+    // Case-insensitive substring check; found lists every needle present
+    hasText: function (needles, scope, source) {
+      var text = scopeText(scope, source), hay = text.toLowerCase(), found = [], at = -1, len = 0;
+      needles.forEach(function (n) {
+        var i = hay.indexOf(String(n).toLowerCase());
+        if (i === -1) return;
+        found.push(n);
+        if (at === -1 || i < at) { at = i; len = String(n).length; }
+      });
+      return verdict(found, text, at, len, scopeBytes(scope, source));
+    },
+
+    matchText: function (pattern, flags, scope, source) {
+      var text = scopeText(scope, source), m = new RegExp(pattern, flags).exec(text);
+      return verdict(m ? [m[0]] : [], text, m ? m.index : -1, m ? m[0].length : 0, scopeBytes(scope, source));
+    },
+
+    hasSelector: function (css, scope) {
+      var root = scope ? document.querySelector(scope) : document;
+      var el = root ? root.querySelector(css) : null;
+      var html = el ? (el.outerHTML || '') : '';
+      var scanned = memo('bytes:html', function () {
+        return document.documentElement ? utf8Length(document.documentElement.outerHTML) : 0;
+      });
+      return {ok: !!el, found: el ? [css] : [], excerpt: html.slice(0, 80), scanned: scanned};
+    },
+
+    lastRequest: function (part) {
+      for (var i = requests.length - 1; i >= 0; i--) {
+        if (!part || requests[i].indexOf(part) !== -1) return requests[i];
+      }
+      return null;
+    }
+  };
+  try { Object.defineProperty(window, '__probe', {value: api, configurable: true, writable: true}); } catch (e) { window.__probe = api; }
+})(%d);
+""" % PROBE_VERSION
+
+# Small call stub sent on every probe; reports when the bundle is not in this document
+_CALL_JS = r"""
+var p = window.__probe;
+if (!p || p.version !== %d) return {__probe_missing: true};
+return p[arguments[0]].apply(p, arguments[1] || []);
+""" % PROBE_VERSION
+
+# session id -> identifier of the registered document-start script
+_REGISTERED: Dict[object, Optional[str]] = {}
+_LOCK = threading.Lock()
+
+
+def _session_key(driver):
+    return getattr(driver, "session_id", None) or id(driver)
+
+
+def install_probe(driver) -> bool:
+    """Register the bundle to run at the start of every new document (Chromium only).
+
+    Returns False where CDP is unavailable; ``probe`` then installs the bundle
+    lazily, once per document. Safe to call repeatedly; ``uninstall_probe``
+    takes it off again.
+    """
+    sid = _session_key(driver)
+    with _LOCK:
+        if sid in _REGISTERED:
+            return True
+    if not cdp_supported(driver):
+        return False
+    try:
+        res = execute_cdp(driver, "Page.addScriptToEvaluateOnNewDocument", {"source": PROBE_JS})
+    except CdpUnavailable:
+        return False
+    with _LOCK:
+        _REGISTERED[sid] = (res or {}).get("identifier")
+    return True
+
+
+def uninstall_probe(driver) -> None:
+    """Stop injecting the bundle into new documents and forget the registration (e.g. before a pooled session is reused)."""
+    with _LOCK:
+        identifier = _REGISTERED.pop(_session_key(driver), None)
+    if not identifier:
+        return
+    try:
+        execute_cdp(driver, "Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+    except CdpUnavailable:
+        pass
+
+
+def probe(driver, name: str, *args):
+    """Call ``window.__probe.<name>(*args)`` in the page.
+
+    Only the short call stub goes over the wire; the bundle itself is sent
+    again only when the current document does not have it yet.
+    """
+    res = driver.execute_script(_CALL_JS, name, list(args))
+    if isinstance(res, dict) and res.get("__probe_missing"):
+        res = driver.execute_script(PROBE_JS + _CALL_JS, name, list(args))
+    return res
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    found: List[str] = field(default_factory=list)  # needles (or the regex match) present
+    excerpt: str = ""  # a little context around the first match
+    scanned: int = 0  # UTF-8 bytes of page text examined, i.e. what would have been shipped
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class ProbeSavings:
+    """Per-test tally of page text that assertion probes did not have to transfer, in UTF-8 bytes."""
+
+    def __init__(self):
+        self._tests: Dict[str, dict] = defaultdict(lambda: {"checks": 0, "scanned": 0, "returned": 0})
+        self._current: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def begin(self, nodeid: str) -> None:
+        self._current = nodeid
+
+    def end(self) -> None:
+        self._current = None
+
+    def record(self, scanned: int, returned: int) -> None:
+        with self._lock:
+            t = self._tests[self._current or "<outside tests>"]
+            t["checks"] += 1
+            t["scanned"] += scanned
+            t["returned"] += returned
+
+    def report(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                nodeid: dict(t, saved=max(0, t["scanned"] - t["returned"]))
+                for nodeid, t in self._tests.items()
+            }
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
+
+
+SAVINGS = ProbeSavings()
+
+
+def _assert_probe(driver, name: str, *args) -> ProbeResult:
+    res = probe(driver, name, *args) or {}
+    SAVINGS.record(int(res.get("scanned") or 0), len(json.dumps(res, ensure_ascii=False).encode("utf-8")))
+    return ProbeResult(
+        ok=bool(res.get("ok")),
+        found=list(res.get("found") or []),
+        excerpt=res.get("excerpt") or "",
+        scanned=int(res.get("scanned") or 0),
+    )
+
+
+def page_contains(driver, *needles: str, scope: Optional[str] = None, source: str = "text") -> ProbeResult:
+    """Whether any of ``needles`` (case-insensitive) is in the page.
+
+    Looks at the text of the ``scope`` element when given and present, else at
+    the body text (``source="text"``) or the serialized page (``source="html"``).
+    """
+    return _assert_probe(driver, "hasText", list(needles), scope, source)
+
+
+def page_matches(driver, pattern: str, flags: str = "i", *, scope: Optional[str] = None, source: str = "text") -> ProbeResult:
+    """Whether the JS regular expression ``pattern`` matches the page text (see ``page_contains``)."""
+    return _assert_probe(driver, "matchText", pattern, flags, scope, source)
+
+
+def page_has(driver, css: str, *, scope: Optional[str] = None) -> ProbeResult:
+    """Whether an element matching ``css`` exists (inside ``scope`` when given)."""
+    return _assert_probe(driver, "hasSelector", css, scope)
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+
+BACKGROUND = "<background>"
+
+# Frames from these places are plumbing, not the helper that issued the command
+_SKIP_PATHS = (
+    os.sep + "selenium" + os.sep,
+    os.sep + "_pytest" + os.sep,
+    os.sep + "pluggy" + os.sep,
+)
+# Shared lookup/wait/probe libraries: the helper that called them is the interesting frame
+_SKIP_FILES = (
+    "transport.py", "profiler.py", "locators.py", "waits.py", "probe.py", "storage_seed.py", "cdp.py",
+)
+_ANONYMOUS = ("<lambda>", "<listcomp>", "<genexpr>", "<dictcomp>", "<setcomp>")
+
+
+@dataclass
+class CommandRecord:
+    command: str
+    ms: float
+    request_bytes: int
+    response_bytes: int
+    caller: str
+    in_wait: bool
+
+
+def _calling_helper(frame) -> tuple:
+    """Return (helper name, issued from a WebDriverWait) for the first user frame."""
+    in_wait = False
+    fallback = "?"
+    while frame is not None:
+        code = frame.f_code
+        path = code.co_filename
+        if any(p in path for p in _SKIP_PATHS) or os.path.basename(path) in _SKIP_FILES:
+            if (code.co_name == "until" and path.endswith("wait.py")) or code.co_name == "wait_until":
+                in_wait = True
+            frame = frame.f_back
+            continue
+        if code.co_name in _ANONYMOUS:
+            fallback = code.co_name
+            frame = frame.f_back
+            continue
+        return code.co_name, in_wait
+    return fallback, in_wait
+
+
+class CommandProfiler:
+    """Collects every WebDriver command per test: name, duration, payload sizes and
+    the helper that issued it. Commands sent from background threads (prefetch,
+    background quit) are kept under ``<background>``."""
+
+    def __init__(self):
+        self._tests: Dict[str, List[CommandRecord]] = defaultdict(list)
+        self._current: Optional[str] = None
+        self._main = threading.main_thread()
+        self._lock = threading.Lock()
+
+    def begin(self, nodeid: str) -> None:
+        self._current = nodeid
+
+    def end(self) -> None:
+        self._current = None
+
+    def record(self, command: str, seconds: float, request_bytes: int, response) -> None:
+        try:
+            response_bytes = len(json.dumps(response, default=str))
+        except Exception:
+            response_bytes = 0
+        caller, in_wait = _calling_helper(sys._getframe(1))
+        bucket = self._current if threading.current_thread() is self._main and self._current else BACKGROUND
+        rec = CommandRecord(
+            command=command,
+            ms=round(seconds * 1000, 2),
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            caller=caller,
+            in_wait=in_wait,
+        )
+        with self._lock:
+            self._tests[bucket].append(rec)
+
+    def test_summary(self, nodeid: str, top: int = 5) -> dict:
+        with self._lock:
+            records = list(self._tests.get(nodeid) or [])
+        by_command: Dict[str, dict] = defaultdict(lambda: {"count": 0, "total_ms": 0.0})
+        by_caller: Dict[str, dict] = defaultdict(lambda: {"count": 0, "total_ms": 0.0})
+        for r in records:
+            for table, key in ((by_command, r.command), (by_caller, r.caller)):
+                table[key]["count"] += 1
+                table[key]["total_ms"] = round(table[key]["total_ms"] + r.ms, 2)
+        return {
+            "round_trips": len(records),
+            "total_ms": round(sum(r.ms for r in records), 2),
+            "request_bytes": sum(r.request_bytes for r in records),
+            "response_bytes": sum(r.response_bytes for r in records),
+            "wait_round_trips": sum(1 for r in records if r.in_wait),
+            "by_command": dict(by_command),
+            "by_caller": dict(by_caller),
+            "slowest": [asdict(r) for r in sorted(records, key=lambda r: -r.ms)[:top]],
+        }
+
+    def tests(self) -> List[str]:
+        with self._lock:
+            return list(self._tests)
+
+    def report(self, top: int = 5) -> dict:
+        out = {}
+        for nodeid in self.tests():
+            summary = self.test_summary(nodeid, top)
+            with self._lock:
+                summary["commands"] = [asdict(r) for r in self._tests[nodeid]]
+            out[nodeid] = summary
+        return {"tests": out}
+
+    def write(self, path: str, top: int = 5) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=2)
+
+
+# Set by conftest when WD_PROFILE is on; read by transport.TimedConnection
+PROFILER: Optional[CommandProfiler] = None
@@ -0,0 +1,61 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+@dataclass
+class QuitError:
+    label: str
+    error: str
+
+
+_STOP = object()
+
+
+class SessionReaper:
+    """Quits remote sessions on a background thread.
+
+    BrowserStack keeps a ``quit`` open for several seconds while it finalizes
+    video and logs; handing the driver to the reaper lets the next test start
+    immediately. The queue is bounded, so a slow hub applies backpressure to
+    teardown instead of piling up live sessions. Failures are collected and
+    returned by ``drain`` so they can be reported once at the end of the run.
+    """
+
+    def __init__(self, quit_fn: Callable[[object], None], maxsize: int = 4):
+        self._quit_fn = quit_fn
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.errors: List[QuitError] = []
+        self.quit_count = 0
+        self.quit_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="wd-reaper", daemon=True)
+        self._thread.start()
+
+    def submit(self, driver, label: str = "") -> None:
+        self._queue.put((driver, label or getattr(driver, "session_id", "") or "?"))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                driver, label = item
+                start = time.monotonic()
+                try:
+                    self._quit_fn(driver)
+                except Exception as e:
+                    self.errors.append(QuitError(label=label, error=f"{type(e).__name__}: {e}"))
+                finally:
+                    self.quit_count += 1
+                    self.quit_seconds += time.monotonic() - start
+            finally:
+                self._queue.task_done()
+
+    def drain(self, timeout: Optional[float] = None) -> List[QuitError]:
+        """Wait for every queued quit to finish and stop the thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        return list(self.errors)
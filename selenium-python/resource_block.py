@@ -0,0 +1,52 @@
+from typing import Iterable, List
+
+from cdp import CdpUnavailable, cdp_supported, execute_cdp
+
+
+# URL patterns per resource class, in Network.setBlockedURLs wildcard syntax.
+# SVG is left alone: the site draws icons (favourite hearts, cart) with it.
+RESOURCE_PATTERNS = {
+    "images": ["*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*",
+               "*.webp", "*.webp?*", "*.avif", "*.avif?*", "*/_next/image*"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m3u8"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*segment.io*",
+                  "*segment.com*", "*hotjar.com*", "*clarity.ms*", "*facebook.net*", "*vercel-insights.com*",
+                  "*/_vercel/insights*", "*/_vercel/speed-insights*"],
+}
+DEFAULT_CLASSES = ("images", "fonts", "media", "analytics")
+
+
+def blocked_patterns(classes: Iterable[str], extra: Iterable[str] = ()) -> List[str]:
+    patterns: List[str] = []
+    for name in classes:
+        if name not in RESOURCE_PATTERNS:
+            raise ValueError(f"Unknown resource class {name!r}; expected one of {sorted(RESOURCE_PATTERNS)}")
+        patterns.extend(RESOURCE_PATTERNS[name])
+    patterns.extend(extra)
+    return list(dict.fromkeys(patterns))
+
+
+def block_resources(driver, classes: Iterable[str] = DEFAULT_CLASSES, extra: Iterable[str] = ()) -> bool:
+    """Block the given resource classes for the rest of the session via CDP.
+
+    Returns False (and blocks nothing) on browsers or hubs without CDP, so
+    tests run unchanged there, just without the saving.
+    """
+    patterns = blocked_patterns(classes, extra)
+    if not patterns or not cdp_supported(driver):
+        return False
+    try:
+        execute_cdp(driver, "Network.enable", {})
+        execute_cdp(driver, "Network.setBlockedURLs", {"urls": patterns})
+        return True
+    except CdpUnavailable:
+        return False
+
+
+def unblock_resources(driver) -> None:
+    """Clear the block list (pooled sessions must not carry it into the next test)."""
+    try:
+        execute_cdp(driver, "Network.setBlockedURLs", {"urls": []})
+    except CdpUnavailable:
+        pass
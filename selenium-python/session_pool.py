@@ -0,0 +1,173 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+# Capability entries that change per test (or carry secrets) but do not change the
+# platform a session runs on. They are excluded from the pool key.
+VOLATILE_OPTIONS = ("sessionName", "userName", "accessKey")
+
+
+def capabilities_key(caps: dict) -> str:
+    """Return a stable short hash for the platform described by ``caps``."""
+    norm = json.loads(json.dumps(caps or {}, default=str))
+    opts = norm.get("bstack:options")
+    if isinstance(opts, dict):
+        for k in VOLATILE_OPTIONS:
+            opts.pop(k, None)
+    if isinstance(norm.get("browserName"), str):
+        norm["browserName"] = norm["browserName"].strip().lower()
+    blob = json.dumps(norm, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PooledSession:
+    key: str
+    driver: object
+    uses: int = 0
+    created_for: str = ""
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    reused: int = 0
+    recycled: int = 0
+    unhealthy: int = 0
+    expired: int = 0  # idle sessions found dead when handed out (e.g. ended by the hub's idle timeout)
+    retired: int = 0  # quit on release because no later test needs their platform
+
+
+RESET_STORAGE_JS = (
+    "try { window.sessionStorage.clear(); } catch (e) {}"
+    " try { window.localStorage.clear(); } catch (e) {}"
+    " return true;"
+)
+
+
+class SessionPool:
+    """Keeps idle remote sessions alive between tests, one list per capability key.
+
+    ``factory(caps)`` creates a new driver and ``disposer(driver)`` ends one; the
+    pool never talks to BrowserStack directly. Sessions are handed back through
+    ``release`` which resets cookies, sessionStorage and localStorage and moves the
+    session to a fresh window. A session is quit instead of pooled once it has
+    served ``max_uses`` tests, when the reset fails, or when the caller releases it
+    with ``keep=False`` because no later test runs on its platform. With ``is_alive(driver)``
+    an idle session is checked before it is handed out, and a dead one is
+    disposed in favour of the next idle or a new session.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[dict], object],
+        disposer: Callable[[object], None],
+        max_uses: int = 20,
+        is_alive: Optional[Callable[[object], bool]] = None,
+    ):
+        self._factory = factory
+        self._disposer = disposer
+        self._is_alive = is_alive
+        self.max_uses = max(1, int(max_uses))
+        self._idle: Dict[str, List[PooledSession]] = {}
+        self._lock = threading.Lock()
+        self.stats = PoolStats()
+
+    def acquire(self, caps: dict) -> PooledSession:
+        key = capabilities_key(caps)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key) or []
+                session = idle.pop() if idle else None
+            if session is None:
+                break
+            if self._is_alive is None or self._is_alive(session.driver):
+                self.stats.reused += 1
+                return session
+            self.stats.expired += 1
+            self._disposer(session.driver)
+        driver = self._factory(caps)
+        self.stats.created += 1
+        name = ((caps.get("bstack:options") or {}).get("sessionName")) or ""
+        return PooledSession(key=key, driver=driver, created_for=name)
+
+    def release(self, session: PooledSession, healthy: bool = True, keep: bool = True) -> None:
+        session.uses += 1
+        if not healthy:
+            self.stats.unhealthy += 1
+            self._disposer(session.driver)
+            return
+        if not keep:
+            self.stats.retired += 1
+            self._disposer(session.driver)
+            return
+        if session.uses >= self.max_uses:
+            self.stats.recycled += 1
+            self._disposer(session.driver)
+            return
+        if not self._reset(session.driver):
+            self.stats.unhealthy += 1
+            self._disposer(session.driver)
+            return
+        with self._lock:
+            self._idle.setdefault(session.key, []).append(session)
+
+    def idle_count(self, key: Optional[str] = None) -> int:
+        with self._lock:
+            if key is not None:
+                return len(self._idle.get(key) or [])
+            return sum(len(v) for v in self._idle.values())
+
+    def evict_idle(self, keep_key: Optional[str] = None) -> bool:
+        """Quit one idle session, preferring keys other than ``keep_key``. Used to give a
+        parallel slot back when another platform needs it."""
+        with self._lock:
+            victim = None
+            for key, idle in self._idle.items():
+                if idle and key != keep_key:
+                    victim = idle.pop(0)
+                    break
+            if victim is None and keep_key is not None and self._idle.get(keep_key):
+                victim = self._idle[keep_key].pop(0)
+        if victim is None:
+            return False
+        self.stats.recycled += 1
+        self._disposer(victim.driver)
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for s in sessions:
+            self._disposer(s.driver)
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        # Storage is per origin, so clear it while still on the page the test left us on.
+        try:
+            driver.execute_script(RESET_STORAGE_JS)
+            driver.delete_all_cookies()
+        except Exception:
+            return False
+        # A new window gets a fresh sessionStorage and drops any lingering page state.
+        try:
+            old_handles = list(driver.window_handles)
+            driver.switch_to.new_window("tab")
+            fresh = driver.current_window_handle
+            for handle in old_handles:
+                if handle == fresh:
+                    continue
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+        except Exception:
+            # Real devices may not support new windows; a blank page is good enough there.
+            try:
+                driver.get("about:blank")
+            except Exception:
+                return False
+        return True
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl  # POSIX
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+def default_slot_dir() -> str:
+    # One directory per BrowserStack account so every pytest/xdist process of a run shares it
+    account = os.getenv("BROWSERSTACK_USERNAME") or "anonymous"
+    return os.path.join(tempfile.gettempdir(), f"bstack-slots-{account}")
+
+
+@dataclass
+class Slot:
+    index: int
+    path: str
+    fd: int
+
+
+def _lock_nb(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+class SlotLimiter:
+    """Caps concurrent remote sessions across processes with one lock file per slot.
+
+    A slot is held by keeping an exclusive OS lock on ``slot-<n>.lock``; the OS drops
+    the lock when the holder exits, so a crashed worker never leaks a slot. All
+    processes that point at the same directory (pytest-xdist workers, parallel CI
+    shells on one host) share the same ``slots`` budget.
+    """
+
+    def __init__(self, slots: int, lock_dir: Optional[str] = None, poll_interval: float = 0.5):
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        self.slots = slots
+        self.lock_dir = lock_dir or default_slot_dir()
+        self.poll_interval = poll_interval
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._held: Dict[int, Slot] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> Optional[Slot]:
+        for i in range(self.slots):
+            path = os.path.join(self.lock_dir, f"slot-{i}.lock")
+            with self._lock:
+                if any(s.index == i for s in self._held.values()):
+                    continue
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                if _lock_nb(fd):
+                    os.ftruncate(fd, 0)
+                    os.write(fd, str(os.getpid()).encode("ascii"))
+                    slot = Slot(index=i, path=path, fd=fd)
+                    self._held[fd] = slot
+                    return slot
+                os.close(fd)
+        return None
+
+    def acquire(self, timeout: Optional[float] = None, on_wait: Optional[Callable[[], bool]] = None) -> Slot:
+        """Block until a slot is free. ``on_wait`` lets callers give back a slot they hold but
+        do not need (e.g. an idle pooled session); it runs on failed attempts until it returns
+        True, then not again for this wait, since the slot it frees may take a while to show up."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        gave_back = False
+        while True:
+            slot = self.try_acquire()
+            if slot is not None:
+                return slot
+            if on_wait is not None and not gave_back:
+                gave_back = bool(on_wait())
+                slot = self.try_acquire()
+                if slot is not None:
+                    return slot
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"No BrowserStack parallel slot free after {timeout:.0f}s ({self.slots} slots)")
+            time.sleep(self.poll_interval)
+
+    def release(self, slot: Optional[Slot]) -> None:
+        if slot is None:
+            return
+        with self._lock:
+            if self._held.pop(slot.fd, None) is None:
+                return
+        _unlock(slot.fd)
+        os.close(slot.fd)
+
+    def held(self) -> int:
+        with self._lock:
+            return len(self._held)
@@ -0,0 +1,193 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from cdp import CdpUnavailable, cdp_supported, execute_cdp
+
+
+# Cheapest same-origin document to set storage from when CDP is not available
+FALLBACK_PATH = os.getenv("SEED_FALLBACK_PATH", "/favicon.svg")
+
+# Runs at document start on every new document of the tab. Seeds once per tab:
+# the guard key lives in sessionStorage, which survives navigations but not a new tab.
+SEED_JS = r"""
+(function (origin, guard, session, local) {
+  try {
+    if (location.origin !== origin) return;
+    if (sessionStorage.getItem(guard) !== null) return;
+    Object.keys(session).forEach(function (k) { sessionStorage.setItem(k, session[k]); });
+    Object.keys(local).forEach(function (k) { localStorage.setItem(k, local[k]); });
+    sessionStorage.setItem(guard, '1');
+  } catch (e) {}
+})(%s, %s, %s, %s);
+"""
+
+_SET_JS = r"""
+var session = arguments[0], local = arguments[1];
+Object.keys(session).forEach(function (k) { sessionStorage.setItem(k, session[k]); });
+Object.keys(local).forEach(function (k) { localStorage.setItem(k, local[k]); });
+"""
+
+_CAPTURE_JS = r"""
+function dump(store) {
+  var out = {};
+  for (var i = 0; i < store.length; i++) { var k = store.key(i); out[k] = store.getItem(k); }
+  return out;
+}
+return {origin: location.origin, session: dump(sessionStorage), local: dump(localStorage)};
+"""
+
+GUARD_KEY = "__seeded_storage"
+
+SNAPSHOT_DIR = os.getenv("STORAGE_SNAPSHOT_DIR") or os.path.join(os.path.dirname(__file__), "..", ".cache", "snapshots")
+# Snapshots older than this are rebuilt (seconds); 0 keeps them forever
+SNAPSHOT_TTL = float(os.getenv("STORAGE_SNAPSHOT_TTL", "86400"))
+
+
+@dataclass
+class Seeding:
+    origin: str
+    method: str  # "cdp", "fallback", or "none" when there was nothing to seed
+    script_id: Optional[str] = None
+    persona: Optional[str] = None
+    restored: bool = False  # the persona snapshot existed and was applied
+
+
+def origin_of(url: str) -> str:
+    u = urlparse(url)
+    return f"{u.scheme}://{u.netloc}"
+
+
+def _as_strings(values: Optional[Dict]) -> Dict[str, str]:
+    out = {}
+    for k, v in (values or {}).items():
+        out[str(k)] = v if isinstance(v, str) else json.dumps(v)
+    return out
+
+
+def _cdp_cookie(cookie: dict, origin: str) -> dict:
+    out = {"name": cookie["name"], "value": cookie["value"], "path": cookie.get("path") or "/"}
+    if cookie.get("domain"):
+        out["domain"] = cookie["domain"]
+    else:
+        out["url"] = origin
+    for key in ("secure", "httpOnly", "sameSite"):
+        if cookie.get(key) is not None:
+            out[key] = cookie[key]
+    if cookie.get("expiry") is not None:
+        out["expires"] = cookie["expiry"]
+    return out
+
+
+def seed_storage(
+    driver,
+    base_url: str,
+    session: Optional[Dict] = None,
+    local: Optional[Dict] = None,
+    cookies: Optional[List[dict]] = None,
+) -> Seeding:
+    """Make ``session``/``local`` storage entries (and ``cookies``) exist before the test's first navigation.
+
+    On Chromium a CDP new-document script writes them as the first page of
+    ``base_url``'s origin starts loading, so no extra navigation happens. Other
+    browsers load ``FALLBACK_PATH`` on that origin once and set the entries there;
+    sessionStorage then carries over to the next navigation in the tab.
+    Non-string values are stored as JSON. ``cookies`` are selenium cookie dicts.
+    """
+    origin = origin_of(base_url)
+    session, local = _as_strings(session), _as_strings(local)
+    if cdp_supported(driver):
+        source = SEED_JS % tuple(json.dumps(v) for v in (origin, GUARD_KEY, session, local))
+        try:
+            if cookies:
+                execute_cdp(driver, "Network.setCookies", {"cookies": [_cdp_cookie(c, origin) for c in cookies]})
+            res = execute_cdp(driver, "Page.addScriptToEvaluateOnNewDocument", {"source": source})
+            return Seeding(origin=origin, method="cdp", script_id=(res or {}).get("identifier"))
+        except CdpUnavailable:
+            pass
+    driver.get(origin + FALLBACK_PATH)
+    driver.execute_script(_SET_JS, session, local)
+    for cookie in cookies or []:
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass  # e.g. a cookie for a sibling domain the current page cannot set
+    return Seeding(origin=origin, method="fallback")
+
+
+def remove_seed(driver, seeding: Optional[Seeding]) -> None:
+    """Stop seeding new documents (a reused session must not carry it into the next test)."""
+    if seeding is None or not seeding.script_id:
+        return
+    try:
+        execute_cdp(driver, "Page.removeScriptToEvaluateOnNewDocument", {"identifier": seeding.script_id})
+    except CdpUnavailable:
+        pass
+
+
+def _snapshot_path(persona: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in persona)
+    return os.path.join(SNAPSHOT_DIR, f"{safe}.json")
+
+
+def capture_snapshot(driver, persona: str) -> dict:
+    """Save the current origin's cookies, sessionStorage and localStorage as ``persona``'s snapshot."""
+    state = driver.execute_script(_CAPTURE_JS) or {}
+    state["session"] = {k: v for k, v in (state.get("session") or {}).items() if k != GUARD_KEY}
+    state["cookies"] = driver.get_cookies()
+    state["persona"] = persona
+    state["captured_at"] = time.time()
+    path = _snapshot_path(persona)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return state
+
+
+def load_snapshot(persona: str) -> Optional[dict]:
+    """Return ``persona``'s snapshot, or None when missing or older than ``SNAPSHOT_TTL``."""
+    try:
+        with open(_snapshot_path(persona)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if SNAPSHOT_TTL and time.time() - float(state.get("captured_at") or 0) > SNAPSHOT_TTL:
+        return None
+    return state
+
+
+def restore_snapshot(
+    driver,
+    base_url: str,
+    persona: str,
+    session: Optional[Dict] = None,
+    local: Optional[Dict] = None,
+) -> Seeding:
+    """Seed ``persona``'s snapshot (plus explicit ``session``/``local`` overrides) in one step.
+
+    When there is no usable snapshot only the overrides are seeded and the
+    returned ``Seeding.restored`` is False; the test then builds the state the
+    slow way and calls ``capture_snapshot`` for the next run.
+    """
+    state = load_snapshot(persona)
+    if state is None and not session and not local:
+        return Seeding(origin=origin_of(base_url), method="none", persona=persona)
+    merged_session = dict((state or {}).get("session") or {})
+    merged_session.update(session or {})
+    merged_local = dict((state or {}).get("local") or {})
+    merged_local.update(local or {})
+    seeding = seed_storage(
+        driver,
+        base_url,
+        session=merged_session,
+        local=merged_local,
+        cookies=(state or {}).get("cookies"),
+    )
+    seeding.persona = persona
+    seeding.restored = state is not None
+    return seeding
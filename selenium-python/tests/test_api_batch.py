@@ -0,0 +1,166 @@
+import importlib.util
+import json
+import os
+import socket
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+# Make sibling modules importable (api_batch.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from api_batch import ApiBatch, SharedResponses, duplicate_groups, from_param, make_request, request_for, response_for  # type: ignore
+from api_client import TestathonApi  # type: ignore
+
+# The batch fixture lives in the repository's root conftest.py; load it as a plain module
+_spec = importlib.util.spec_from_file_location(
+    "root_conftest", os.path.join(os.path.dirname(__file__), "..", "..", "conftest.py")
+)
+root_conftest = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(root_conftest)
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """Answers every request with its method, path and body, and counts them per (method, path)."""
+
+    hits: Counter = Counter()
+
+    def _answer(self):
+        self.hits[(self.command, self.path)] += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.dumps({
+            "method": self.command,
+            "path": self.path,
+            "body": self.rfile.read(length).decode() if length else None,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    _EchoHandler.hits = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = TestathonApi(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _closed_port_client():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return TestathonApi(base_url=f"http://127.0.0.1:{port}", timeout=2)
+
+
+def _item(nodeid, *args, skip=False, **kwargs):
+    marks = {}
+    if args:
+        marks["api_request"] = pytest.mark.api_request(*args, **kwargs).mark
+    if skip:
+        marks["skip"] = pytest.mark.skip().mark
+    return SimpleNamespace(nodeid=nodeid, get_closest_marker=marks.get, callspec=SimpleNamespace(params={}))
+
+
+def test_key_normalizes_method_param_order_and_header_case():
+    a = make_request("get", "/api/offers", params={"a": 1, "b": 2}, headers={"Accept": "x"})
+    b = make_request("GET", "/api/offers", params={"b": 2, "a": 1}, headers={"accept": "x"})
+    assert a.key() == b.key()
+    assert a.key() != make_request("GET", "/api/offers", params={"a": 1, "b": 3}).key()
+    assert make_request("POST", "/x", json={"u": 1}).key() != make_request("POST", "/x", json={"u": 2}).key()
+
+
+def test_shared_defaults_to_idempotent_methods():
+    assert make_request("GET", "/x").shared and make_request("options", "/x").shared
+    assert not make_request("POST", "/x").shared
+    assert make_request("POST", "/x", shared=True).shared
+
+
+def test_request_for_fills_in_parametrized_values():
+    item = _item("t::a", "GET", "/api/offers", params=from_param("p"))
+    item.callspec.params["p"] = {"userName": "x"}
+    req = request_for(item)
+    assert (req.method, req.path, req.kwargs) == ("GET", "/api/offers", {"params": {"userName": "x"}})
+    assert request_for(_item("t::b")) is None
+
+
+def test_duplicate_groups_lists_repeated_signatures_only():
+    declared = {
+        "t::a": make_request("GET", "/api/products"),
+        "t::b": make_request("GET", "/api/products"),
+        "t::c": make_request("GET", "/api/orders"),
+    }
+    assert duplicate_groups(declared) == [["t::a", "t::b"]]
+
+
+def test_batch_sends_shared_requests_once_and_others_per_test(api):
+    declared = {
+        "t::a": make_request("GET", "/api/products"),
+        "t::b": make_request("GET", "/api/products"),
+        "t::c": make_request("POST", "/api/checkout", json={"userName": "u"}),
+        "t::d": make_request("POST", "/api/checkout", json={"userName": "u"}),
+    }
+    batch = ApiBatch(api, concurrency=2, responses=SharedResponses())
+    batch.start(declared)
+    responses = {nodeid: batch.future(nodeid).result(timeout=10) for nodeid in declared}
+    assert responses["t::a"] is responses["t::b"]
+    assert responses["t::c"] is not responses["t::d"]
+    assert responses["t::c"].json()["body"] == '{"userName": "u"}'
+    assert _EchoHandler.hits == Counter({("GET", "/api/products"): 1, ("POST", "/api/checkout"): 2})
+
+
+def test_undeclared_tests_are_sent_inline(api):
+    shared = SharedResponses()
+    batch = ApiBatch(api, concurrency=2, responses=shared)
+    batch.start({"t::a": make_request("GET", "/api/products")})
+    late = _item("t::late", "GET", "/api/products")
+    fut = response_for(late, api, batch, shared)
+    assert "t::late" not in batch
+    # The batch already holds this signature, so the late test shares its response
+    assert fut is batch.future("t::a")
+    other = response_for(_item("t::other", "GET", "/api/orders"), api, None, shared)
+    assert other.result(timeout=10).json()["path"] == "/api/orders"
+    assert response_for(_item("t::none"), api, batch, shared) is None
+
+
+def test_transport_errors_surface_in_the_owning_test():
+    client = _closed_port_client()
+    try:
+        batch = ApiBatch(client, concurrency=2, responses=SharedResponses())
+        batch.start({"t::a": make_request("GET", "/api/products")})
+        with pytest.raises(requests.ConnectionError):
+            batch.future("t::a").result(timeout=10)
+        inline = response_for(_item("t::b", "POST", "/api/signin"), client, None, SharedResponses())
+        with pytest.raises(requests.ConnectionError):
+            inline.result(timeout=10)
+    finally:
+        client.close()
+
+
+def test_batch_leaves_out_deselected_and_skipped_tests():
+    config = SimpleNamespace(stash=pytest.Stash())
+    items = [
+        _item("t::kept", "GET", "/api/products"),
+        _item("t::deselected", "GET", "/api/orders"),
+        _item("t::skipped", "GET", "/api/offers", skip=True),
+        _item("t::no_marker"),
+    ]
+    items[1].config = config
+    root_conftest.pytest_deselected([items[1]])
+    session = SimpleNamespace(config=config, items=items)
+    assert list(root_conftest._batch_requests(session)) == ["t::kept"]
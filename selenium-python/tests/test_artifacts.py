@@ -0,0 +1,84 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+# Make sibling module importable (artifacts.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import artifacts  # type: ignore
+from artifacts import ArtifactWriter, capture_page, should_capture  # type: ignore
+
+
+PAGE = "<html><body>Sign in</body></html>"
+
+
+def _index(root):
+    with open(os.path.join(root, "index.jsonl")) as f:
+        return [json.loads(line) for line in f]
+
+
+def _objects(root):
+    return sorted(
+        os.path.relpath(os.path.join(d, n), root) for d, _, names in os.walk(os.path.join(root, "objects")) for n in names
+    )
+
+
+def test_same_body_is_stored_once_and_indexed_per_name(tmp_path):
+    w = ArtifactWriter(root=str(tmp_path))
+    w.submit("alice-before", PAGE, user="alice")
+    w.submit("bob-before", PAGE, user="bob")
+    w.drain(10)
+    rows = _index(str(tmp_path))
+    assert [(r["name"], r["user"]) for r in rows] == [("alice-before", "alice"), ("bob-before", "bob")]
+    digest = rows[0]["sha256"]
+    assert rows[1]["sha256"] == digest
+    obj = os.path.join("objects", digest[:2], f"{digest}.{w.ext}")
+    assert _objects(str(tmp_path)) == [obj] and rows[0]["object"] == obj
+    assert (w.stored, w.deduped, w.errors) == (1, 1, 0)
+    assert w.raw_bytes == 2 * len(PAGE)
+
+
+def test_gzip_is_used_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "zstandard", None)
+    w = ArtifactWriter(root=str(tmp_path))
+    w.submit("page", PAGE)
+    w.drain(10)
+    (row,) = _index(str(tmp_path))
+    assert w.ext == "gz" and row["object"].endswith(".gz")
+    with open(os.path.join(str(tmp_path), row["object"]), "rb") as f:
+        assert gzip.decompress(f.read()).decode() == PAGE
+
+
+@pytest.mark.parametrize(
+    "mode, captured",
+    [
+        ("off", {False: False, True: False}),
+        ("failure", {False: False, True: True}),
+        ("always", {False: True, True: True}),
+        ("bogus", {False: False, True: True}),  # unknown values fall back to failure
+    ],
+)
+def test_mode_decides_which_attempts_are_kept(monkeypatch, mode, captured):
+    monkeypatch.setenv("LOGIN_ARTIFACTS", mode)
+    assert {failed: should_capture(failed) for failed in (False, True)} == captured
+
+
+def test_failure_mode_skips_successful_attempts_without_reading_the_page(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOGIN_ARTIFACTS", "failure")
+    w = ArtifactWriter(root=str(tmp_path))
+    monkeypatch.setattr(artifacts, "_WRITER", w)
+    reads = []
+
+    class Page:
+        @property
+        def page_source(self):
+            reads.append(1)
+            return PAGE
+
+    assert not capture_page(Page(), "ok-after", failed=False)
+    assert capture_page(Page(), "bad-after", failed=True, user="alice")
+    w.drain(10)
+    assert len(reads) == 1
+    assert [r["name"] for r in _index(str(tmp_path))] == ["bad-after"]
@@ -29,6 +29,9 @@ PROTECTED = [
     ("/favourites", "favourites"),
 ]
 
+# Only URLs and storage are checked; skip images, fonts, media and analytics
+pytestmark = pytest.mark.block_resources()
+
 
 def _wait_redirected(driver, expect_param: str):
     def redirected(d):
@@ -70,15 +73,11 @@ def test_redirects_when_not_logged_in(driver, path: str, flag: str):
 
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
 @pytest.mark.parametrize("path,flag", PROTECTED, ids=["offers", "orders", "checkout", "favourites"])
+@pytest.mark.storage_state(session={"username": os.getenv("TEST_USER_DEMO", "demo_user")})
 def test_access_with_session_username(driver, path: str, flag: str):
     base = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
-    # Seed a username into sessionStorage to simulate logged-in state
-    driver.get(base + "/signin")
-    user = os.getenv("TEST_USER_DEMO", "demo_user")
-    driver.execute_script("sessionStorage.setItem('username', arguments[0]);", user)
-
-    # Now visit the protected page and assert we are NOT on /signin
+    # sessionStorage.username is seeded by the storage_state marker; visit the protected page and assert we are NOT on /signin
     driver.get(base + path)
 
     def not_signin(d):
@@ -93,13 +92,10 @@ def test_access_with_session_username(driver, path: str, flag: str):
 
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
 @pytest.mark.parametrize("path", [p for p, _ in PROTECTED], ids=["offers", "orders", "checkout", "favourites"])
+@pytest.mark.storage_state(session={"username": "demo_user"})
 def test_access_with_session_username(driver, path: str):
     base = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
-    # Pre-set sessionStorage.username to simulate login
-    driver.get(base + "/")
-    driver.execute_script("sessionStorage.setItem('username','demo_user');")
-
     driver.get(base + path)
     WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
     assert "/signin" not in driver.current_url, f"Should not redirect to signin for {path} when username present"
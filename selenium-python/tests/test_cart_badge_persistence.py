@@ -1,11 +1,17 @@
 import os
 import re
-import time
+import sys
 import pytest
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# Make sibling module importable (locators.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from locators import find_ranked  # type: ignore
+from probe import probe  # type: ignore
+from waits import mark_state, wait_for_change, wait_for_dom_quiet  # type: ignore
+
 
 USE_SDK = os.getenv("USE_BSTACK_SDK", "").strip().lower() in {"1", "true", "yes", "on"}
 if USE_SDK:
@@ -45,13 +51,8 @@ def _find_add_buttons(driver):
         "//*[@data-test='add-to-cart' or @data-testid='add-to-cart']",
         "//*[@id='add-to-cart' or contains(@class,'add-to-cart')]",
     ]
-    els = []
-    for xp in xpaths:
-        try:
-            els.extend(driver.find_elements(By.XPATH, xp))
-        except Exception:
-            pass
-    return [e for e in els if e.is_displayed()]
+    # One round trip: strategies are tried in order and filtered for visibility in the page
+    return find_ranked(driver, [(By.XPATH, xp) for xp in xpaths]).elements
 
 
 def _safe_click(driver, el):
@@ -63,30 +64,8 @@ def _safe_click(driver, el):
 
 
 def _get_cart_badge_text(driver) -> str | None:
-    js = r"""
-    (function(){
-      function norm(s){return (s||'').toString().trim();}
-      function low(s){return norm(s).toLowerCase();}
-      const doc = document;
-      const all = Array.from(doc.querySelectorAll('a,button,div,span,i,em,b,strong'));
-      // Prefer elements that clearly mention cart/bag/basket and include a digit
-      const isCartish = el => /(cart|bag|basket|checkout)/.test(low(el.getAttribute('aria-label')||''))
-                               || /(cart|bag|basket|checkout)/.test(low(el.getAttribute('title')||''))
-                               || /(cart|bag|basket|checkout)/.test(low(el.className||''))
-                               || /(cart|bag|basket|checkout)/.test(low(el.textContent||''));
-      const withDigits = all.filter(isCartish).filter(el => /\d/.test(low(el.textContent||'')));
-      if (withDigits.length){
-        // Choose the element with the shortest numeric content to avoid long labels
-        withDigits.sort((a,b)=> norm(a.textContent).length - norm(b.textContent).length);
-        return norm(withDigits[0].textContent);
-      }
-      // Try common badge/count classes
-      const badge = doc.querySelector(".badge,.pill,.count,[data-test*='count'],[data-testid*='count']");
-      return badge ? norm(badge.textContent) : null;
-    })();
-    """
     try:
-        return driver.execute_script(js)
+        return probe(driver, "cartBadge")
     except Exception:
         return None
 
@@ -99,35 +78,8 @@ def _extract_first_int(s: str | None) -> int | None:
 
 
 def _snapshot_cartish_storage_counts(driver) -> int:
-    js = r"""
-    (function(){
-      function toObj(v){try{return JSON.parse(v)}catch(e){return null}}
-      function countArr(v){return Array.isArray(v)? v.length : 0}
-      let total = 0;
-      // Check sessionStorage
-      for (let i=0;i<sessionStorage.length;i++){
-        const k = sessionStorage.key(i);
-        const val = sessionStorage.getItem(k);
-        const o = toObj(val);
-        // Heuristic: keys that sound cart-like or hold arrays
-        if ((/cart|bag|basket|items|products/i.test(k||'')) || Array.isArray(o)){
-          total += countArr(o);
-        }
-      }
-      // Check localStorage
-      for (let i=0;i<localStorage.length;i++){
-        const k = localStorage.key(i);
-        const val = localStorage.getItem(k);
-        const o = toObj(val);
-        if ((/cart|bag|basket|items|products/i.test(k||'')) || Array.isArray(o)){
-          total += countArr(o);
-        }
-      }
-      return total;
-    })();
-    """
     try:
-        v = driver.execute_script(js)
+        v = probe(driver, "cartCount")
         return int(v) if v is not None else 0
     except Exception:
         return 0
@@ -158,8 +110,9 @@ def test_add_to_cart_updates_badge_and_persists_after_reload(driver):
     add_buttons = _find_add_buttons(driver)
     if not add_buttons:
         pytest.skip("No add-to-cart button found; cannot validate badge/total")
+    mark_state(driver)
     _safe_click(driver, add_buttons[0])
-    time.sleep(0.8)  # allow UI state to update
+    wait_for_change(driver, timeout=5)  # badge text or cart storage updated
 
     # After add: expect either badge increased or storage increased
     after_badge_text = _get_cart_badge_text(driver)
@@ -183,7 +136,7 @@ def test_add_to_cart_updates_badge_and_persists_after_reload(driver):
     # Reload and ensure persistence of the chosen signal
     driver.refresh()
     _wait_ready(driver)
-    time.sleep(0.5)
+    wait_for_dom_quiet(driver)  # let hydration restore the badge from storage
 
     post_badge_text = _get_cart_badge_text(driver)
     post_badge = _extract_first_int(post_badge_text)
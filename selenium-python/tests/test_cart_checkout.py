@@ -21,13 +21,10 @@ else:
 
 
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
+@pytest.mark.storage_state(session={"username": "demo_user"})  # logged in, empty cart
 def test_checkout_redirects_home_when_cart_empty(driver):
     base = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
-    # Simulate logged-in user but with empty cart
-    driver.get(base + "/")
-    driver.execute_script("sessionStorage.setItem('username','demo_user'); sessionStorage.removeItem('confirmationProducts'); sessionStorage.removeItem('confirmationTotal');")
-
     driver.get(base + "/checkout")
     WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
     # Expect redirect to home when cart is empty
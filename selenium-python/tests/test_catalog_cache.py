@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Make sibling module importable (catalog_cache.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from catalog_cache import CatalogCache, parse_products  # type: ignore
+
+
+CATALOG = {"products": [{"id": 1, "title": "Phone"}]}
+
+
+class StubClient:
+    """Answers /api/products from a queue of (status, body) pairs and records the request headers."""
+
+    base_url = "http://catalog.test"
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.sent = []
+
+    def get(self, path, headers=None):
+        self.sent.append(dict(headers or {}))
+        status, body = self.answers.pop(0)
+        text = json.dumps(body) if body is not None else ""
+
+        def raise_for_status():
+            if status >= 400:
+                raise RuntimeError(status)
+
+        return SimpleNamespace(
+            status_code=status,
+            text=text,
+            content=text.encode(),
+            headers={"ETag": '"v1"'} if status == 200 else {},
+            raise_for_status=raise_for_status,
+        )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CatalogCache(cache_dir=str(tmp_path), fresh=0)
+
+
+def test_revalidates_with_stored_validators(cache):
+    client = StubClient((200, CATALOG), (304, None))
+    assert not cache.has_copy(client)
+    assert cache.get(client).source == "fetched"
+    assert cache.has_copy(client)
+    second = cache.get(client)
+    assert (second.source, second.products) == ("revalidated", CATALOG["products"])
+    assert client.sent[1] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.parametrize("damage", ["deleted", "corrupt"])
+def test_304_without_a_stored_body_refetches_unconditionally(cache, damage):
+    client = StubClient((200, CATALOG), (304, None), (200, CATALOG))
+    cache.get(client)
+    path = cache._path(client)
+    if damage == "deleted":
+        os.remove(path)
+    else:
+        with open(path, "w") as f:
+            json.dump({"body": "{not json", "etag": '"v1"'}, f)
+    # A proxy may still answer the unconditional request with a 304
+    result = cache.get(client)
+    assert (result.source, result.products) == ("fetched", CATALOG["products"])
+    assert "If-None-Match" not in client.sent[1] and "If-None-Match" not in client.sent[2]
+
+
+def test_repeated_304_for_an_unconditional_request_is_an_error(cache):
+    with pytest.raises(RuntimeError, match="304"):
+        cache.get(StubClient((304, None), (304, None)))
+
+
+@pytest.mark.parametrize(
+    "data, products",
+    [
+        ({"products": [1, 2]}, [1, 2]),
+        ([1, 2], [1, 2]),
+        ({"products": []}, []),
+        ({"items": [1]}, []),
+        ({"products": {"id": 1}}, []),
+        ("not a catalog", []),
+    ],
+)
+def test_parse_products_only_returns_lists(data, products):
+    assert parse_products(data) == products
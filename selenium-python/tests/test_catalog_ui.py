@@ -1,5 +1,6 @@
 import os
 import re
+import sys
 import time
 
 import pytest
@@ -8,6 +9,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver import ActionChains
 
+# Make sibling module importable (locators.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from locators import find_ranked  # type: ignore
+
 
 USE_SDK = os.getenv("USE_BSTACK_SDK", "").strip().lower() in {"1", "true", "yes", "on"}
 if USE_SDK:
@@ -41,12 +46,9 @@ def _find_product_cards(driver):
         " | //article[contains(@class,'product')]"
         " | //li[contains(@class,'product')]"
     )
-    els = driver.find_elements(By.XPATH, x)
-    if not els:
-        x2 = "//*[contains(@class,'product') and (self::div or self::article or self::li)]"
-        els = driver.find_elements(By.XPATH, x2)
-    # filter displayed
-    return [e for e in els if e.is_displayed()]
+    x2 = "//*[contains(@class,'product') and (self::div or self::article or self::li)]"
+    # Displayed cards of the first pattern that has any; the fallback costs no extra round trip
+    return find_ranked(driver, [(By.XPATH, x), (By.XPATH, x2)]).elements
 
 
 def _find_title_in(card):
@@ -57,13 +59,9 @@ def _find_title_in(card):
         ".//*[contains(translate(@class,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'name') and normalize-space(string())!='']",
         ".//*[@data-test='product-title' or @data-testid='product-title']",
     ]
-    for xp in xpaths:
-        try:
-            el = card.find_element(By.XPATH, xp)
-            if el.is_displayed() and el.text.strip():
-                return el
-        except Exception:
-            continue
+    match = find_ranked(card.parent, [(By.XPATH, xp) for xp in xpaths], root=card, require_text=True, limit=1)
+    if match:
+        return match.first
     raise AssertionError("No visible title found in product card")
 
 
@@ -74,13 +72,9 @@ def _find_price_in(card):
         ".//*[@data-test='price' or @data-testid='price']",
         ".//*[self::span or self::div][contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'$') or contains(., '£') or contains(., '€') or contains(., '₹')]",
     ]
-    for xp in xpaths:
-        try:
-            el = card.find_element(By.XPATH, xp)
-            if el.is_displayed() and el.text.strip():
-                return el
-        except Exception:
-            continue
+    match = find_ranked(card.parent, [(By.XPATH, xp) for xp in xpaths], root=card, require_text=True, limit=1)
+    if match:
+        return match.first
     # Last resort: any text with a number looks like a price
     try:
         el = card.find_element(By.XPATH, ".//*[self::span or self::div][normalize-space(string())!='']")
@@ -100,13 +94,9 @@ def _find_add_to_cart_in(card):
         ".//*[@data-test='add-to-cart' or @data-testid='add-to-cart']",
         ".//*[@id='add-to-cart' or contains(@class,'add-to-cart')]",
     ]
-    for xp in xpaths:
-        try:
-            el = card.find_element(By.XPATH, xp)
-            if el.is_displayed():
-                return el
-        except Exception:
-            continue
+    match = find_ranked(card.parent, [(By.XPATH, xp) for xp in xpaths], root=card, limit=1)
+    if match:
+        return match.first
     raise AssertionError("No visible Add to cart control in product card")
 
 
@@ -129,13 +119,8 @@ def _find_add_buttons_global(driver):
         # Inputs
         "//input[(translate(@value,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='add to cart' or contains(translate(@value,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'add') or contains(translate(@value,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'buy')) and (@type='submit' or @type='button')]",
     ]
-    els = []
-    for xp in xpaths:
-        try:
-            els.extend(driver.find_elements(By.XPATH, xp))
-        except Exception:
-            continue
-    return [e for e in els if e.is_displayed()]
+    # One round trip: strategies are tried in order and filtered for visibility in the page
+    return find_ranked(driver, [(By.XPATH, xp) for xp in xpaths]).elements
 
 
 def _click_into_product_detail(driver, card):
@@ -1,5 +1,6 @@
 import os
 import json
+import sys
 import urllib.parse as urlparse
 
 import pytest
@@ -8,6 +9,10 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# Make sibling module importable (storage_seed.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from storage_seed import capture_snapshot  # type: ignore
+
 MATRIX = [
     {"browserName": "Chrome", "os": "Windows", "osVersion": "11"},
     {"browserName": "Firefox", "os": "Windows", "osVersion": "11"},
@@ -23,6 +28,9 @@ def _normalize_username(env_user: str | None) -> str:
     return mapping.get(env_user or "", env_user) or "demouser"
 
 
+DEMO_USERNAME = _normalize_username(os.getenv("TEST_USER_DEMO"))
+
+
 def _set_session(driver, key: str, value):
     js = "window.sessionStorage.setItem(arguments[0], arguments[1]);"
     driver.execute_script(js, key, json.dumps(value) if not isinstance(value, str) else value)
@@ -35,13 +43,6 @@ def _get_body_text(driver) -> str:
         return driver.page_source
 
 
-def _fetch_products(base_url: str):
-    r = requests.get(base_url.rstrip("/") + "/api/products", timeout=20)
-    r.raise_for_status()
-    data = r.json()
-    return data.get("products") or data
-
-
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=[
     "win11-chrome",
     "win11-firefox",
@@ -96,33 +97,44 @@ def test_checkout_with_empty_cart_redirects_home(driver):
     )
 
 
+def _confirmation_state(deps) -> dict:
+    """This run's confirmation and order, built from the catalog the session start fetched."""
+    products = deps["catalog"].result()
+    assert products and isinstance(products, list), "Expected a non-empty product list from /api/products"
+    chosen = products[:2]
+    total = sum(float(p.get("price", 0)) for p in chosen)
+    return {
+        "confirmationProducts": chosen,
+        "confirmationTotal": str(total),
+        "userOrders": [{"id": "web-auto-1", "products": chosen, "total": total}],
+    }
+
+
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=[
     "win11-chrome",
     "win11-firefox",
     "win11-edge",
 ])
-def test_checkout_flow_confirmation_and_orders(driver):
+# The persona snapshot holds the login; this run's confirmation/orders are seeded with it
+@pytest.mark.storage_state(persona=DEMO_USERNAME, session=_confirmation_state)
+@pytest.mark.data_deps("catalog", checkout={"user": DEMO_USERNAME})
+def test_checkout_flow_confirmation_and_orders(driver, seeded_state, data_deps):
     base = os.getenv("TEST_URL", "https://testathon.live/")
-    username = _normalize_username(os.getenv("TEST_USER_DEMO"))
-
-    # Seed login and ensure clean state
-    driver.get(base)
-    WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    driver.execute_script("window.sessionStorage.clear(); window.localStorage.clear();")
-    driver.execute_script("window.sessionStorage.setItem('username', arguments[0]);", username)
+    username = DEMO_USERNAME
 
-    # Build a pseudo-cart from API products
-    products = _fetch_products(base)
-    assert products and isinstance(products, list), "Expected a non-empty product list from /api/products"
-    chosen = products[:2]
-    total = sum(float(p.get("price", 0)) for p in chosen)
     # Perform checkout API call
-    r_post = requests.post(base.rstrip("/") + "/api/checkout", json={"userName": username}, timeout=20)
+    r_post = data_deps["checkout"].result()
     assert r_post.status_code == 200, f"POST /api/checkout failed: {r_post.status_code} {r_post.text}"
 
-    # Mimic client behavior after successful checkout
-    _set_session(driver, "confirmationProducts", chosen)
-    _set_session(driver, "confirmationTotal", str(total))
+    if not seeded_state.restored:
+        # No snapshot for this persona yet: sign in the slow way and capture only the login state
+        driver.get(base)
+        WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        driver.execute_script("window.sessionStorage.clear(); window.localStorage.clear();")
+        driver.execute_script("window.sessionStorage.setItem('username', arguments[0]);", username)
+        capture_snapshot(driver, username)
+        for key, value in _confirmation_state(data_deps).items():
+            _set_session(driver, key, value)
 
     # Navigate to confirmation and assert receipt context is available
     driver.get(base.rstrip("/") + "/confirmation")
@@ -130,16 +142,7 @@ def test_checkout_flow_confirmation_and_orders(driver):
     body = _get_body_text(driver).lower()
     assert "confirmation" in body or "thank" in body or "order" in body, "Expected receipt-like content on confirmation"
 
-    # Now seed an orders entry and verify Orders page is accessible
-    order = {"id": "web-auto-1", "products": chosen, "total": total}
-    existing = driver.execute_script("return window.sessionStorage.getItem('userOrders') || '[]';")
-    try:
-        arr = json.loads(existing)
-    except Exception:
-        arr = []
-    arr.append(order)
-    _set_session(driver, "userOrders", arr)
-
+    # Orders page reads the seeded userOrders entry
     driver.get(base.rstrip("/") + "/orders")
     WebDriverWait(driver, 10).until(lambda d: "/orders" in d.current_url)
     body2 = _get_body_text(driver).lower()
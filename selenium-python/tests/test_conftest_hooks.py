@@ -0,0 +1,95 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+
+# Load selenium-python/conftest.py as a plain module; its hooks are only called directly here
+_spec = importlib.util.spec_from_file_location(
+    "bstack_conftest", os.path.join(os.path.dirname(os.path.dirname(__file__)), "conftest.py")
+)
+bstack_conftest = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bstack_conftest)
+
+CHROME = {"browserName": "Chrome", "os": "Windows", "osVersion": "11"}
+FIREFOX = {"browserName": "Firefox", "os": "Windows", "osVersion": "11"}
+
+
+def _item(name, platform=None):
+    """A stand-in for a collected test; ``platform`` makes it use the ``driver`` fixture."""
+    if platform is None:
+        return SimpleNamespace(nodeid=f"t.py::{name}", name=name, fixturenames=["api"])
+    return SimpleNamespace(
+        nodeid=f"t.py::{name}",
+        name=name,
+        fixturenames=["driver"],
+        callspec=SimpleNamespace(params={"driver": platform}),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(monkeypatch):
+    monkeypatch.delenv("USE_BSTACK_SDK", raising=False)
+    monkeypatch.delenv("BSTACK_PLATFORM_AFFINITY", raising=False)
+    for name in ("BROWSER_NAME", "OS", "OS_VERSION"):
+        monkeypatch.delenv(name, raising=False)
+    bstack_conftest._ITEM_INDEX.clear()
+    bstack_conftest._LAST_USE.clear()
+    bstack_conftest._AFFINITY_REPORT.clear()
+
+
+def _request(items, current):
+    return SimpleNamespace(session=SimpleNamespace(items=items), node=current)
+
+
+def test_needed_later_is_false_after_the_last_test_of_a_platform():
+    items = [_item("a", CHROME), _item("b", FIREFOX), _item("c", CHROME), _item("d")]
+    key = bstack_conftest.capabilities_key(bstack_conftest._item_caps(items[0], require_credentials=False))
+    assert bstack_conftest._needed_later(_request(items, items[0]), key)
+    assert not bstack_conftest._needed_later(_request(items, items[2]), key)
+    # Unknown positions (e.g. a test run outside the collected list) keep the session
+    assert bstack_conftest._needed_later(_request(items, _item("x", CHROME)), key)
+
+
+def test_collection_groups_driver_tests_by_platform():
+    items = [
+        _item("c1", CHROME), _item("f1", FIREFOX), _item("api1"),
+        _item("c2", CHROME), _item("f2", FIREFOX), _item("api2"),
+    ]
+    bstack_conftest.pytest_collection_modifyitems(None, None, items)
+    assert [i.name for i in items] == ["api1", "api2", "c1", "c2", "f1", "f2"]
+    header = bstack_conftest.pytest_report_collectionfinish(None, None, items)
+    assert header == "platform affinity: 2 platform(s), session switches 3 -> 1 (2 removed)"
+
+
+def test_collection_order_kept_when_affinity_is_off(monkeypatch):
+    monkeypatch.setenv("BSTACK_PLATFORM_AFFINITY", "0")
+    items = [_item("c1", CHROME), _item("f1", FIREFOX), _item("c2", CHROME)]
+    bstack_conftest.pytest_collection_modifyitems(None, None, items)
+    assert [i.name for i in items] == ["c1", "f1", "c2"]
+    assert bstack_conftest.pytest_report_collectionfinish(None, None, items) is None
+
+
+def test_no_affinity_header_for_api_only_runs():
+    items = [_item("api1"), _item("api2")]
+    bstack_conftest.pytest_collection_modifyitems(None, None, items)
+    assert [i.name for i in items] == ["api1", "api2"]
+    assert bstack_conftest.pytest_report_collectionfinish(None, None, items) is None
+
+
+def test_storage_state_overrides_can_be_built_from_data_deps(monkeypatch):
+    seeded = {}
+
+    def fake_restore(driver, base, persona, session=None, local=None):
+        seeded.update(persona=persona, session=session, local=local)
+        return SimpleNamespace(restored=True)
+
+    monkeypatch.setattr(bstack_conftest, "restore_snapshot", fake_restore)
+    mark = pytest.mark.storage_state(
+        persona="demouser", session=lambda deps: {"total": deps["catalog"]}, local={"k": "v"}
+    ).mark
+    node = SimpleNamespace(get_closest_marker=lambda name: mark if name == "storage_state" else None, stash={})
+    node.stash[bstack_conftest._DATA_DEPS_KEY] = {"catalog": 3}
+    bstack_conftest._seed_storage_state(SimpleNamespace(node=node), object())
+    assert seeded == {"persona": "demouser", "session": {"total": 3}, "local": {"k": "v"}}
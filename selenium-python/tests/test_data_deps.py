@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+# Make sibling module importable (data_deps.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import data_deps  # type: ignore
+
+
+@pytest.fixture(autouse=True)
+def providers(monkeypatch):
+    """Stub providers only; the real ones would call the live site."""
+    registry = {}
+    monkeypatch.setattr(data_deps, "PROVIDERS", registry)
+    monkeypatch.setattr(data_deps, "BASE_URL", "http://site.test/")
+    yield registry
+    data_deps.shutdown()
+
+
+def test_marker_starts_each_dependency_with_its_params(providers):
+    providers["catalog"] = lambda base_url: ["p1", base_url]
+    providers["checkout"] = lambda base_url, user="demouser": f"checkout {user}"
+    futures = data_deps.start_marker(pytest.mark.data_deps("catalog", checkout={"user": "fav_user"}).mark)
+    assert {name: f.result(timeout=5) for name, f in futures.items()} == {
+        "catalog": ["p1", "http://site.test/"],
+        "checkout": "checkout fav_user",
+    }
+
+
+def test_unknown_provider_fails_before_anything_starts(providers):
+    started = []
+    providers["catalog"] = lambda base_url: started.append(base_url)
+    with pytest.raises(KeyError, match=r"Unknown data_deps \['ofers'\]"):
+        data_deps.start_marker(pytest.mark.data_deps("catalog", ofers={"latitude": 1}).mark)
+    with pytest.raises(KeyError, match="'nope'"):
+        data_deps.start_marker(pytest.mark.data_deps("nope").mark)
+    assert started == []
+
+
+def test_shutdown_cancels_queued_work_and_starts_a_fresh_pool_next_time(providers, monkeypatch):
+    monkeypatch.setenv("DATA_DEPS_WORKERS", "1")
+    entered, release = threading.Event(), threading.Event()
+    providers["slow"] = lambda base_url: entered.set() or release.wait(5)
+    providers["fast"] = lambda base_url: "ok"
+    running = data_deps.start("slow")
+    queued = data_deps.start("fast")
+    assert entered.wait(5)
+    data_deps.shutdown()
+    release.set()
+    assert queued.cancelled() and running.result(timeout=5)
+    assert data_deps.start("fast").result(timeout=5) == "ok"
+
+
+class _Client:
+    instances = []
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.closed = False
+        _Client.instances.append(self)
+
+    def product_list(self):
+        return [self.base_url]
+
+    def close(self):
+        self.closed = True
+
+
+def test_catalog_for_another_site_closes_its_one_off_client(monkeypatch):
+    shared = _Client("http://site.test")
+    monkeypatch.setattr(data_deps, "default_client", lambda: shared)
+    monkeypatch.setattr(data_deps, "TestathonApi", _Client)
+    _Client.instances = []
+    assert data_deps.catalog("http://site.test/") == ["http://site.test"]
+    assert _Client.instances == []
+    assert data_deps.catalog("http://other.test/") == ["http://other.test"]
+    (one_off,) = _Client.instances
+    assert one_off.closed and not shared.closed
+
+
+def test_one_off_client_is_closed_when_the_fetch_fails(monkeypatch):
+    class Failing(_Client):
+        def product_list(self):
+            raise ConnectionError("down")
+
+    monkeypatch.setattr(data_deps, "default_client", lambda: SimpleNamespace(base_url="http://site.test"))
+    monkeypatch.setattr(data_deps, "TestathonApi", Failing)
+    _Client.instances = []
+    with pytest.raises(ConnectionError):
+        data_deps.catalog("http://other.test")
+    assert _Client.instances[0].closed
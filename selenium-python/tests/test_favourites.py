@@ -10,6 +10,7 @@ from selenium.webdriver.support import expected_conditions as EC
 # Make sibling module importable (login_check.py lives in selenium-python/)
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from login_check import attempt_login  # type: ignore
+from locators import find_ranked  # type: ignore
 
 
 USE_SDK = os.getenv("USE_BSTACK_SDK", "").strip().lower() in {"1", "true", "yes", "on"}
@@ -28,6 +29,9 @@ else:
         "win11-edge",
     ]
 
+# Card structure and redirects only; images, fonts and analytics are not needed
+pytestmark = pytest.mark.block_resources()
+
 
 def _wait_ready(driver, timeout: int = 20):
     WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
@@ -42,12 +46,9 @@ def _find_product_cards(driver):
         " | //article[contains(@class,'product')]"
         " | //li[contains(@class,'product')]"
     )
-    els = driver.find_elements(By.XPATH, x)
-    if not els:
-        # Fallback: any element that looks like a product tile
-        x2 = "//*[contains(@class,'product') and (self::div or self::article or self::li)]"
-        els = driver.find_elements(By.XPATH, x2)
-    return els
+    # Fallback: any element that looks like a product tile; both are tried in one round trip
+    x2 = "//*[contains(@class,'product') and (self::div or self::article or self::li)]"
+    return find_ranked(driver, [(By.XPATH, x), (By.XPATH, x2)], visible=False).elements
 
 
 def _find_fav_toggle_in(card):
@@ -60,17 +61,11 @@ def _find_fav_toggle_in(card):
         # SVG icon inside a button
         ".//*[name()='svg' and (contains(translate(@aria-label,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'fav') or contains(translate(@class,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'fav') or contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'heart'))]/ancestor::*[self::button or self::a][1]",
     ]
-    for xp in xpaths:
-        try:
-            el = card.find_element(By.XPATH, xp)
-            return el
-        except Exception:
-            continue
     # Last resort: clickable element with a heart/fav text/icon
-    try:
-        return card.find_element(By.XPATH, ".//*[self::button or self::a][contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'fav') or contains(., '❤') or contains(., '♥')]")
-    except Exception:
-        pass
+    xpaths.append(".//*[self::button or self::a][contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'fav') or contains(., '❤') or contains(., '♥')]")
+    match = find_ranked(card.parent, [(By.XPATH, xp) for xp in xpaths], root=card, visible=False, limit=1)
+    if match:
+        return match.first
     raise AssertionError("Could not locate favourite toggle within product card")
 
 
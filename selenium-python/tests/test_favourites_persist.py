@@ -62,11 +62,8 @@ def _count_favourites(driver) -> int:
     indirect=True,
     ids=["win11-chrome", "win11-firefox", "win11-edge"],
 )
+@pytest.mark.storage_state(session={"username": "demo_user"})
 def test_favourite_toggle_persists_in_session(driver):
-    # Login via sessionStorage flag
-    driver.get(BASE + "/signin")
-    driver.execute_script("sessionStorage.setItem('username','demo_user');")
-
     # Baseline favourites count
     initial = _count_favourites(driver)
 
@@ -0,0 +1,111 @@
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Make sibling modules importable (http_timing.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import http_timing  # type: ignore
+from api_client import TestathonApi  # type: ignore
+from http_timing import PHASES, endpoint, percentile, summarize  # type: ignore
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """Waits a little before the headers so TTFB is the visible part of the call."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so a second call reuses the connection
+
+    def do_GET(self):
+        time.sleep(0.05)
+        body = b"x" * 65536
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client():
+    if not http_timing.ENABLED:
+        pytest.skip("HTTP_TIMING=0 mounts a plain adapter")
+    clients = []
+
+    def make(base_url):
+        clients.append(TestathonApi(base_url=base_url, timeout=5))
+        return clients[-1]
+
+    yield make
+    for c in clients:
+        c.close()
+
+
+def test_phases_are_non_negative_and_add_up_to_the_total(server, client):
+    api = client(f"http://localhost:{server}")
+    first = api.get("/api/products").timing
+    second = api.get("/api/products").timing
+    for call in (first, second):
+        phases = [getattr(call, p) for p in PHASES]
+        assert all(v >= 0 for v in phases)
+        # The rest of the total is request preparation and writing, which no phase covers
+        assert sum(phases) <= call.elapsed + 1e-6
+        assert sum(phases) >= 0.8 * call.elapsed
+        assert call.ttfb >= 0.05 and call.tls == 0
+    assert not first.reused and first.connect > 0
+    assert second.reused and second.dns == second.connect == 0
+
+
+def test_refused_first_address_falls_through_to_the_next(server, client, monkeypatch):
+    real_getaddrinfo = socket.getaddrinfo
+
+    def two_addresses(host, port, *args, **kwargs):
+        if host != "multi.test":
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        # Nothing listens on 127.0.0.2 (the server is bound to 127.0.0.1 only), so it is refused
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", port)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port)),
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", two_addresses)
+    r = client(f"http://multi.test:{server}").get("/api/products")
+    assert r.status_code == 200
+    assert not r.timing.reused
+
+
+def test_percentile_is_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert [percentile(values, p) for p in (50, 90, 99, 100)] == [3, 5, 5, 5]
+    assert percentile([], 50) == 0.0
+    assert percentile([7], 1) == 7
+
+
+def test_summarize_groups_by_endpoint_without_query():
+    calls = [
+        {"method": "get", "path": "/api/orders?userName=a", "elapsed": 0.3, "ttfb": 0.2},
+        {"method": "GET", "path": "https://host/api/orders", "elapsed": 0.1, "ttfb": None},
+        {"method": "POST", "path": "/api/checkout", "elapsed": 0.2},
+    ]
+    summary = summarize(calls)
+    assert list(summary) == ["GET /api/orders", "POST /api/checkout"]
+    row = summary["GET /api/orders"]
+    assert row["n"] == 2
+    assert row["total"] == [0.1, 0.3, 0.3]
+    assert row["ttfb"] == [0.0, 0.2, 0.2]
+    assert row["dns"] == [0.0, 0.0, 0.0]
+    assert endpoint("get", "/" + "a" * 100, limit=10) == "GET /aaaaaa..."
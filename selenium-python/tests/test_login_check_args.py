@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# Make sibling module importable (login_check.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from login_check import _parse_args  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "args, users, workers",
+    [
+        ([], [], 1),
+        (["demouser", "fav_user"], ["demouser", "fav_user"], 1),
+        (["--parallel=3", "demouser"], ["demouser"], 3),
+        (["--parallel", "3", "demouser"], ["demouser"], 3),
+        (["-j4", "demouser"], ["demouser"], 4),
+        (["-j", "4", "demouser", "fav_user"], ["demouser", "fav_user"], 4),
+        (["demouser", "-j", "2"], ["demouser"], 2),
+        (["--parallel=x", "demouser"], ["demouser"], 1),
+        (["-j"], [], 1),
+    ],
+)
+def test_parse_args_keeps_parallel_values_out_of_users(monkeypatch, args, users, workers):
+    monkeypatch.delenv("LOGIN_PARALLEL", raising=False)
+    assert _parse_args(["login_check.py", *args]) == (users, workers)
+
+
+def test_parse_args_falls_back_to_env(monkeypatch):
+    monkeypatch.setenv("LOGIN_PARALLEL", "5")
+    assert _parse_args(["login_check.py", "demouser"]) == (["demouser"], 5)
+    assert _parse_args(["login_check.py", "-j", "2"]) == ([], 2)
@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Make sibling modules importable (login_strategy.py and login_check.py live in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import login_check  # type: ignore
+from login_strategy import LoginStrategy, StrategyCache  # type: ignore
+
+
+def _browser(name):
+    return SimpleNamespace(capabilities={"browserName": name})
+
+
+CHROME, EDGE, FIREFOX = _browser("chrome"), _browser("MicrosoftEdge"), _browser("firefox")
+SITE = "https://testathon.live/"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StrategyCache(path=str(tmp_path / "login_strategy.json"))
+
+
+def test_entries_are_keyed_by_site_and_browser_family(cache, tmp_path):
+    cache.store(EDGE, SITE, LoginStrategy("tiles", "button", "b1"))
+    with open(tmp_path / "login_strategy.json") as f:
+        assert json.load(f) == {
+            "https://testathon.live|edge": {"fields": "tiles", "submit": "button", "build_id": "b1"}
+        }
+    # A trailing slash and msedge/MicrosoftEdge do not make a different entry
+    assert cache.lookup(_browser("msedge"), SITE.rstrip("/"), "b1") == LoginStrategy("tiles", "button", "b1")
+    assert cache.lookup(CHROME, SITE, "b1") is None
+    assert cache.lookup(EDGE, "https://staging.testathon.live/", "b1") is None
+    # A later run reads the file
+    assert StrategyCache(path=cache.path).lookup(EDGE, SITE, "b1") is not None
+
+
+def test_entry_learned_on_another_build_is_ignored(cache):
+    cache.store(CHROME, SITE, LoginStrategy("react-select", "form", "b1"))
+    assert cache.lookup(CHROME, SITE, "b2") is None
+    assert cache.lookup(CHROME, SITE, None) is None
+    # Without a build id there is nothing to tie the strategy to
+    cache.store(FIREFOX, SITE, LoginStrategy("inputs", "enter", None))
+    assert cache.lookup(FIREFOX, SITE, "b1") is None
+
+
+def test_forget_drops_only_that_entry(cache):
+    cache.store(CHROME, SITE, LoginStrategy("react-select", "form", "b1"))
+    cache.store(FIREFOX, SITE, LoginStrategy("inputs", "enter", "b1"))
+    cache.forget(CHROME, SITE)
+    assert cache.lookup(CHROME, SITE, "b1") is None
+    reloaded = StrategyCache(path=cache.path)
+    assert reloaded.lookup(CHROME, SITE, "b1") is None
+    assert reloaded.lookup(FIREFOX, SITE, "b1") == LoginStrategy("inputs", "enter", "b1")
+
+
+def test_disabled_cache_neither_stores_nor_finds(tmp_path):
+    cache = StrategyCache(path=str(tmp_path / "s.json"), enabled=False)
+    cache.store(CHROME, SITE, LoginStrategy("react-select", "form", "b1"))
+    assert not os.path.exists(tmp_path / "s.json")
+    assert cache.lookup(CHROME, SITE, "b1") is None
+
+
+@pytest.mark.parametrize(
+    "form_sent, reacted, has_button, expected",
+    [
+        (True, True, True, ("form", True)),
+        # The form went out but the page was slow: the click may only repeat it, so nothing is learned
+        (True, False, True, ("button", False)),
+        (True, False, False, ("enter", False)),
+        # No form on the page: the button (or Enter) is the only submit, so its outcome counts
+        (False, False, True, ("button", True)),
+        (False, False, False, ("enter", True)),
+    ],
+)
+def test_submit_cascade_only_confirms_an_unambiguous_path(monkeypatch, form_sent, reacted, has_button, expected):
+    actions = []
+
+    def click_first(page, locators, timeout=10):
+        if not has_button:
+            raise TimeoutError("no submit button")
+        actions.append("click")
+
+    monkeypatch.setattr(login_check, "_submit_form", lambda page: actions.append("form") or form_sent)
+    monkeypatch.setattr(login_check, "wait_until", lambda page, body, timeout: reacted)
+    monkeypatch.setattr(login_check, "click_first", click_first)
+    password = SimpleNamespace(send_keys=lambda key: actions.append("enter"))
+    assert login_check._submit_cascade(object(), password, []) == expected
+    then = {"form": [], "button": ["click"], "enter": ["enter"]}[expected[0]]
+    assert actions == ["form"] + then
@@ -23,6 +23,9 @@ def _normalize_username(env_user: str | None) -> str:
     return mapping.get(env_user or "", env_user) or "demouser"
 
 
+DEMO_USERNAME = _normalize_username(os.getenv("TEST_USER_DEMO"))
+
+
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=[
     "win11-chrome",
     "win11-firefox",
@@ -54,16 +57,11 @@ def test_offers_api_rounding_and_404(driver):
     "win11-firefox",
     "win11-edge",
 ])
+@pytest.mark.storage_state(session={"username": DEMO_USERNAME})
 def test_offers_ui_logged_in_without_geo_permission_is_stable(driver):
     base = os.getenv("TEST_URL", "https://testathon.live/")
-    username = _normalize_username(os.getenv("TEST_USER_DEMO"))
-
-    # Simulate login and go to offers
-    driver.get(base)
-    WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    driver.execute_script("window.sessionStorage.clear(); window.localStorage.clear();")
-    driver.execute_script("window.sessionStorage.setItem('username', arguments[0]);", username)
 
+    # Logged in via the storage_state marker; go straight to offers
     driver.get(base.rstrip("/") + "/offers")
     WebDriverWait(driver, 10).until(lambda d: "/offers" in d.current_url)
 
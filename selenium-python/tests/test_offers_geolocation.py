@@ -1,11 +1,17 @@
 import os
-import time
+import sys
 from urllib.parse import urlparse, parse_qs
 
 import pytest
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 
+# Make sibling modules importable (they live in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from cdp import CdpUnavailable, execute_cdp  # type: ignore
+from probe import install_probe, probe, uninstall_probe  # type: ignore
+from waits import wait_for_request  # type: ignore
+
 
 BASE = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
@@ -17,66 +23,34 @@ def _ready(d):
         return True
 
 
-def _add_preload_hooks(driver) -> bool:
+def _add_preload_hooks(request, driver) -> bool:
     """
-    Injects a script at document-start to:
-      - Stub geolocation with fixed coords
-      - Wrap fetch and XHR to record the last /api/offers URL
+    Registers the probe bundle and a short boot script at document-start to:
+      - Stub geolocation with fixed coords (exposed as window.__test_geo)
+      - Record fetch and XHR URLs (read back with the probe's lastRequest)
 
-    Returns True if CDP injection is available; otherwise False.
-    """
-    preload = r"""
-        (function(){
-          try {
-            const coords = { latitude: 40.73, longitude: -73.93, accuracy: 50 };
-            const rounded = { latitude: Math.round(coords.latitude), longitude: Math.round(coords.longitude) };
-            Object.defineProperty(window, '__test_geo', { value: {coords, rounded}, writable: false });
-
-            // Stub geolocation
-            if (navigator && navigator.geolocation) {
-              const successResp = { coords: { latitude: coords.latitude, longitude: coords.longitude, accuracy: coords.accuracy } };
-              try {
-                navigator.geolocation.getCurrentPosition = function(success, error){ try { success(successResp); } catch(e){} };
-                navigator.geolocation.watchPosition = function(success, error){ const id = Math.floor(Math.random()*1e6); setTimeout(function(){ try { success(successResp); } catch(e){} }, 0); return id; };
-              } catch(e) {}
-            }
-
-            // Hook fetch
-            try {
-              const _fetch = window.fetch; 
-              window.fetch = function(){
-                try {
-                  var u = arguments && arguments[0];
-                  var url = (typeof u === 'string') ? u : (u && u.url) ? u.url : '';
-                  if (url && url.indexOf('/api/offers') !== -1) {
-                    window.__lastOffersFetch = url;
-                  }
-                } catch(e){}
-                return _fetch.apply(this, arguments);
-              };
-            } catch(e) {}
-
-            // Hook XHR
-            try {
-              const origOpen = XMLHttpRequest.prototype.open;
-              XMLHttpRequest.prototype.open = function(method, url){
-                try { if (url && url.indexOf('/api/offers') !== -1) { window.__lastOffersFetch = url; } } catch(e) {}
-                return origOpen.apply(this, arguments);
-              };
-            } catch(e) {}
-          } catch (e) {
-            // swallow
-          }
-        })();
+    Both are removed when the test finishes so a pooled session does not
+    carry them into later tests. Returns True if CDP injection is available;
+    otherwise False.
     """
+    # Only Chromium-based sessions expose CDP; guard for others
+    if not install_probe(driver):
+        return False
+    request.addfinalizer(lambda: uninstall_probe(driver))
+    boot = "window.__probe.installGeo(40.73, -73.93, 50); window.__probe.watchRequests();"
     try:
-        # Only Chromium-based drivers expose CDP; guard for others
-        if not hasattr(driver, "execute_cdp_cmd"):
-            return False
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": preload})
-        return True
-    except Exception:
+        res = execute_cdp(driver, "Page.addScriptToEvaluateOnNewDocument", {"source": boot})
+    except CdpUnavailable:
         return False
+    identifier = (res or {}).get("identifier")
+    if identifier:
+        def remove_boot():
+            try:
+                execute_cdp(driver, "Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+            except CdpUnavailable:
+                pass
+        request.addfinalizer(remove_boot)
+    return True
 
 
 @pytest.mark.parametrize(
@@ -87,35 +61,26 @@ def _add_preload_hooks(driver) -> bool:
     indirect=True,
     ids=["win11-chrome"],
 )
-def test_offers_uses_geo_and_rounds_when_allowed(driver):
+@pytest.mark.storage_state(session={"username": "demo_user"})
+def test_offers_uses_geo_and_rounds_when_allowed(request, driver):
     """
     Best-effort signal that when geolocation is available, the page
     issues an /api/offers request with rounded coordinates.
     - Preload script stubs geolocation and wraps network primitives.
     - After navigation to /offers, inspect the captured URL.
     """
-    if not _add_preload_hooks(driver):
+    if not _add_preload_hooks(request, driver):
         pytest.skip("CDP preload not available; skipping geolocation rounding check")
 
-    # Seed sessionStorage auth then open /offers
-    driver.get(BASE + "/signin")
-    driver.execute_script("sessionStorage.setItem('username','demo_user');")
+    # sessionStorage auth is seeded by the storage_state marker; open /offers
     driver.get(BASE + "/offers")
     WebDriverWait(driver, 15).until(_ready)
 
-    # Wait briefly for fetch/xhr hook to capture the API call
-    def have_url(d):
-        return d.execute_script("return window.__lastOffersFetch || ''") or None
-
-    url = None
-    for _ in range(15):
-        try:
-            url = have_url(driver)
-            if url:
-                break
-        except Exception:
-            pass
-        time.sleep(0.3)
+    # Resolves as soon as the offers request completes (resource timing); the
+    # fetch/xhr hook is the fallback for requests the timeline does not show
+    url = wait_for_request(driver, "/api/offers", timeout=5).value
+    if not url:
+        url = probe(driver, "lastRequest", "/api/offers")
 
     if not url:
         pytest.xfail("Could not observe offers API call; site may delay or use different transport")
@@ -1,11 +1,16 @@
 import os
 import json
+import sys
+
 import pytest
-import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# Make sibling module importable (storage_seed.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from storage_seed import capture_snapshot  # type: ignore
+
 
 BASE = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
@@ -22,13 +27,6 @@ def _get_body_text(driver) -> str:
         return driver.page_source
 
 
-def _fetch_products(base_url: str):
-    r = requests.get(base_url.rstrip("/") + "/api/products", timeout=25)
-    r.raise_for_status()
-    data = r.json()
-    return data.get("products") or data
-
-
 # Cross-platform matrix: macOS Safari + iOS Safari + Android Chrome (real devices)
 MATRIX = [
     # macOS Safari (desktop)
@@ -46,45 +44,48 @@ IDS = [
 ]
 
 
-@pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=IDS)
-def test_orders_flow_cross_platform(driver):
-    base = BASE
-
-    # Seed login and ensure clean state
-    driver.get(base)
-    WebDriverWait(driver, 30).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    driver.execute_script("window.sessionStorage.clear(); window.localStorage.clear();")
-    driver.execute_script("window.sessionStorage.setItem('username', 'demouser');")
-
-    # Prepare a pseudo-order via API products and checkout call
-    products = _fetch_products(base)
+def _confirmation_state(deps) -> dict:
+    """This run's confirmation and pseudo-order, built from the catalog the session start fetched."""
+    products = deps["catalog"].result()
     assert products and isinstance(products, list), "Expected non-empty products list"
     chosen = products[:2]
     total = sum(float(p.get("price", 0)) for p in chosen)
+    return {
+        "confirmationProducts": chosen,
+        "confirmationTotal": str(total),
+        "userOrders": [{"id": "sdk-xplat-1", "products": chosen, "total": total}],
+    }
 
-    r_post = requests.post(base.rstrip("/") + "/api/checkout", json={"userName": "demouser"}, timeout=25)
+
+@pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=IDS)
+# Login comes from the demouser snapshot; confirmation and the order are this run's data
+@pytest.mark.storage_state(persona="demouser", session=_confirmation_state)
+# Fetched while the device session starts; see data_deps.py
+@pytest.mark.data_deps("catalog", checkout={"user": "demouser"})
+def test_orders_flow_cross_platform(driver, seeded_state, data_deps):
+    base = BASE
+
+    r_post = data_deps["checkout"].result()
     # Live site may return 422; do not fail on that — continue with client-side simulation
     assert r_post.status_code in (200, 422), f"Checkout API unexpected: {r_post.status_code} {r_post.text}"
 
-    # Persist confirmation state and navigate
-    _set_session(driver, "confirmationProducts", chosen)
-    _set_session(driver, "confirmationTotal", str(total))
+    if not seeded_state.restored:
+        # No demouser snapshot yet: sign in the slow way and capture only the
+        # login state, so later runs restore it in one step
+        driver.get(base)
+        WebDriverWait(driver, 30).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        driver.execute_script("window.sessionStorage.clear(); window.localStorage.clear();")
+        driver.execute_script("window.sessionStorage.setItem('username', 'demouser');")
+        capture_snapshot(driver, "demouser")
+        for key, value in _confirmation_state(data_deps).items():
+            _set_session(driver, key, value)
 
     driver.get(base.rstrip("/") + "/confirmation")
     WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, "#__next")))
     body = _get_body_text(driver).lower()
     assert ("confirmation" in body) or ("order" in body) or ("thank" in body), "Expected confirmation content"
 
-    # Seed an orders entry and verify Orders page accessibility
-    order = {"id": "sdk-xplat-1", "products": chosen, "total": total}
-    existing = driver.execute_script("return window.sessionStorage.getItem('userOrders') || '[]';")
-    try:
-        arr = json.loads(existing)
-    except Exception:
-        arr = []
-    arr.append(order)
-    _set_session(driver, "userOrders", arr)
-
+    # Orders page reads the seeded userOrders entry
     driver.get(base.rstrip("/") + "/orders")
     WebDriverWait(driver, 20).until(lambda d: "/orders" in d.current_url)
     body2 = _get_body_text(driver).lower()
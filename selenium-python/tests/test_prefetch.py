@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+
+# Make sibling module importable (prefetch.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from prefetch import SessionPrefetcher  # type: ignore
+from session_pool import capabilities_key  # type: ignore
+
+
+CHROME = {"browserName": "Chrome", "bstack:options": {"os": "Windows", "sessionName": "c1"}}
+FIREFOX = {"browserName": "Firefox", "bstack:options": {"os": "Windows", "sessionName": "f1"}}
+
+
+class Recorder:
+    """Fake factory/disposer pair; ``gate`` holds session creation until it is set."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Semaphore(0)
+        self.created = []
+        self.disposed = []
+        self._lock = threading.Lock()
+
+    def factory(self, caps):
+        self.entered.release()
+        self.gate.wait(5)
+        driver = object()
+        with self._lock:
+            self.created.append((caps["browserName"], driver))
+        return driver
+
+    def disposer(self, driver):
+        with self._lock:
+            self.disposed.append(driver)
+
+
+def _prefetcher(rec, depth=1):
+    return SessionPrefetcher(factory=rec.factory, disposer=rec.disposer, depth=depth)
+
+
+def test_take_hands_out_the_prefetched_session_with_its_name():
+    rec = Recorder()
+    pf = _prefetcher(rec)
+    assert pf.schedule([CHROME]) == 1
+    assert pf.schedule([CHROME]) == 0  # already booting
+    driver, name = pf.take(capabilities_key(CHROME))
+    assert (driver, name) == (rec.created[0][1], "c1")
+    assert pf.stats.hits == 1
+    pf.close()
+    assert rec.disposed == []
+
+
+def test_take_on_a_mismatched_key_returns_none():
+    rec = Recorder()
+    pf = _prefetcher(rec)
+    pf.schedule([CHROME])
+    assert pf.take(capabilities_key(FIREFOX)) is None
+    assert pf.stats.hits == 0
+    pf.close()
+
+
+def test_stale_session_is_disposed_once_booted():
+    rec = Recorder()
+    rec.gate.clear()
+    pf = _prefetcher(rec)
+    pf.schedule([CHROME])
+    assert rec.entered.acquire(timeout=5)  # booting, so it cannot simply be cancelled
+    # The next test turned out to need Firefox; the Chrome session is nobody's any more
+    assert pf.schedule([FIREFOX]) == 1
+    rec.gate.set()
+    pf.close()
+    chrome = [d for name, d in rec.created if name == "Chrome"]
+    assert chrome and chrome[0] in rec.disposed
+    assert pf.stats.wasted >= 1
+
+
+def test_close_disposes_pending_sessions():
+    rec = Recorder()
+    rec.gate.clear()
+    pf = _prefetcher(rec, depth=2)
+    pf.schedule([CHROME, FIREFOX])
+    assert rec.entered.acquire(timeout=5) and rec.entered.acquire(timeout=5)
+    # close() runs while both are still booting and waits for them
+    threading.Timer(0.1, rec.gate.set).start()
+    pf.close()
+    # Both were booting when close ran; they are quit as soon as they finish
+    assert sorted(map(id, rec.disposed)) == sorted(id(d) for _, d in rec.created)
+    assert len(rec.disposed) == 2
+
+
+def test_failed_boot_is_not_handed_out():
+    def boom(caps):
+        raise RuntimeError("no slot")
+
+    disposed = []
+    pf = SessionPrefetcher(factory=boom, disposer=disposed.append, depth=1)
+    pf.schedule([CHROME])
+    assert pf.take(capabilities_key(CHROME)) is None
+    assert pf.stats.failed == 1
+    pf.close()
+    assert disposed == []
@@ -0,0 +1,41 @@
+import json
+import os
+import sys
+
+# Make sibling module importable (probe.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import probe  # type: ignore
+from probe import ProbeSavings  # type: ignore
+
+
+def test_savings_are_scanned_minus_returned_per_test(tmp_path):
+    savings = ProbeSavings()
+    savings.begin("t.py::test_a")
+    savings.record(5000, 120)
+    savings.record(3000, 80)
+    savings.end()
+    savings.begin("t.py::test_b")
+    # A probe whose answer is larger than the text it looked at saves nothing, never a negative amount
+    savings.record(10, 60)
+    savings.end()
+    savings.record(100, 40)
+    report = savings.report()
+    assert report == {
+        "t.py::test_a": {"checks": 2, "scanned": 8000, "returned": 200, "saved": 7800},
+        "t.py::test_b": {"checks": 1, "scanned": 10, "returned": 60, "saved": 0},
+        "<outside tests>": {"checks": 1, "scanned": 100, "returned": 40, "saved": 60},
+    }
+    path = tmp_path / "log" / "probe_savings.json"
+    savings.write(str(path))
+    assert json.loads(path.read_text()) == report
+
+
+def test_returned_size_is_counted_in_bytes(monkeypatch):
+    answer = {"ok": True, "found": ["€"], "excerpt": "10 €", "scanned": 2048}
+    monkeypatch.setattr(probe, "probe", lambda page, name, *args: answer)
+    monkeypatch.setattr(probe, "SAVINGS", ProbeSavings())
+    probe.SAVINGS.begin("t.py::test_c")
+    result = probe.page_contains(object(), "€")
+    assert result and result.scanned == 2048
+    returned = len(json.dumps(answer, ensure_ascii=False).encode("utf-8"))
+    assert probe.SAVINGS.report()["t.py::test_c"] == {"checks": 1, "scanned": 2048, "returned": returned, "saved": 2048 - returned}
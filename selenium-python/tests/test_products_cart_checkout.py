@@ -1,11 +1,17 @@
 import os
-import time
+import sys
 import pytest
 from urllib.parse import urlparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# Make sibling module importable (locators.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from locators import find_ranked  # type: ignore
+from login_check import race_find  # type: ignore
+from waits import mark_state, wait_for_change, wait_for_url  # type: ignore
+
 
 USE_SDK = os.getenv("USE_BSTACK_SDK", "").strip().lower() in {"1", "true", "yes", "on"}
 if USE_SDK:
@@ -43,15 +49,8 @@ def _find_add_buttons(driver):
         "//*[@data-test='add-to-cart' or @data-testid='add-to-cart']",
         "//*[@id='add-to-cart' or contains(@class,'add-to-cart')]",
     ]
-    els = []
-    for xp in xpaths:
-        try:
-            els.extend(driver.find_elements(By.XPATH, xp))
-        except Exception:
-            pass
-    # Filter displayed
-    els = [e for e in els if e.is_displayed()]
-    return els
+    # One round trip: strategies are tried in order and filtered for visibility in the page
+    return find_ranked(driver, [(By.XPATH, xp) for xp in xpaths]).elements
 
 
 def _click(driver, el):
@@ -98,8 +97,9 @@ def test_add_to_cart_enables_checkout(driver):
     add_buttons = _find_add_buttons(driver)
     if not add_buttons:
         pytest.skip("No add-to-cart button found on homepage; skipping add-to-cart flow")
+    mark_state(driver)
     _click(driver, add_buttons[0])
-    time.sleep(0.5)
+    wait_for_change(driver, timeout=5)
 
     # Go to checkout; expect not redirected to home
     driver.get(BASE + "/checkout")
@@ -120,8 +120,9 @@ def test_checkout_confirmation_and_orders_session(driver):
     driver.execute_script("sessionStorage.setItem('username','demo_user');")
     add_buttons = _find_add_buttons(driver)
     if add_buttons:
+        mark_state(driver)
         _click(driver, add_buttons[0])
-        time.sleep(0.3)
+        wait_for_change(driver, timeout=5)
         driver.get(BASE + "/checkout")
         _wait_ready(driver)
         # If add worked, we should remain on /checkout; otherwise we will simulate confirmation below
@@ -136,18 +137,18 @@ def test_checkout_confirmation_and_orders_session(driver):
         "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'confirm')]",
         "//input[@type='submit']",
     ]
+    # One 3s wait for whichever candidate becomes clickable first (earlier ones win ties)
     clicked = False
-    for xp in submit_xpaths:
-        try:
-            el = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.XPATH, xp)))
-            _click(driver, el)
-            clicked = True
-            break
-        except Exception:
-            continue
+    try:
+        el = race_find(driver, [(By.XPATH, xp) for xp in submit_xpaths], timeout=3, clickable=True).element
+        _click(driver, el)
+        clicked = True
+    except Exception:
+        pass
 
     # Wait briefly for possible redirect to /confirmation
-    WebDriverWait(driver, 5).until(lambda d: True)
+    if clicked:
+        wait_for_url(driver, "/confirmation", timeout=5)
     if urlparse(driver.current_url).path != "/confirmation":
         # Simulate the expected client-side persistence
         driver.execute_script(
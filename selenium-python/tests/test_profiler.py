@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Make sibling modules importable (profiler.py and friends live in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import profiler  # type: ignore
+from locators import find_ranked  # type: ignore
+from transport import remote_connection  # type: ignore
+
+
+def _empty_match(method, url, body=None):
+    return {"status": 0, "value": {"index": -1, "elements": []}}
+
+
+@pytest.fixture
+def stub_driver(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER", profiler.CommandProfiler())
+    # A WebDriver without a remote session: commands go through the real selenium and transport frames
+    d = WebDriver.__new__(WebDriver)
+    d.command_executor = remote_connection("http://127.0.0.1:4444/wd/hub", shared=False)
+    # Only the HTTP layer is canned
+    monkeypatch.setattr(d.command_executor, "_request", _empty_match)
+    d.session_id = "s"
+    d.error_handler = ErrorHandler()
+    return d
+
+
+def _find_add_buttons_global(driver):
+    return find_ranked(driver, [(By.XPATH, "//button"), (By.CSS_SELECTOR, "a.add")]).elements
+
+
+def test_commands_are_attributed_to_the_helper_not_the_locator_library(stub_driver):
+    profiler.PROFILER.begin("t.py::test_x")
+    try:
+        assert _find_add_buttons_global(stub_driver) == []
+    finally:
+        profiler.PROFILER.end()
+    summary = profiler.PROFILER.test_summary("t.py::test_x")
+    assert summary["round_trips"] == 1
+    assert list(summary["by_caller"]) == ["_find_add_buttons_global"]
+    assert summary["wait_round_trips"] == 0
@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+
+# Make sibling module importable (reaper.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from reaper import SessionReaper  # type: ignore
+
+
+class FakeDriver:
+    def __init__(self, session_id, fail=False):
+        self.session_id = session_id
+        self.fail = fail
+
+
+def test_drain_counts_every_quit_and_reports_failures():
+    quit_threads = []
+
+    def quit_fn(driver):
+        quit_threads.append(threading.current_thread().name)
+        if driver.fail:
+            raise ConnectionError("hub went away")
+
+    reaper = SessionReaper(quit_fn, maxsize=1)
+    reaper.submit(FakeDriver("s1", fail=True), label="t.py::test_a")
+    reaper.submit(FakeDriver("s2"))
+    errors = reaper.drain(timeout=5)
+    assert reaper.quit_count == 2
+    assert [(e.label, e.error) for e in errors] == [("t.py::test_a", "ConnectionError: hub went away")]
+    # Both quits ran off the caller's thread, on the one reaper thread
+    assert quit_threads == ["wd-reaper", "wd-reaper"]
+
+
+def test_full_queue_blocks_the_submitter():
+    release = threading.Event()
+    reaper = SessionReaper(lambda d: release.wait(5), maxsize=1)
+    reaper.submit(FakeDriver("s1"))  # taken by the worker, which now blocks
+    reaper.submit(FakeDriver("s2"))  # fills the queue
+    third = threading.Thread(target=reaper.submit, args=(FakeDriver("s3"),))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+    release.set()
+    third.join(5)
+    assert reaper.drain(timeout=5) == []
+    assert reaper.quit_count == 3
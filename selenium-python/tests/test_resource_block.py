@@ -0,0 +1,50 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Make sibling module importable (resource_block.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from resource_block import DEFAULT_CLASSES, RESOURCE_PATTERNS, block_resources, blocked_patterns  # type: ignore
+
+
+def _session(browser):
+    """A session stand-in that records the CDP commands sent through it."""
+    sent = []
+    executor = SimpleNamespace(_commands={})
+    executor.add_command = lambda name, method, path: executor._commands.__setitem__(name, (method, path))
+
+    def execute(name, params):
+        sent.append((params["cmd"], params["params"]))
+        return {"value": {}}
+
+    return SimpleNamespace(capabilities={"browserName": browser}, command_executor=executor, execute=execute), sent
+
+
+def test_resource_classes():
+    assert sorted(RESOURCE_PATTERNS) == ["analytics", "fonts", "images", "media"]
+    assert set(DEFAULT_CLASSES) == set(RESOURCE_PATTERNS)
+    # Icons are SVG; blocking them would break the favourite/cart assertions
+    assert not any("svg" in p for p in blocked_patterns(DEFAULT_CLASSES))
+
+
+def test_unknown_class_is_an_error():
+    with pytest.raises(ValueError, match="'videos'"):
+        blocked_patterns(["images", "videos"])
+
+
+def test_patterns_keep_order_and_drop_duplicates():
+    patterns = blocked_patterns(["fonts", "fonts"], extra=["*.woff", "*ads.example*"])
+    assert patterns == RESOURCE_PATTERNS["fonts"] + ["*ads.example*"]
+
+
+def test_default_set_is_sent_to_chromium_only():
+    chromium, sent = _session("MicrosoftEdge")
+    assert block_resources(chromium)
+    assert sent == [
+        ("Network.enable", {}),
+        ("Network.setBlockedURLs", {"urls": blocked_patterns(DEFAULT_CLASSES)}),
+    ]
+    firefox, sent = _session("firefox")
+    assert not block_resources(firefox) and sent == []
@@ -0,0 +1,156 @@
+import os
+import sys
+
+# Make sibling module importable (session_pool.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from session_pool import SessionPool, capabilities_key  # type: ignore
+
+
+CHROME = {"browserName": "Chrome", "bstack:options": {"os": "Windows", "osVersion": "11", "sessionName": "a"}}
+FIREFOX = {"browserName": "Firefox", "bstack:options": {"os": "Windows", "osVersion": "11", "sessionName": "b"}}
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def new_window(self, kind):
+        self._driver.handles.append(f"w{len(self._driver.handles)}")
+        self._driver.current_window_handle = self._driver.handles[-1]
+
+    def window(self, handle):
+        self._driver.current_window_handle = handle
+
+
+class FakeDriver:
+    def __init__(self, caps, fail_reset=False):
+        self.caps = caps
+        self.fail_reset = fail_reset
+        self.scripts = []
+        self.handles = ["w0"]
+        self.current_window_handle = "w0"
+        self.switch_to = _SwitchTo(self)
+
+    def execute_script(self, script, *args):
+        if self.fail_reset:
+            raise RuntimeError("session gone")
+        self.scripts.append(script)
+
+    def delete_all_cookies(self):
+        pass
+
+    @property
+    def window_handles(self):
+        return list(self.handles)
+
+    def close(self):
+        self.handles.remove(self.current_window_handle)
+
+
+class Recorder:
+    """Fake factory/disposer pair that counts created and quit drivers."""
+
+    def __init__(self, fail_reset=False):
+        self.fail_reset = fail_reset
+        self.created = []
+        self.disposed = []
+
+    def factory(self, caps):
+        driver = FakeDriver(caps, fail_reset=self.fail_reset)
+        self.created.append(driver)
+        return driver
+
+    def disposer(self, driver):
+        self.disposed.append(driver)
+
+
+def _pool(rec, **kwargs):
+    return SessionPool(factory=rec.factory, disposer=rec.disposer, **kwargs)
+
+
+def test_key_ignores_session_name_and_credentials():
+    other = {"browserName": " chrome ", "bstack:options": {"os": "Windows", "osVersion": "11", "sessionName": "z", "userName": "u"}}
+    assert capabilities_key(CHROME) == capabilities_key(other)
+    assert capabilities_key(CHROME) != capabilities_key(FIREFOX)
+
+
+def test_released_session_is_reused_for_the_same_platform_only():
+    rec = Recorder()
+    pool = _pool(rec)
+    first = pool.acquire(CHROME)
+    pool.release(first)
+    assert pool.idle_count(first.key) == 1
+    assert pool.acquire(CHROME) is first
+    assert pool.acquire(FIREFOX).driver is rec.created[1]
+    assert (pool.stats.created, pool.stats.reused) == (2, 1)
+    # The reset moved the session to a fresh window and closed the old one
+    assert first.driver.window_handles == ["w1"]
+
+
+def test_session_is_recycled_after_max_uses():
+    rec = Recorder()
+    pool = _pool(rec, max_uses=2)
+    session = pool.acquire(CHROME)
+    pool.release(session)
+    pool.release(pool.acquire(CHROME))
+    assert rec.disposed == [session.driver]
+    assert pool.idle_count() == 0
+    assert pool.stats.recycled == 1
+
+
+def test_unhealthy_or_unresettable_sessions_are_quit():
+    rec = Recorder()
+    pool = _pool(rec)
+    pool.release(pool.acquire(CHROME), healthy=False)
+    broken = Recorder(fail_reset=True)
+    pool2 = _pool(broken)
+    pool2.release(pool2.acquire(CHROME))
+    assert len(rec.disposed) == 1 and len(broken.disposed) == 1
+    assert pool.stats.unhealthy == 1 and pool2.stats.unhealthy == 1
+    assert pool.idle_count() == pool2.idle_count() == 0
+
+
+def test_dead_idle_session_is_replaced():
+    rec = Recorder()
+    dead = set()
+    pool = _pool(rec, is_alive=lambda d: d not in dead)
+    session = pool.acquire(CHROME)
+    pool.release(session)
+    dead.add(session.driver)
+    fresh = pool.acquire(CHROME)
+    assert fresh.driver is not session.driver
+    assert rec.disposed == [session.driver]
+    assert pool.stats.expired == 1
+
+
+def test_session_not_kept_when_no_later_test_needs_it():
+    rec = Recorder()
+    pool = _pool(rec)
+    session = pool.acquire(CHROME)
+    pool.release(session, keep=False)
+    assert rec.disposed == [session.driver]
+    assert pool.idle_count() == 0
+    assert pool.stats.retired == 1
+
+
+def test_evict_idle_prefers_other_platforms():
+    rec = Recorder()
+    pool = _pool(rec)
+    chrome, firefox = pool.acquire(CHROME), pool.acquire(FIREFOX)
+    pool.release(chrome)
+    pool.release(firefox)
+    assert pool.evict_idle(keep_key=chrome.key)
+    assert rec.disposed == [firefox.driver]
+    assert pool.evict_idle(keep_key=chrome.key)
+    assert not pool.evict_idle()
+
+
+def test_close_all_quits_every_idle_session():
+    rec = Recorder()
+    pool = _pool(rec)
+    sessions = [pool.acquire(CHROME), pool.acquire(CHROME), pool.acquire(FIREFOX)]
+    for s in sessions:
+        pool.release(s)
+    pool.close_all()
+    assert sorted(map(id, rec.disposed)) == sorted(id(s.driver) for s in sessions)
+    assert pool.idle_count() == 0
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Make sibling module importable (slots.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from slots import SlotLimiter  # type: ignore
+
+
+def _limiters(tmp_path, slots=1):
+    # Two instances on one directory stand in for two pytest/xdist processes
+    lock_dir = str(tmp_path / "slots")
+    return SlotLimiter(slots, lock_dir=lock_dir, poll_interval=0.01), SlotLimiter(slots, lock_dir=lock_dir, poll_interval=0.01)
+
+
+def test_slot_lock_excludes_other_limiters(tmp_path):
+    a, b = _limiters(tmp_path, slots=2)
+    first, second = a.acquire(timeout=0), b.acquire(timeout=0)
+    assert {first.index, second.index} == {0, 1}
+    assert a.try_acquire() is None and b.try_acquire() is None
+    with open(first.path) as f:
+        assert f.read() == str(os.getpid())
+
+
+def test_zero_timeout_fails_at_once_when_full(tmp_path):
+    a, b = _limiters(tmp_path)
+    a.acquire(timeout=0)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        b.acquire(timeout=0)
+    assert time.monotonic() - start < 1
+
+
+def test_release_frees_the_slot_for_others(tmp_path):
+    a, b = _limiters(tmp_path)
+    slot = a.acquire(timeout=0)
+    assert a.held() == 1
+    a.release(slot)
+    a.release(slot)  # a second release is a no-op
+    a.release(None)
+    assert a.held() == 0
+    assert b.acquire(timeout=0).index == slot.index
+
+
+def test_on_wait_gives_back_a_slot_once(tmp_path):
+    a, b = _limiters(tmp_path)
+    held = a.acquire(timeout=0)
+    calls = []
+
+    def give_back():
+        calls.append(1)
+        a.release(held)
+        return True
+
+    slot = b.acquire(timeout=5, on_wait=give_back)
+    assert slot.index == held.index
+    assert calls == [1]
+
+
+def test_on_wait_is_not_called_again_after_it_gave_something_back(tmp_path):
+    a, b = _limiters(tmp_path)
+    a.acquire(timeout=0)
+    calls = []
+
+    def gave_back_elsewhere():
+        # Reports success without freeing anything this limiter can see
+        calls.append(1)
+        return True
+
+    with pytest.raises(TimeoutError):
+        b.acquire(timeout=0.1, on_wait=gave_back_elsewhere)
+    assert calls == [1]
+
+
+def test_on_wait_is_retried_while_it_frees_nothing(tmp_path):
+    a, b = _limiters(tmp_path)
+    a.acquire(timeout=0)
+    calls = []
+    with pytest.raises(TimeoutError):
+        b.acquire(timeout=0.1, on_wait=lambda: calls.append(1) or False)
+    assert len(calls) > 1
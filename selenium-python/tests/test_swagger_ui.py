@@ -1,14 +1,17 @@
 import os
+import sys
 from selenium.webdriver.support.ui import WebDriverWait
 
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from probe import page_contains  # type: ignore
+
 
 def test_swagger_ui_loads(driver):
     base_url = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
     driver.get(base_url + "/swagger")
 
     WebDriverWait(driver, 15).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    body = (driver.page_source or "").lower()
-    assert "browserstack demo api" in body or "swagger" in body, "Swagger UI should render"
+    assert page_contains(driver, "browserstack demo api", "swagger", source="html"), "Swagger UI should render"
 
     driver.execute_script(
         'browserstack_executor: {"action": "setSessionStatus", "arguments": {"status":"passed", "reason": "Swagger UI visible"}}'
@@ -0,0 +1,52 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+import urllib3
+from selenium.webdriver.remote.command import Command
+
+# Make sibling module importable (transport.py lives in selenium-python/)
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from transport import SharedPoolConnection, TimedConnection, remote_connection  # type: ignore
+
+
+@pytest.fixture
+def silent_hub():
+    """A hub URL that accepts connections but never answers."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield f"http://127.0.0.1:{server.getsockname()[1]}/wd/hub"
+    server.close()
+
+
+@pytest.mark.parametrize("shared", [True, False], ids=["shared", "stock"])
+def test_remote_connection_uses_configured_read_timeout(monkeypatch, silent_hub, shared):
+    monkeypatch.setenv("WD_HTTP_CONNECT_TIMEOUT", "2")
+    monkeypatch.setenv("WD_HTTP_READ_TIMEOUT", "0.3")
+    # The shared pool is built once per process; start from a fresh one with these timeouts
+    monkeypatch.setattr("transport._SHARED_MANAGER", None)
+    conn = remote_connection(silent_hub, shared=shared)
+    assert isinstance(conn, SharedPoolConnection if shared else TimedConnection)
+
+    outcome = {}
+
+    def send():
+        start = time.monotonic()
+        try:
+            conn.execute(Command.GET_TITLE, {"sessionId": "s"})
+        except Exception as e:
+            outcome["error"] = e
+        outcome["elapsed"] = time.monotonic() - start
+
+    # Without the timeout the command would block forever; do not let that hang the suite
+    t = threading.Thread(target=send, daemon=True)
+    t.start()
+    t.join(timeout=15)
+    assert not t.is_alive(), "WebDriver command ignored WD_HTTP_READ_TIMEOUT"
+    assert isinstance(outcome.get("error"), urllib3.exceptions.HTTPError)
+    # urllib3 may retry a timed-out GET a few times, each bounded by the read timeout
+    assert outcome["elapsed"] < 5
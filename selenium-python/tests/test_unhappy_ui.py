@@ -1,8 +1,11 @@
 import os
+import sys
 import pytest
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from probe import page_contains  # type: ignore
+
 
 BASE = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
 
@@ -23,27 +26,20 @@ else:
         "win11-edge",
     ]
 
-# Mark as unhappy/ui
-pytestmark = [pytest.mark.unhappy, pytest.mark.ui]
+# Mark as unhappy/ui; these checks only read URLs and text, so skip heavy assets
+pytestmark = [pytest.mark.unhappy, pytest.mark.ui, pytest.mark.block_resources()]
 
 
 def _ready(d):
     return d.execute_script("return document.readyState") == "complete"
 
 
-def _body_text(driver):
-    try:
-        return driver.find_element(By.TAG_NAME, "body").text.lower()
-    except Exception:
-        return (driver.page_source or "").lower()
-
-
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
 def test_invalid_route_shows_404(driver):
     driver.get(BASE + "/this-path-should-not-exist-" + "x" * 8)
     WebDriverWait(driver, 10).until(_ready)
-    text = _body_text(driver)
-    assert "404" in text or "not found" in text
+    res = page_contains(driver, "404", "not found")
+    assert res, f"No 404 message on the page: {res.excerpt!r}"
 
 
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
@@ -51,8 +47,8 @@ def test_invalid_route_shows_404(driver):
 def test_misc_404s(driver, path):
     driver.get(BASE + path)
     WebDriverWait(driver, 10).until(_ready)
-    text = _body_text(driver)
-    assert "404" in text or "not found" in text or "an unexpected error has occurred" in text
+    res = page_contains(driver, "404", "not found", "an unexpected error has occurred")
+    assert res, f"No error page for {path}"
 
 
 @pytest.mark.parametrize("driver", MATRIX, indirect=True, ids=MATRIX_IDS)
@@ -60,8 +56,7 @@ def test_misc_404s(driver, path):
 def test_path_quirks_do_not_500(driver, path):
     driver.get(BASE + path)
     WebDriverWait(driver, 10).until(_ready)
-    text = _body_text(driver)
-    ok = ("/signin" in driver.current_url) or ("404" in text) or ("not found" in text)
+    ok = ("/signin" in driver.current_url) or page_contains(driver, "404", "not found")
     assert ok, f"Unexpected content for {path}: {driver.current_url}"
 
 
@@ -74,5 +69,5 @@ def test_confirmation_without_state_is_safe(driver):
         pass
     driver.get(BASE + "/confirmation")
     WebDriverWait(driver, 10).until(_ready)
-    text = _body_text(driver)
-    assert "error" not in text or "an unexpected error has occurred" in text
+    res = page_contains(driver, "error", "an unexpected error has occurred")
+    assert "error" not in res.found or "an unexpected error has occurred" in res.found, res.excerpt
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import urllib3
+from selenium.webdriver.remote import utils
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+import profiler
+
+try:
+    from selenium.webdriver.remote.client_config import ClientConfig
+except ImportError:  # selenium < 4.26
+    ClientConfig = None
+
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+
+class CommandTimings:
+    """Per-command wall-clock samples (seconds) for one transport, shared by all sessions."""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, command: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[command].append(seconds)
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+        out = {}
+        for command, values in samples.items():
+            n = len(values)
+            out[command] = {
+                "count": n,
+                "mean_ms": round(1000 * sum(values) / n, 2),
+                "p50_ms": round(1000 * values[n // 2], 2),
+                "max_ms": round(1000 * values[-1], 2),
+            }
+        return out
+
+    def total(self) -> tuple:
+        with self._lock:
+            values = [s for v in self._samples.values() for s in v]
+        return len(values), sum(values)
+
+
+TIMINGS = CommandTimings()
+
+
+class TimedConnection(RemoteConnection):
+    """Stock selenium transport that records how long each WebDriver command takes."""
+
+    transport_name = "stock"
+
+    def execute(self, command, params):
+        prof = profiler.PROFILER
+        request_bytes = len(utils.dump_json(params)) if prof is not None else 0
+        response = None
+        start = time.perf_counter()
+        try:
+            response = super().execute(command, params)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            TIMINGS.add(command, elapsed)
+            if prof is not None:
+                prof.record(command, elapsed, request_bytes, response)
+
+
+_SHARED_LOCK = threading.Lock()
+_SHARED_MANAGER = None
+
+
+def http_timeout() -> urllib3.Timeout:
+    """Per-request WebDriver timeout from WD_HTTP_CONNECT_TIMEOUT and WD_HTTP_READ_TIMEOUT."""
+    return urllib3.Timeout(
+        connect=float(os.getenv("WD_HTTP_CONNECT_TIMEOUT", "30")),
+        read=float(os.getenv("WD_HTTP_READ_TIMEOUT", "300")),
+    )
+
+
+def shared_pool_manager() -> urllib3.PoolManager:
+    """One keep-alive urllib3 pool per process for every WebDriver session.
+
+    Size and timeouts come from WD_HTTP_POOL_SIZE, WD_HTTP_CONNECT_TIMEOUT and
+    WD_HTTP_READ_TIMEOUT. The read timeout must cover a cloud session start.
+    """
+    global _SHARED_MANAGER
+    with _SHARED_LOCK:
+        if _SHARED_MANAGER is None:
+            kwargs = {
+                "num_pools": 4,
+                "maxsize": int(os.getenv("WD_HTTP_POOL_SIZE", "8")),
+                "block": False,
+                "timeout": http_timeout(),
+                "retries": False,
+            }
+            ca_certs = os.getenv("REQUESTS_CA_BUNDLE") or (certifi.where() if certifi is not None else None)
+            if ca_certs:
+                kwargs.update(cert_reqs="CERT_REQUIRED", ca_certs=ca_certs)
+            _SHARED_MANAGER = urllib3.PoolManager(**kwargs)
+        return _SHARED_MANAGER
+
+
+class SharedPoolConnection(TimedConnection):
+    """Remote connection that reuses the process-wide keep-alive pool.
+
+    Every session talks to the same hub, so after the first TLS handshake all
+    commands of all sessions ride on warm connections. ``close`` (called by
+    ``driver.quit``) leaves the shared pool alone.
+    """
+
+    transport_name = "shared"
+
+    def _get_connection_manager(self):
+        if getattr(self, "_proxy_url", None):
+            # Proxied runs keep selenium's per-session ProxyManager
+            return super()._get_connection_manager()
+        return shared_pool_manager()
+
+    def close(self):
+        if getattr(self, "_proxy_url", None):
+            super().close()
+
+
+def remote_connection(hub_url: str, shared: bool = True) -> RemoteConnection:
+    cls = SharedPoolConnection if shared else TimedConnection
+    if ClientConfig is not None:
+        # Selenium passes the client config's timeout on every request, overriding the pool default
+        config = ClientConfig(remote_server_addr=hub_url, keep_alive=True, timeout=http_timeout())
+        return cls(client_config=config)
+    # Older seleniums build each pool from the class-level timeout; set_timeout on the subclass
+    # leaves plain RemoteConnection (and any other driver in the process) untouched
+    cls.set_timeout(http_timeout())
+    return cls(hub_url, keep_alive=True)
+
+
+def write_report(path: str, transport: str) -> None:
+    count, seconds = TIMINGS.total()
+    report = {
+        "transport": transport,
+        "commands": count,
+        "total_s": round(seconds, 3),
+        "per_command": TIMINGS.summary(),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
@@ -0,0 +1,208 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+@dataclass
+class WaitResult:
+    ok: bool
+    value: Any = None
+    reason: str = ""  # what satisfied the wait: initial, dom, storage, network, nav, poll, or timeout
+    elapsed: float = 0.0  # seconds, including round trips and any navigation in between
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+# Re-evaluates a predicate inside the page whenever something it could depend on
+# changes: DOM mutations, storage writes (same window too), history navigation
+# and completed network requests. A slow poll covers anything else.
+# arguments: predicate body, timeout (ms), poll (ms), predicate args, callback
+# The predicate is called as f(state, source, ...args); ``state`` persists across calls.
+WAIT_JS = r"""
+var done = arguments[arguments.length - 1];
+var body = arguments[0], timeoutMs = arguments[1], pollMs = arguments[2], pargs = arguments[3] || [];
+var start = performance.now(), finished = false, cleanups = [], state = {}, queued = null;
+var predicate;
+try { predicate = new Function('state', 'source', body); } catch (e) { done({ok: false, reason: 'error', value: String(e), elapsed: 0}); return; }
+function finish(ok, value, reason) {
+  if (finished) return;
+  finished = true;
+  cleanups.forEach(function (f) { try { f(); } catch (e) {} });
+  done({ok: ok, value: value === undefined ? null : value, reason: reason, elapsed: performance.now() - start});
+}
+function check(source) {
+  if (finished) return;
+  var v;
+  try { v = predicate.apply(null, [state, source].concat(pargs)); } catch (e) { return; }
+  if (v) finish(true, v, source);
+}
+function schedule(source) {
+  // Coalesce bursts (a React render fires many mutations) into one evaluation
+  if (queued) return;
+  queued = source;
+  Promise.resolve().then(function () { var s = queued; queued = null; check(s); });
+}
+function listen(target, type, source) {
+  var h = function () { schedule(source); };
+  target.addEventListener(type, h);
+  cleanups.push(function () { target.removeEventListener(type, h); });
+}
+// Same-window storage writes and pushState fire no event; wrap them for the duration
+// of this wait only and put the originals back in cleanup
+function hook(target, name, event) {
+  var orig = target[name];
+  if (typeof orig !== 'function') return;
+  var wrapped = function () {
+    var r = orig.apply(this, arguments);
+    try { window.dispatchEvent(new Event(event)); } catch (e) {}
+    return r;
+  };
+  target[name] = wrapped;
+  cleanups.push(function () { if (target[name] === wrapped) target[name] = orig; });
+}
+['setItem', 'removeItem', 'clear'].forEach(function (name) { hook(Storage.prototype, name, '__waits:storage'); });
+['pushState', 'replaceState'].forEach(function (name) { hook(history, name, '__waits:nav'); });
+var mo = new MutationObserver(function () { schedule('dom'); });
+mo.observe(document.documentElement || document, {subtree: true, childList: true, attributes: true, characterData: true});
+cleanups.push(function () { mo.disconnect(); });
+listen(window, 'storage', 'storage');
+listen(window, '__waits:storage', 'storage');
+listen(window, '__waits:nav', 'nav');
+listen(window, 'popstate', 'nav');
+listen(window, 'hashchange', 'nav');
+listen(document, 'readystatechange', 'dom');
+if (window.PerformanceObserver) {
+  try {
+    var po = new PerformanceObserver(function () { schedule('network'); });
+    po.observe({type: 'resource'});
+    cleanups.push(function () { po.disconnect(); });
+  } catch (e) {}
+}
+var poll = setInterval(function () { check('poll'); }, pollMs);
+cleanups.push(function () { clearInterval(poll); });
+var timer = setTimeout(function () { finish(false, null, 'timeout'); }, timeoutMs);
+cleanups.push(function () { clearTimeout(timer); });
+check('initial');
+"""
+
+# Snapshot of both storages plus the text under a root element (body by default)
+_SNAPSHOT = r"""
+function __snapshot(storage, rootSel) {
+  var parts = [];
+  if (storage) {
+    try { parts.push(JSON.stringify(Object.entries(sessionStorage))); } catch (e) {}
+    try { parts.push(JSON.stringify(Object.entries(localStorage))); } catch (e) {}
+  }
+  if (rootSel) {
+    var root = document.querySelector(rootSel);
+    parts.push(root ? root.textContent : '');
+  }
+  return parts.join('\u0000');
+}
+"""
+
+# Page script timeout is 30 s by default; longer waits raise it first
+_DEFAULT_SCRIPT_TIMEOUT = 30.0
+
+
+def wait_until(driver, predicate: str, timeout: float = 10, *args, poll: float = 0.5) -> WaitResult:
+    """Resolve as soon as the JS ``predicate`` body returns a truthy value.
+
+    ``predicate`` is a function body called as ``f(state, source, *args)``; its
+    truthy return value becomes ``WaitResult.value``. It is re-checked on DOM,
+    storage, history and network events, plus every ``poll`` seconds. If the page
+    navigates away mid-wait the predicate is re-armed on the new document for the
+    remaining time. Returns a falsy result on timeout instead of raising.
+    """
+    deadline = time.monotonic() + timeout
+    previous = None
+    if timeout + 5 > _DEFAULT_SCRIPT_TIMEOUT:
+        # Pooled sessions carry timeouts into later tests, so put the old value back afterwards
+        previous = driver.timeouts.script
+        driver.set_script_timeout(timeout + 5)
+    started = time.monotonic()
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return WaitResult(ok=False, reason="timeout", elapsed=time.monotonic() - started)
+            try:
+                res = driver.execute_async_script(
+                    WAIT_JS, predicate, int(remaining * 1000), max(10, int(poll * 1000)), list(args)
+                ) or {}
+            except WebDriverException as e:
+                # "document unloaded while waiting for result": a full navigation happened
+                if isinstance(e, TimeoutException) or "unload" in str(e).lower():
+                    continue
+                raise
+            return WaitResult(
+                ok=bool(res.get("ok")),
+                value=res.get("value"),
+                reason=res.get("reason") or "",
+                elapsed=time.monotonic() - started,
+            )
+    finally:
+        if previous is not None:
+            try:
+                driver.set_script_timeout(previous)
+            except WebDriverException:
+                pass  # e.g. the session ended during the wait
+
+
+def mark_state(driver, *, storage: bool = True, text_root: Optional[str] = "body") -> None:
+    """Record the current storage/text snapshot in the page as the baseline for ``wait_for_change``.
+
+    Call it before the action whose effect you want to wait for, so a change that
+    lands before the wait starts is still seen.
+    """
+    driver.execute_script(_SNAPSHOT + "window.__waitsMark = __snapshot(arguments[0], arguments[1]);", storage, text_root)
+
+
+def wait_for_change(driver, timeout: float = 5, *, storage: bool = True, text_root: Optional[str] = "body") -> WaitResult:
+    """Resolve when session/local storage or the text under ``text_root`` differs from the baseline.
+
+    The baseline is the last ``mark_state`` on this document, or the state when the wait starts.
+    """
+    body = _SNAPSHOT + r"""
+    var snap = __snapshot(arguments[2], arguments[3]);
+    if (state.base === undefined) {
+      state.base = (typeof window.__waitsMark === 'string') ? window.__waitsMark : snap;
+      delete window.__waitsMark;
+    }
+    return snap !== state.base;
+    """
+    return wait_until(driver, body, timeout, storage, text_root)
+
+
+def wait_for_dom_quiet(driver, quiet: float = 0.3, timeout: float = 5) -> WaitResult:
+    """Resolve once the document has finished loading and seen no mutation for ``quiet`` seconds."""
+    body = r"""
+    var now = performance.now();
+    if (source === 'dom' || state.last === undefined) { state.last = now; return false; }
+    return document.readyState === 'complete' && now - state.last >= arguments[2];
+    """
+    return wait_until(driver, body, timeout, quiet * 1000, poll=min(0.1, quiet / 2))
+
+
+def wait_for_url(driver, fragment: str, timeout: float = 10) -> WaitResult:
+    """Resolve when ``location.href`` contains ``fragment``; value is the URL."""
+    body = "return location.href.indexOf(arguments[2]) !== -1 ? location.href : null;"
+    return wait_until(driver, body, timeout, fragment)
+
+
+def wait_for_request(driver, url_part: str, timeout: float = 10) -> WaitResult:
+    """Resolve when a request whose URL contains ``url_part`` has completed; value is its URL.
+
+    Uses resource timing, so requests that finished before the wait started count too.
+    """
+    body = r"""
+    var entries = performance.getEntriesByType('resource');
+    for (var i = entries.length - 1; i >= 0; i--) {
+      if (entries[i].name.indexOf(arguments[2]) !== -1) return entries[i].name;
+    }
+    return null;
+    """
+    return wait_until(driver, body, timeout, url_part)
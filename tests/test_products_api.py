@@ -1,10 +1,12 @@
 import os
 import random
 import string
+import sys
 import pytest
-import requests
 
-BASE = os.getenv("TEST_URL", "https://testathon.live/").rstrip("/")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "selenium-python"))
+from api_batch import from_param  # type: ignore
+from catalog_cache import CATALOG  # type: ignore
 
 
 def _rand(n=8):
@@ -22,11 +24,16 @@ def _parse_products(resp):
     return [], data
 
 
-def test_products_base_returns_products_json():
-    r = requests.get(f"{BASE}/api/products", timeout=10)
-    assert r.status_code == 200
-    products, raw = _parse_products(r)
-    assert isinstance(products, list)
+def test_products_base_returns_products_json(api):
+    # Always asks the server; an unchanged catalog comes back as a 304 against the shared cache
+    stored = CATALOG.has_copy(api)
+    catalog = api.catalog(revalidate=True)
+    if catalog.source == "revalidated":
+        # A 304 is only valid as the answer to revalidating a stored copy
+        assert stored and catalog.status == 304
+    else:
+        assert catalog.source == "fetched" and catalog.status == 200
+    assert isinstance(catalog.products, list)
 
 
 @pytest.mark.parametrize(
@@ -46,8 +53,9 @@ def test_products_base_returns_products_json():
         {"brand": "somebrand"},
     ],
 )
-def test_products_unknown_or_varied_params_do_not_500(params):
-    r = requests.get(f"{BASE}/api/products", params=params, timeout=10)
+@pytest.mark.api_request("GET", "/api/products", params=from_param("params"))
+def test_products_unknown_or_varied_params_do_not_500(api_response, params):
+    r = api_response.result()
     assert r.status_code in {200, 304} or (400 <= r.status_code < 500)
     # Prefer 200 OK; parse if 200/304
     if r.status_code in {200, 304}:
@@ -69,30 +77,29 @@ def test_products_unknown_or_varied_params_do_not_500(params):
         {"availableSizes": ["S", "M"]},
     ],
 )
-def test_products_param_edge_cases_no_5xx(params):
-    r = requests.get(f"{BASE}/api/products", params=params, timeout=10)
+@pytest.mark.api_request("GET", "/api/products", params=from_param("params"))
+def test_products_param_edge_cases_no_5xx(api_response, params):
+    r = api_response.result()
     assert r.status_code < 500
     if r.status_code in {200, 304}:
         products, _ = _parse_products(r)
         assert isinstance(products, list)
 
 
-@pytest.mark.parametrize("accept", [
-    "application/json",
-    "text/plain",
-    "application/xml",
-])
-def test_products_content_negotiation_no_5xx(accept):
-    r = requests.get(
-        f"{BASE}/api/products",
-        headers={"Accept": accept},
-        timeout=10,
-    )
+@pytest.mark.parametrize("headers", [
+    {"Accept": "application/json"},
+    {"Accept": "text/plain"},
+    {"Accept": "application/xml"},
+], ids=["application/json", "text/plain", "application/xml"])
+@pytest.mark.api_request("GET", "/api/products", headers=from_param("headers"))
+def test_products_content_negotiation_no_5xx(api_response, headers):
+    r = api_response.result()
     assert r.status_code < 500
 
 
 @pytest.mark.parametrize("method", ["HEAD", "OPTIONS"]) 
-def test_products_head_options_sensible_status(method):
-    r = requests.request(method, f"{BASE}/api/products", timeout=10)
+@pytest.mark.api_request(from_param("method"), "/api/products")
+def test_products_head_options_sensible_status(api_response, method):
+    r = api_response.result()
     assert r.status_code in {200, 204, 405}
 
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compare per-command WebDriver latency between two transport reports.
+
+Produce the reports by running the same tests once per transport:
+  WD_SHARED_TRANSPORT=0 WD_TRANSPORT_REPORT=log/transport_stock.json pytest -q selenium-python/tests/test_catalog_ui.py
+  WD_SHARED_TRANSPORT=1 WD_TRANSPORT_REPORT=log/transport_shared.json pytest -q selenium-python/tests/test_catalog_ui.py
+
+Usage:
+  python tools/compare_transport.py log/transport_stock.json log/transport_shared.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("baseline", help="report of the stock transport")
+    ap.add_argument("candidate", help="report of the shared transport")
+    args = ap.parse_args(argv)
+
+    base, cand = load(args.baseline), load(args.candidate)
+    bcmd, ccmd = base.get("per_command", {}), cand.get("per_command", {})
+    names = sorted(set(bcmd) | set(ccmd), key=lambda n: -(bcmd.get(n, {}).get("count", 0)))
+
+    label_b, label_c = base.get("transport", "baseline"), cand.get("transport", "candidate")
+    print(f"{'command':<32} {'n':>5} {label_b + ' ms':>12} {label_c + ' ms':>12} {'delta':>8}")
+    for name in names:
+        b, c = bcmd.get(name, {}), ccmd.get(name, {})
+        bm, cm = b.get("mean_ms"), c.get("mean_ms")
+        delta = f"{100 * (cm - bm) / bm:+.0f}%" if bm and cm is not None else "-"
+        n = max(b.get("count", 0), c.get("count", 0))
+        print(f"{name:<32} {n:>5} {bm if bm is not None else '-':>12} {cm if cm is not None else '-':>12} {delta:>8}")
+
+    bt, ct = base.get("total_s", 0), cand.get("total_s", 0)
+    print(f"\ntotal command time: {label_b} {bt:.2f}s, {label_c} {ct:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())